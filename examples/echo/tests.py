@@ -1,3 +1,5 @@
+import socket
+
 from pulsar import send, multi_async
 from pulsar.utils.pep import range
 from pulsar.apps.test import unittest, dont_run_with_thread
@@ -12,11 +14,16 @@ class TestEchoServerThread(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         s = server(name=cls.__name__.lower(), bind='127.0.0.1:0',
-                   backlog=1024, concurrency=cls.concurrency)
+                   backlog=1024, concurrency=cls.concurrency,
+                   **cls.server_params())
         cls.server = yield send('arbiter', 'run', s)
         cls.pool = Echo()
         cls.echo = cls.pool.client(cls.server.address)
 
+    @classmethod
+    def server_params(cls):
+        return {}
+
     @classmethod
     def tearDownClass(cls):
         if cls.server:
@@ -82,3 +89,27 @@ class TestEchoServerThread(unittest.TestCase):
 @dont_run_with_thread
 class TestEchoServerProcess(TestEchoServerThread):
     concurrency = 'process'
+
+
+@dont_run_with_thread
+@unittest.skipUnless(hasattr(socket, 'SO_REUSEPORT'), 'Requires SO_REUSEPORT')
+class TestEchoServerReusePort(TestEchoServerProcess):
+
+    @classmethod
+    def server_params(cls):
+        return {'workers': 2, 'reuse_port': True}
+
+    def test_reuse_port(self):
+        # new connections are distributed among workers by the kernel
+        clients = [Echo().client(self.server.address) for _ in range(20)]
+        result = yield multi_async((echo(b'ciao') for echo in clients))
+        self.assertEqual(result, [b'ciao']*20)
+        info = yield send(self.server.name, 'info')
+        workers = info['workers']
+        self.assertEqual(len(workers), 2)
+        accepted = 0
+        for worker in workers:
+            info = yield send(worker['actor']['actor_id'], 'info')
+            self.assertTrue(info['reuse_port'])
+            accepted += info['accepted_connections']
+        self.assertTrue(accepted >= 20)
@@ -1,9 +1,13 @@
 '''Tests the "helloworld" example.
 '''
+import os
+import tempfile
+
 from pulsar import send, SERVER_SOFTWARE, get_application, get_actor
 from pulsar import MultiDeferred
 from pulsar.utils.pep import range
 from pulsar.apps.http import HttpClient
+from pulsar.utils.httpurl import quote
 from pulsar.apps.test import unittest, run_on_arbiter, dont_run_with_thread
 
 from .manage import server
@@ -70,3 +74,32 @@ class TestHelloWorldThread(unittest.TestCase):
 @dont_run_with_thread
 class TestHelloWorldProcess(TestHelloWorldThread):
     concurrency = 'process'
+
+
+class TestHelloWorldUnix(unittest.TestCase):
+    app = None
+    concurrency = 'thread'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.path = os.path.join(tempfile.mkdtemp(), 'helloworld.sock')
+        s = server(name='helloworld_unix', concurrency=cls.concurrency,
+                   bind='unix:%s' % cls.path)
+        cls.app = yield send('arbiter', 'run', s)
+        cls.uri = 'http+unix://%s/' % quote(cls.path, safe='')
+        cls.client = HttpClient()
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.app is not None:
+            yield send('arbiter', 'kill_actor', cls.app.name)
+
+    def test_address(self):
+        self.assertEqual(self.app.address, self.path)
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_response(self):
+        response = yield self.client.get(self.uri).on_finished
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_content(), b'Hello World!\n')
+        self.assertEqual(response.request.address, self.path)
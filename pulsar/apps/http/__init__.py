@@ -78,6 +78,13 @@ to a :class:`HttpClient` or to a specific request::
     res2 = client.get('https://github.com/timeline.json',
                       certkey='another.key')
 
+Unix domain sockets
+=======================
+A server listening on a unix domain socket is reached via the ``http+unix``
+scheme, with the percent-encoded path of the socket as host::
+
+    client.get('http+unix://%2Fvar%2Frun%2Fapp.sock/status')
+
 .. _http-streaming:
 
 Streaming
@@ -227,7 +234,7 @@ from pulsar.utils.httpurl import (urlparse, parse_qsl, responses,
                                   is_succesful, HTTPError, URLError,
                                   get_hostport, cookiejar_from_dict,
                                   host_no_default_port, DEFAULT_CHARSET,
-                                  JSON_CONTENT_TYPES)
+                                  JSON_CONTENT_TYPES, unquote)
 
 from .plugins import (handle_cookies, handle_100, handle_101, handle_redirect,
                       Tunneling, TooManyRedirects)
@@ -237,6 +244,7 @@ from .auth import Auth, HTTPBasicAuth, HTTPDigestAuth
 
 scheme_host = namedtuple('scheme_host', 'scheme netloc')
 tls_schemes = ('https', 'wss')
+unix_schemes = ('http+unix',)
 
 
 def guess_filename(obj):
@@ -398,14 +406,23 @@ class HttpRequest(pulsar.Request, RequestBase):
             client.cookies.add_cookie_header(self)
         if cookies:
             cookiejar_from_dict(cookies).add_cookie_header(self)
-        self.unredirected_headers['host'] = host_no_default_port(self._scheme,
-                                                                 self._netloc)
+        if self._scheme in unix_schemes:
+            self.unredirected_headers['host'] = 'localhost'
+        else:
+            self.unredirected_headers['host'] = host_no_default_port(
+                self._scheme, self._netloc)
         client.set_proxy(self)
 
     @property
     def address(self):
-        '''``(host, port)`` tuple of the HTTP resource'''
-        return self._tunnel.address if self._tunnel else (self.host, self.port)
+        '''``(host, port)`` tuple of the HTTP resource, or the path of the
+        unix domain socket for the ``http+unix`` scheme.'''
+        if self._tunnel:
+            return self._tunnel.address
+        elif self.scheme in unix_schemes:
+            return self.host
+        else:
+            return (self.host, self.port)
 
     @property
     def target_address(self):
@@ -485,7 +502,10 @@ class HttpRequest(pulsar.Request, RequestBase):
     def _set_hostport(self, scheme, host):
         self._tunnel = None
         self._proxy = None
-        self.host, self.port = get_hostport(scheme, host)
+        if scheme in unix_schemes:
+            self.host, self.port = unquote(host), None
+        else:
+            self.host, self.port = get_hostport(scheme, host)
 
     def encode(self):
         '''The bytes representation of this :class:`HttpRequest`.
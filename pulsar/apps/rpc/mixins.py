@@ -21,8 +21,9 @@ class PulsarServerCommands(JSONRPC):
     def rpc_server_info(self, request):
         '''Return a dictionary of information regarding the server and workers.
 
-        It invokes the :meth:`extra_server_info` for adding custom
-        information.
+        Event loop statistics of each worker are included when the
+        ``loop_stats`` setting is enabled. It invokes the
+        :meth:`extra_server_info` for adding custom information.
         '''
         info = yield send('arbiter', 'info')
         yield self.extra_server_info(request, info)
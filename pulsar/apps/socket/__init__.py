@@ -99,8 +99,7 @@ from functools import partial
 
 import pulsar
 from pulsar import TcpServer, multi_async
-from pulsar.utils.internet import (parse_address, SSLContext, WrapSocket,
-                                   format_address)
+from pulsar.utils.internet import SSLContext, WrapSocket, format_address
 from pulsar.utils.config import pass_through
 
 
@@ -123,6 +122,24 @@ class Bind(SocketSetting):
         """
 
 
+class ReusePort(SocketSetting):
+    name = "reuse_port"
+    flags = ["--reuse-port"]
+    validator = pulsar.validate_bool
+    action = "store_true"
+    default = False
+    desc = """\
+        Each worker listens on its own ``SO_REUSEPORT`` socket.
+
+        By default workers share the sockets created by the monitor and
+        compete to accept connections. With this option each worker binds
+        its own socket to the :ref:`bind <setting-bind>` address and the
+        kernel distributes new connections among workers. It requires a
+        platform supporting ``SO_REUSEPORT`` (Linux 3.9 or above) and a
+        TCP address.
+        """
+
+
 class KeepAlive(SocketSetting):
     name = "keep_alive"
     flags = ["--keep-alive"]
@@ -151,6 +168,23 @@ class Backlog(SocketSetting):
         """
 
 
+class MaxConcurrentConnections(SocketSetting):
+    name = "max_concurrent_connections"
+    flags = ["--max-concurrent-connections"]
+    validator = pulsar.validate_pos_int
+    type = int
+    default = 0
+    desc = """\
+        The maximum number of open connections in a worker.
+
+        Once reached, the worker stops accepting new connections until one
+        of its connections is closed. Waiting clients are queued in the
+        socket :ref:`backlog <setting-backlog>` and, when several workers
+        share the same socket, accepted by workers with spare capacity.
+        If 0 (the default) there is no limit.
+        """
+
+
 class KeyFile(SocketSetting):
     name = "key_file"
     flags = ["--key-file"]
@@ -214,26 +248,56 @@ class SocketServer(pulsar.Application):
             if cfg.key_file and not os.path.exists(cfg.key_file):
                 raise ValueError('key_file "%s" does not exist' % cfg.key_file)
             ssl = SSLContext(keyfile=cfg.key_file, certfile=cfg.cert_file)
-        address = parse_address(self.cfg.address)
+        address = cfg.address
+        reuse_port = bool(cfg.reuse_port and cfg.workers and
+                          isinstance(address, tuple))
         # First create the sockets
-        sockets = yield loop.start_serving(lambda: None, *address)
+        if isinstance(address, tuple):
+            sockets = yield loop.start_serving(lambda: None, *address,
+                                               reuse_port=reuse_port)
+        else:
+            sockets = yield loop.start_serving(lambda: None, path=address)
         addresses = []
         for sock in sockets:
             assert loop.remove_reader(sock.fileno()), (
                 "Could not remove reader")
             addresses.append(sock.getsockname())
-        monitor.params.sockets = [WrapSocket(s) for s in sockets]
+        if reuse_port:
+            # The sockets were needed to resolve the addresses only, each
+            # worker binds its own sockets to them
+            for sock in sockets:
+                sock.close()
+            monitor.params.sockets = None
+        else:
+            monitor.params.sockets = [WrapSocket(s) for s in sockets]
+        monitor.params.addresses = addresses
         monitor.params.ssl = ssl
         self.addresses = addresses
         self.address = addresses[0]
 
+    def monitor_stop(self, monitor):
+        '''Remove the unix domain socket file, if the server was bound
+        to one.'''
+        if self.address and not isinstance(self.address, tuple):
+            try:
+                os.remove(self.address)
+            except OSError:
+                pass
+
     def worker_start(self, worker):
         '''Start the worker by invoking the :meth:`create_server` method.'''
         worker.servers[self.name] = servers = []
-        for sock in worker.params.sockets:
-            server = self.create_server(worker, sock.sock)
-            server.bind_event('stop', partial(self._stop_worker, worker))
-            servers.append(server)
+        if worker.params.sockets is None:
+            # reuse_port, bind a new socket to each address
+            for address in worker.params.addresses:
+                server = self.create_server(worker, address=address[:2])
+                server.bind_event('stop', partial(self._stop_worker, worker))
+                servers.append(server)
+        else:
+            for sock in worker.params.sockets:
+                server = self.create_server(worker, sock.sock)
+                server.bind_event('stop', partial(self._stop_worker, worker))
+                servers.append(server)
 
     def worker_stopping(self, worker):
         all = []
@@ -243,13 +307,24 @@ class SocketServer(pulsar.Application):
 
     def worker_info(self, worker, info):
         info['sockets'] = sockets = []
+        accepted = pauses = shed = 0
         for server in worker.servers.get(self.name, ()):
-            address = format_address(server.address)
+            accepted += server.received
+            pauses += server.accept_pauses
+            shed += server.shed_requests
             sockets.append({
                 'address': format_address(server.address),
                 'read_timeout': server.timeout,
                 'concurrent_connections': server.concurrent_connections,
-                'received_connections': server.received})
+                'received_connections': server.received,
+                'accepting': server.accepting,
+                'accept_pauses': server.accept_pauses,
+                'pending_requests': server.pending_requests,
+                'shed_requests': server.shed_requests})
+        info['accepted_connections'] = accepted
+        info['accept_pauses'] = pauses
+        info['shed_requests'] = shed
+        info['reuse_port'] = worker.params.sockets is None
 
     def _stop_worker(self, worker, exc):
         worker.stop()
@@ -257,14 +332,20 @@ class SocketServer(pulsar.Application):
 
     #   INTERNALS
 
-    def create_server(self, worker, sock, ssl=None):
+    def create_server(self, worker, sock=None, ssl=None, address=None):
         '''Create the Server Protocol which will listen for requests. It
-uses the :meth:`protocol_consumer` method as the protocol consumer factory.'''
+uses the :meth:`protocol_consumer` method as the protocol consumer factory.
+
+The server listens on the shared ``sock`` or, when ``sock`` is not given,
+on a new ``SO_REUSEPORT`` socket bound to ``address``.'''
         cfg = self.cfg
-        server = TcpServer(worker.event_loop,
+        host, port = address or (None, None)
+        max_concurrent = cfg.max_concurrent_connections
+        server = TcpServer(worker.event_loop, host, port,
                            sock=sock,
                            consumer_factory=self.protocol_consumer(),
                            max_connections=cfg.max_requests,
+                           max_concurrent_connections=max_concurrent,
                            timeout=cfg.keep_alive,
                            name=self.name)
         for event in ('connection_made', 'pre_request', 'post_request',
@@ -272,5 +353,6 @@ uses the :meth:`protocol_consumer` method as the protocol consumer factory.'''
             callback = getattr(cfg, event)
             if callback != pass_through:
                 server.bind_event(event, callback)
-        server.start_serving(cfg.backlog, sslcontext=worker.params.ssl)
+        server.start_serving(cfg.backlog, sslcontext=worker.params.ssl,
+                             reuse_port=sock is None)
         return server
@@ -49,9 +49,14 @@ from pulsar.async.defer import (default_maybe_async, default_maybe_failure,
 from pulsar.utils.pep import get_event_loop
 
 
+class TxDeferred(pulsar.Deferred):    # pragma    nocover
+    '''A pulsar :class:`Deferred` wrapping a twisted deferred.'''
+    __slots__ = ('_twisted_deferred',)
+
+
 def _maybe_async(obj, **params):    # pragma    nocover
     if isinstance(obj, Deferred):
-        d = pulsar.Deferred()
+        d = TxDeferred()
         d._twisted_deferred = obj
         obj.addBoth(d.callback)
         obj = d
@@ -179,12 +179,18 @@ class WebSocketProtocol(ProtocolConsumer):
         * ``bytes`` - converted to a byte Frame
         * ``string`` - converted to a string Frame
         * a :class:`pulsar.utils.websocket.Frame`
+
+        :return: the result of :meth:`pulsar.ProtocolConsumer.drain`, a
+            :class:`pulsar.Deferred` when the client is not reading fast
+            enough, so that handlers can ``yield`` it before writing again.
          '''
         if not isinstance(frame, Frame):
             frame = self.parser.encode(frame)
         self.transport.write(frame.msg)
         if frame.is_close:
             self.finish()
+        else:
+            return self.drain()
 
     def ping(self, body=None):
         '''Write a ping ``frame``.
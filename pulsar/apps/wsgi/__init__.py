@@ -71,6 +71,28 @@ from .routers import *
 from .auth import *
 
 
+class WsgiSetting(pulsar.Setting):
+    virtual = True
+    app = 'wsgi'
+    section = "WSGI Servers"
+
+
+class MaxPendingRequests(WsgiSetting):
+    name = "max_pending_requests"
+    flags = ["--max-pending-requests"]
+    validator = pulsar.validate_pos_int
+    type = int
+    default = 0
+    desc = """\
+        The maximum number of requests a worker processes concurrently.
+
+        Once reached, new requests are answered with a
+        ``503 Service Unavailable`` response, without calling the
+        WSGI application, and their connection is closed. If 0 (the default)
+        requests are never rejected.
+        """
+
+
 class WSGIServer(SocketServer):
     '''A WSGI :class:`.SocketServer`.
     '''
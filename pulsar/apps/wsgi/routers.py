@@ -480,13 +480,20 @@ class MediaMixin(Router):
         if content_type:
             response.content_type = content_type
         response.encoding = encoding
+        environ = request.environ
         if not self.was_modified_since(
-                request.environ.get('HTTP_IF_MODIFIED_SINCE'),
+                environ.get('HTTP_IF_MODIFIED_SINCE'),
                 statobj[stat.ST_MTIME],
                 statobj[stat.ST_SIZE]):
             response.status_code = 304
         else:
-            response.content = open(fullpath, 'rb').read()
+            file_wrapper = environ.get('wsgi.file_wrapper')
+            if file_wrapper:
+                response.content = file_wrapper(open(fullpath, 'rb'))
+                response.headers['Content-Length'] = str(
+                    statobj[stat.ST_SIZE])
+            else:
+                response.content = open(fullpath, 'rb').read()
             response.headers["Last-Modified"] = http_date(
                 statobj[stat.ST_MTIME])
         return response
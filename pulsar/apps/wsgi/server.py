@@ -7,6 +7,14 @@ HTTP Protocol Consumer
    :member-order: bysource
 
 
+File Wrapper
+=========================
+
+.. autoclass:: FileWrapper
+   :members:
+   :member-order: bysource
+
+
 Testing WSGI Environ
 =========================
 
@@ -31,10 +39,12 @@ from pulsar.async.protocols import ProtocolConsumer
 from .utils import handle_wsgi_error, LOGGER, HOP_HEADERS
 
 
-__all__ = ['HttpServerResponse', 'MAX_CHUNK_SIZE', 'test_wsgi_environ']
+__all__ = ['HttpServerResponse', 'FileWrapper', 'MAX_CHUNK_SIZE',
+           'test_wsgi_environ']
 
 
 MAX_CHUNK_SIZE = 65536
+MAX_BUFFERED_BODY = 4*MAX_CHUNK_SIZE
 
 
 def test_wsgi_environ(url='/', method=None, headers=None, extra=None,
@@ -60,15 +70,62 @@ def test_wsgi_environ(url='/', method=None, headers=None, extra=None,
                         request_headers, headers, https=secure, extra=extra)
 
 
+class FileWrapper(object):
+    '''The ``wsgi.file_wrapper`` in the WSGI environ, see pep3333_.
+
+    Iterating over it reads ``filelike`` in blocks of ``block_size`` bytes.
+    When a WSGI application returns it, :class:`HttpServerResponse` sends
+    the file, from its current position, with
+    :meth:`pulsar.SocketStreamTransport.sendfile` instead, unless the
+    response uses chunked transfer encoding or ``filelike`` is not a
+    real file.
+
+    .. _pep3333: http://www.python.org/dev/peps/pep-3333/
+    '''
+    def __init__(self, filelike, block_size=MAX_CHUNK_SIZE):
+        self.filelike = filelike
+        self.block_size = block_size
+        if hasattr(filelike, 'close'):
+            self.close = filelike.close
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        data = self.filelike.read(self.block_size)
+        if data:
+            return data
+        raise StopIteration
+    next = __next__
+
+    def fileno(self):
+        '''The file descriptor of :attr:`filelike` or ``None``.'''
+        try:
+            return self.filelike.fileno()
+        except (AttributeError, IOError, ValueError):
+            return None
+
+
 class StreamReader:
+    '''The ``wsgi.input`` of the WSGI environ.
+
+    Body data is taken from the parser as it arrives. When more than
+    ``limit`` bytes are waiting to be read, the :attr:`transport` stops
+    reading the socket until the application reads them, so that slow
+    consumers of large uploads push back on the client.
+    '''
     _expect_sent = None
     _waiting = None
+    _maxbuf = None
+    _paused = False
 
-    def __init__(self, headers, parser, transport=None):
+    def __init__(self, headers, parser, transport=None, limit=None):
         self.headers = headers
         self.parser = parser
         self.transport = transport
-        self.buffer = b''
+        self.limit = limit or MAX_BUFFERED_BODY
+        self.buffer = []
+        self.buffer_size = 0
         self.on_message_complete = Deferred()
 
     def __repr__(self):
@@ -97,49 +154,89 @@ class StreamReader:
     def recv(self):
         '''Read bytes in the buffer.
         '''
-        if self.waiting_expect():
-            if self.parser.get_version() < (1, 1):
-                raise HttpException(status=417)
-            else:
-                msg = '%s 100 Continue\r\n\r\n' % self.protocol()
-                self._expect_sent = msg
-                self.transport.write(msg.encode(DEFAULT_CHARSET))
-        return self.parser.recv_body()
+        self._continue()
+        return self._getvalue(None)
 
     def read(self, maxbuf=None):
         '''Return bytes in the buffer.
 
-        If the stream is not yet ready, return a :class:`pulsar.Deferred`
+        If ``maxbuf`` is given, return ``maxbuf`` bytes, or less if the
+        message ends before, otherwise the whole body.
+        If the bytes are not yet available, return a :class:`pulsar.Deferred`
         which results in the bytes read.
         '''
         if not self._waiting:
-            body = self.recv()
-            if self.done():
-                return self._getvalue(body, maxbuf)
+            self._continue()
+            if self.done() or (maxbuf and self.buffer_size >= maxbuf):
+                return self._getvalue(maxbuf)
             else:
-                self._waiting = self.on_message_complete.then()
-                return self._waiting.add_callback(
-                    lambda r: self._getvalue(body, maxbuf))
-        else:
-            return self._waiting
+                self._maxbuf = maxbuf
+                self._waiting = Deferred()
+                # the application is waiting for data, keep reading
+                self._resume()
+        return self._waiting
 
     def fail(self):
         if self.waiting_expect():
             raise HttpException(status=417)
 
+    def resume(self):
+        '''Resume reading from the :attr:`transport` if paused.
+
+        Called once the response is finished.'''
+        self._resume()
+
     ##    INTERNALS
-    def _getvalue(self, body, maxbuf):
-        if self.buffer:
-            body = self.buffer + body
-        body = body + self.recv()
+    def _continue(self):
+        if self.waiting_expect():
+            if self.parser.get_version() < (1, 1):
+                raise HttpException(status=417)
+            else:
+                msg = '%s 100 Continue\r\n\r\n' % self.protocol()
+                self._expect_sent = msg
+                self.transport.write(msg.encode(DEFAULT_CHARSET))
+
+    def _getvalue(self, maxbuf):
+        body = b''.join(self.buffer)
         if maxbuf and len(body) > maxbuf:
-            body, self.buffer = body[:maxbuf], body[maxbuf:]
+            body, rest = body[:maxbuf], body[maxbuf:]
+            self.buffer = [rest]
+            self.buffer_size = len(rest)
+        else:
+            self.buffer = []
+            self.buffer_size = 0
+        if self.buffer_size <= self.limit:
+            self._resume()
         return body
 
+    def _pause(self):
+        transport = self.transport
+        if not self._paused and transport and not transport.closing:
+            self._paused = True
+            transport.pause_reading()
+
+    def _resume(self):
+        if self._paused:
+            self._paused = False
+            self.transport.resume_reading()
+
     def data_processed(self, protocol, data=None):
         '''Callback by the protocol when new body data is received.'''
-        if self.parser.is_message_complete():
+        body = self.parser.recv_body()
+        if body:
+            self.buffer.append(body)
+            self.buffer_size += len(body)
+        done = self.parser.is_message_complete()
+        if done and not self.on_message_complete.done():
             self.on_message_complete.callback(None)
+        waiting = self._waiting
+        if waiting is not None:
+            maxbuf = self._maxbuf
+            if done or (maxbuf and self.buffer_size >= maxbuf):
+                self._waiting = None
+                waiting.callback(self._getvalue(maxbuf))
+        elif not done and self.buffer_size > self.limit:
+            self._pause()
 
 
 def wsgi_environ(stream, address, client_address, request_headers,
@@ -165,6 +262,7 @@ def wsgi_environ(stream, address, client_address, request_headers,
                "wsgi.run_once": False,
                "wsgi.multithread": False,
                "wsgi.multiprocess": False,
+               "wsgi.file_wrapper": FileWrapper,
                "SERVER_SOFTWARE": server_software or pulsar.SERVER_SOFTWARE,
                "REQUEST_METHOD": native_str(parser.get_method()),
                "QUERY_STRING": parser.get_query_string(),
@@ -172,6 +270,9 @@ def wsgi_environ(stream, address, client_address, request_headers,
                "SERVER_PROTOCOL": protocol,
                "CONTENT_TYPE": ''}
     forward = client_address
+    if not isinstance(forward, tuple):
+        # a unix domain socket has no client address
+        forward = ('', '')
     script_name = os.environ.get("SCRIPT_NAME", "")
     for header, value in request_headers:
         header = header.lower()
@@ -269,10 +370,17 @@ class HttpServerResponse(ProtocolConsumer):
     .. attribute:: wsgi_callable
 
         The wsgi callable handling requests.
+
+    When the :ref:`max_pending_requests <setting-max_pending_requests>`
+    setting is positive and the server is already processing that many
+    requests, a new request is answered with ``503 Service Unavailable``
+    and the connection is closed, without invoking the :attr:`wsgi_callable`.
     '''
     _status = None
     _headers_sent = None
     _request_headers = None
+    _stream = None
+    _server = None
     SERVER_SOFTWARE = pulsar.SERVER_SOFTWARE
     ONE_TIME_EVENTS = ProtocolConsumer.ONE_TIME_EVENTS + ('on_headers',)
 
@@ -295,7 +403,15 @@ class HttpServerResponse(ProtocolConsumer):
         if p.execute(bytes(data), len(data)) == len(data):
             if self._request_headers is None and p.is_headers_complete():
                 self._request_headers = Headers(p.get_headers(), kind='client')
+                server = self.producer
+                if isinstance(server, pulsar.Server):
+                    limit = self.cfg.get('max_pending_requests')
+                    if limit and server.pending_requests >= limit:
+                        return self._shed_request(server)
+                    server.pending_requests += 1
+                    self._server = server
                 stream = StreamReader(self._request_headers, p, self.transport)
+                self._stream = stream
                 self.bind_event('data_processed', stream.data_processed)
                 environ = self.wsgi_environ(stream)
                 self.event_loop.async(self._response(environ))
@@ -431,13 +547,37 @@ class HttpServerResponse(ProtocolConsumer):
                 self.keep_alive = False
                 self.finish_wsgi()
 
+    def _shed_request(self, server):
+        # The server is overloaded, reply without building the environ
+        server.shed_requests += 1
+        self.keep_alive = False
+        self._status = '503 Service Unavailable'
+        self.headers.update([('Server', self.SERVER_SOFTWARE),
+                             ('Date', format_date_time(time.time())),
+                             ('Content-Length', '0')])
+        self.write(b'')
+        self.finish_wsgi()
+
     def _async_wsgi(self, wsgi_iter):
         if isinstance(wsgi_iter, (Deferred, Failure)):
             wsgi_iter = yield wsgi_iter
         try:
-            for b in wsgi_iter:
-                chunk = yield b     # handle asynchronous components
-                self.write(chunk)
+            iterator = iter(wsgi_iter)
+            fileno = None
+            if isinstance(iterator, FileWrapper) and self._status:
+                fileno = iterator.fileno()
+            if fileno is not None and not self.is_chunked():
+                # send the file without reading it
+                self.write(b'')
+                yield self.transport.sendfile(fileno,
+                                              iterator.filelike.tell(),
+                                              self.content_length)
+            else:
+                for b in iterator:
+                    chunk = yield b     # handle asynchronous components
+                    self.write(chunk)
+                    # wait for slow clients
+                    yield self.drain()
             # make sure we write headers
             self.write(b'', True)
         finally:
@@ -448,7 +588,16 @@ class HttpServerResponse(ProtocolConsumer):
                     LOGGER.exception('Error while closing wsgi iterator')
         self.finish_wsgi()
 
+    def finished(self, result=None):
+        server, self._server = self._server, None
+        if server is not None:
+            server.pending_requests -= 1
+        return super(HttpServerResponse, self).finished(result)
+
     def finish_wsgi(self):
+        if self._stream:
+            # the application may not have read the whole body
+            self._stream.resume()
         if not self.keep_alive:
             self.connection.close()
         self.finished()
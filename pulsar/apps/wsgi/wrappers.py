@@ -57,6 +57,7 @@ from .content import HtmlDocument
 from .utils import (set_wsgi_request_class, set_cookie, query_dict,
                     parse_accept_header)
 from .structures import ContentAccept, CharsetAccept, LanguageAccept
+from .server import FileWrapper
 
 
 __all__ = ['EnvironMixin', 'WsgiResponse',
@@ -225,7 +226,10 @@ class WsgiResponse(object):
         if self._started:
             raise RuntimeError('WsgiResponse can be iterated once only')
         self._started = True
-        if self.is_streamed:
+        if isinstance(self.content, FileWrapper):
+            # the server can send it without reading the file
+            return self.content
+        elif self.is_streamed:
             return wsgi_encoder(self.content, self.encoding or 'utf-8')
         else:
             return iter(self.content)
@@ -233,6 +237,13 @@ class WsgiResponse(object):
     def __len__(self):
         return len(self.content)
 
+    def close(self):
+        '''Close the :attr:`content` if it has a ``close`` method.
+
+        Called by the server once the response is sent.'''
+        if hasattr(self._content, 'close'):
+            self._content.close()
+
     def set_cookie(self, key, **kwargs):
         """
         Sets a cookie.
@@ -5,6 +5,7 @@ from .events import *
 from .proxy import *
 from .internet import *
 from .pollers import *
+from .resolver import *
 from .eventloop import *
 from .threads import *
 from .actor import *
@@ -15,4 +16,5 @@ from .stream import *
 from .clients import *
 from .concurrency import *
 from .queues import *
+from .channels import *
 from . import commands
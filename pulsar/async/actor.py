@@ -124,6 +124,18 @@ class Actor(EventHandler, Pulsar, ActorIdentity, Coverage):
 
         The socket address for this :attr:`Actor.mailbox`.
 
+    .. attribute:: mailbox_stats
+
+        The :class:`pulsar.async.mailbox.MailboxStats` of the messages
+        written by the mailbox connections of this actor.
+
+    .. attribute:: peers
+
+        The :class:`pulsar.async.mailbox.MailboxPeers` handling direct
+        connections with other actors when the
+        :ref:`peer_mailbox <setting-peer_mailbox>` setting is on, otherwise
+        ``None``.
+
     .. attribute:: proxy
 
         Instance of a :class:`ActorProxy` holding a reference
@@ -173,6 +185,8 @@ class Actor(EventHandler, Pulsar, ActorIdentity, Coverage):
     MANY_TIMES_EVENTS = ('on_info', 'on_params')
     exit_code = None
     mailbox = None
+    mailbox_stats = None
+    peers = None
     signal_queue = None
     next_periodic_task = None
 
@@ -360,9 +374,15 @@ status and performance. The dictionary contains the following entries:
 * ``actor`` a dictionary containing information regarding the type of actor
   and its status.
 * ``events`` a dictionary of information about the event loop running the
-  actor.
+  actor. It includes the :class:`EventLoopStats` info when the
+  :ref:`loop_stats <setting-loop_stats>` setting is enabled.
 * ``extra`` the :attr:`extra` attribute (which you can use to add stuff).
 * ``system`` system info.
+* ``mailbox`` the :class:`pulsar.async.mailbox.MailboxStats` info, with
+  the number and size of the batches of messages written and their flush
+  latency.
+* ``peers`` information about the direct connections with other actors,
+  available when :attr:`peers` is set.
 
 This method is invoked when you run the
 :ref:`info command <actor_info_command>` from another actor.
@@ -379,12 +399,19 @@ This method is invoked when you run the
                  'is_process': isp,
                  'age': self.impl.age}
         events = {'callbacks': len(self.event_loop._callbacks),
-                  'io_loops': self.event_loop.num_loops}
+                  'io_loops': self.event_loop.num_loops,
+                  'dns': self.event_loop.resolver.info()}
+        if self.event_loop.stats is not None:
+            events['stats'] = self.event_loop.stats.info()
         data = {'actor': actor,
                 'events': events,
                 'extra': self.extra}
         if isp:
             data['system'] = system.system_info(self.pid)
+        if self.mailbox_stats is not None:
+            data['mailbox'] = self.mailbox_stats.info()
+        if self.peers is not None:
+            data['peers'] = self.peers.info()
         self.fire_event('on_info', info=data)
         return data
 
@@ -420,6 +447,8 @@ This method is invoked when you run the
                 return command_in_context(action, self, actor, args, kwargs)
             elif isinstance(actor, ActorProxyMonitor):
                 mailbox = actor.mailbox
+            elif self.peers is not None:
+                mailbox = self.peers.mailbox(target) or mailbox
         if hasattr(mailbox, 'request'):
             #if not mailbox.closed:
             return mailbox.request(action, self, target, args, kwargs)
@@ -0,0 +1,269 @@
+'''An :class:`EventLoop` running on top of an asyncio_ event loop.
+
+Pulsar actors use this loop when the :ref:`event_loop <setting-event_loop>`
+setting is ``asyncio``. It requires python 3.4 or above, or trollius_ in
+python 2.
+
+The :class:`AsyncioEventLoop` keeps pulsar's API: callbacks, timers,
+transports and :class:`Deferred` work as usual. asyncio does the scheduling
+and I/O polling. Importing this module lets :func:`maybe_async` accept
+asyncio futures and convert them into :class:`Deferred`.
+Use :func:`to_future` to go the other way.
+
+.. _asyncio: http://docs.python.org/3/library/asyncio.html
+.. _trollius: https://pypi.python.org/pypi/trollius
+'''
+import sys
+import socket
+from functools import partial
+from inspect import isgenerator
+
+try:
+    import asyncio
+except ImportError:     # pragma    nocover
+    try:
+        import trollius as asyncio
+    except ImportError:
+        asyncio = None
+
+from pulsar.utils.exceptions import StopEventLoop, ImproperlyConfigured
+
+from .defer import (Deferred, Failure, maybe_async, default_maybe_async,
+                    default_maybe_failure, set_async)
+from .eventloop import EventLoop, TimedCall
+from .pollers import Poller, READ, WRITE
+from .stream import raise_socket_error
+
+
+__all__ = ['AsyncioEventLoop', 'from_future', 'to_future']
+
+
+class AsyncioPoller(Poller):
+    '''A :class:`Poller` which registers file descriptors with an asyncio
+    event loop.
+
+    Error events are not supported by asyncio. Errors are reported
+    through the read and write handlers.
+    '''
+    def __init__(self, loop):
+        super(AsyncioPoller, self).__init__()
+        self._loop = loop
+        self._event_loop = None
+
+    def install_waker(self, event_loop):
+        self._event_loop = event_loop
+        return self
+
+    def wake(self):
+        '''Waker implementation. Wake up the asyncio event loop.'''
+        self._loop.call_soon_threadsafe(_noop)
+
+    def unregister(self, fd):
+        if fd in self._handlers:
+            events = self._handlers.pop(fd)[0]
+            if events & READ:
+                self._loop.remove_reader(fd)
+            if events & WRITE:
+                self._loop.remove_writer(fd)
+        else:
+            raise IOError("fd %d not registered" % fd)
+
+    def poll(self, timeout=None):
+        raise RuntimeError('asyncio polls for events')
+
+    def _register(self, fd, events, old_events=None):
+        changed = events ^ (old_events or 0)
+        call = self._event_loop._call
+        if changed & READ:
+            if events & READ:
+                self._loop.add_reader(fd, call, self.handle_events,
+                                      self._event_loop, fd, READ)
+            else:
+                self._loop.remove_reader(fd)
+        if changed & WRITE:
+            if events & WRITE:
+                self._loop.add_writer(fd, call, self.handle_events,
+                                      self._event_loop, fd, WRITE)
+            else:
+                self._loop.remove_writer(fd)
+
+
+class AsyncioEventLoop(EventLoop):
+    '''A pulsar :class:`EventLoop` which delegates scheduling and I/O
+    polling to an asyncio event loop.
+
+    Pulsar transports, protocols and :class:`Deferred` run unchanged.
+    The file descriptors they register are polled by asyncio. Timers are
+    scheduled with the asyncio loop, including :meth:`call_timeout` and
+    :meth:`call_soon_idle`.
+
+    The :class:`TimingWheel`, :class:`EventLoopStats` and callback budgets
+    are not available. :attr:`num_loops` is always 0. Unlike
+    :meth:`EventLoop.run`, :meth:`run` runs until :meth:`stop` is called.
+
+    :param loop: optional asyncio event loop. If not provided a new one is
+        created.
+    '''
+    def __init__(self, loop=None, logger=None, iothreadloop=True):
+        if asyncio is None:     # pragma    nocover
+            raise ImproperlyConfigured('asyncio event loop requires python '
+                                       '3.4 or trollius')
+        loop = loop or asyncio.new_event_loop()
+        self._loop = loop
+        super(AsyncioEventLoop, self).__init__(io=AsyncioPoller(loop),
+                                               logger=logger,
+                                               timer=loop.time,
+                                               iothreadloop=iothreadloop)
+
+    @property
+    def asyncio_loop(self):
+        '''The asyncio event loop running this :class:`AsyncioEventLoop`.'''
+        return self._loop
+
+    def run_forever(self):
+        '''Run the asyncio event loop until :meth:`stop` is called.'''
+        if not self.running:
+            self._before_run()
+            try:
+                self._loop.run_forever()
+            except StopEventLoop:
+                # raised by a callback not scheduled via this event loop
+                pass
+            finally:
+                self._after_run()
+    run = run_forever
+
+    def call_soon(self, callback, *args):
+        timer = TimedCall(None, callback, args)
+        self._add_callback(timer)
+        return timer
+
+    def call_soon_idle(self, callback, *args):
+        '''Same as :meth:`call_soon`, asyncio has no priorities.'''
+        return self.call_soon(callback, *args)
+
+    def call_soon_threadsafe(self, callback, *args):
+        timer = TimedCall(None, callback, args)
+        self._loop.call_soon_threadsafe(self._call_timer, timer)
+        return timer
+
+    def has_callback(self, callback):
+        return callback._scheduler is self
+
+    def add_signal_handler(self, sig, callback, *args):
+        self._check_signal(sig)
+        handler = TimedCall(None, callback, args)
+        # pulsar signal handlers receive the signal number and frame
+        self._loop.add_signal_handler(sig, self._call, handler, sig, None)
+        return handler
+
+    def remove_signal_handler(self, sig):
+        self._check_signal(sig)
+        return self._loop.remove_signal_handler(sig)
+
+    #################################################    INTERNALS
+    # The asyncio handle of a timer is stored in the slot used by the
+    # TimingWheel for its bucket, the asyncio loop is its scheduler.
+    def _add_callback(self, timer):
+        timer._scheduler = self
+        timer._bucket = self._loop.call_soon(self._call_timer, timer)
+
+    def _add_timer(self, timer):
+        timer._scheduler = self
+        timer._bucket = self._loop.call_at(timer.deadline, self._call_timer,
+                                           timer)
+
+    def _timer_cancelled(self, timer):
+        timer._scheduler = None
+        if timer._bucket is not None:
+            timer._bucket.cancel()
+            timer._bucket = None
+
+    def _call_timer(self, timer):
+        timer._scheduler = None
+        timer._bucket = None
+        self._call(timer)
+
+    def _call(self, callback, *args):
+        # Run a pulsar callback from the asyncio event loop
+        exc_info = None
+        try:
+            value = callback(*args)
+        except StopEventLoop:
+            self._loop.stop()
+        except socket.error as e:
+            if raise_socket_error(e) and self.running:
+                exc_info = sys.exc_info()
+        except Exception:
+            exc_info = sys.exc_info()
+        else:
+            if isgenerator(value):
+                self.task_factory(value, event_loop=self)
+        if exc_info:
+            Failure(exc_info).log(
+                msg='Unhadled exception in event loop callback.')
+
+    def _before_run(self):
+        super(AsyncioEventLoop, self)._before_run()
+        if self._iothreadloop:
+            asyncio.set_event_loop(self._loop)
+
+
+def from_future(future):
+    '''Convert an asyncio ``future`` into a :class:`Deferred`.
+
+    Cancelling the :class:`Deferred` cancels the ``future``.
+    '''
+    d = Deferred(canceller=lambda d: future.cancel())
+    future.add_done_callback(partial(_future_done, d))
+    return d
+
+
+def to_future(value, loop=None):
+    '''Convert ``value`` into an asyncio future.
+
+    ``value`` can be a :class:`Deferred`, a coroutine or a synchronous
+    value. The future must be used in the thread where ``value`` is
+    called back.
+    '''
+    value = maybe_async(value)
+    if isinstance(value, asyncio.Future):
+        return value
+    future = asyncio.Future(loop=loop)
+    if isinstance(value, Deferred):
+        value.add_both(partial(_set_future, future))
+    else:
+        _set_future(future, value)
+    return future
+
+
+def _noop():
+    pass
+
+
+def _future_done(d, future):
+    if future.cancelled():
+        d.cancel()
+    elif not d.done():
+        exc = future.exception()
+        d.callback(future.result() if exc is None else exc)
+
+
+def _set_future(future, result):
+    if not future.done():
+        if isinstance(result, Failure):
+            future.set_exception(result.error)
+            result.mute()
+        else:
+            future.set_result(result)
+    return result
+
+
+def _maybe_async(obj, **params):
+    if isinstance(obj, asyncio.Future):
+        obj = from_future(obj)
+    return default_maybe_async(obj, **params)
+
+
+if asyncio is not None:
+    set_async(_maybe_async, default_maybe_failure)
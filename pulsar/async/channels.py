@@ -0,0 +1,248 @@
+'''Channels move bulk data, such as large task results or cached pages,
+between two actors without sending it through their mailboxes.
+
+A :class:`Channel` is a ring buffer in a memory-mapped file, in
+``/dev/shm`` when available, shared by the actors of a machine. It has a
+single producer, which writes records of bytes with :meth:`Channel.write`,
+and a single consumer, which reads them with the callback passed to
+:meth:`Channel.consume`. The consumer receives a view of each record in
+the shared memory, without copies. Once a record is written, the
+producer notifies the consumer with a ``channel_read`` message, sent via
+the mailbox at most once per event loop iteration.
+
+A channel is created by one actor, usually a :class:`pulsar.Monitor`, and
+passed to another one with a message: a pickled channel is the path of
+its file, which the other actor maps in its own memory::
+
+    channel = Channel(size=2**24)
+    yield send(worker, 'run', start_consumer, channel)
+    channel.write(data)
+
+.. autoclass:: Channel
+   :members:
+   :member-order: bysource
+'''
+import os
+import mmap
+import struct
+import tempfile
+
+from pulsar.utils.pep import ispy3k, get_ident, native_str, to_bytes
+
+from .access import get_actor
+
+__all__ = ['Channel']
+
+# The header of the file has the write and read positions and the id of
+# the consumer actor. Positions are offsets from the start of the channel
+# and only grow, the producer owns the first and the consumer the second.
+WRITTEN = struct.Struct('<Q')
+READ = struct.Struct('<Q')
+CONSUMER = struct.Struct('32s')
+HEADER_SIZE = 64
+# Each record starts with its length and is aligned to 8 bytes
+RECORD = struct.Struct('<Q')
+# The length of the record which marks the unused end of the buffer
+PADDING = 2**64 - 1
+SHM_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+# Channels consumed by the actors of this process, by name
+_consumers = {}
+
+
+def _align(size):
+    return (size + 7) & ~7
+
+
+def consumed_channel(name):
+    '''The :class:`Channel` ``name`` consumed by an actor of this process,
+    ``None`` if not available.'''
+    return _consumers.get(name)
+
+
+class Channel(object):
+    '''A single producer, single consumer channel for bulk data between
+actors, on a ring buffer in a memory-mapped file.
+
+:parameter size: the size in bytes of the ring buffer. The largest record
+    is about half of it.
+:parameter path: the path of the file of an existing channel. Used when a
+    channel is unpickled.
+
+.. attribute:: path
+
+    The path of the memory-mapped file.
+
+.. attribute:: size
+
+    The size in bytes of the ring buffer.
+'''
+    def __init__(self, size=2**20, path=None):
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix='pulsar-channel-',
+                                        dir=SHM_DIR)
+            os.close(fd)
+            size = _align(size)
+            with open(path, 'r+b') as f:
+                f.truncate(HEADER_SIZE + size)
+                self._memory = mmap.mmap(f.fileno(), HEADER_SIZE + size)
+            self._owner = True
+        else:
+            with open(path, 'r+b') as f:
+                size = os.fstat(f.fileno()).st_size - HEADER_SIZE
+                self._memory = mmap.mmap(f.fileno(), HEADER_SIZE + size)
+            self._owner = False
+        self.path = path
+        self.size = size
+        self._buffer = memoryview(self._memory) if ispy3k else None
+        self._callback = None
+        self._notify_scheduled = False
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(path=state['path'])
+
+    def __repr__(self):
+        return 'Channel(%s)' % self.name
+    __str__ = __repr__
+
+    @property
+    def name(self):
+        '''The unique name of this channel.'''
+        return os.path.basename(self.path)
+
+    @property
+    def max_size(self):
+        '''The maximum size in bytes of a record.'''
+        return self.size // 2 - RECORD.size
+
+    @property
+    def consumer(self):
+        '''The id of the actor consuming this channel, ``None`` if not
+        available.'''
+        aid = CONSUMER.unpack_from(self._memory, 16)[0].rstrip(b'\0')
+        return native_str(aid) if aid else None
+
+    @property
+    def closed(self):
+        '''``True`` if this channel was closed.'''
+        return self._memory is None
+
+    def write(self, data):
+        '''Write ``data`` bytes as a new record of this channel.
+
+        :return: ``True`` if the record was written, ``False`` if the ring
+            buffer does not have enough free space. In this case the data can
+            be sent again later, or via the mailbox.
+        '''
+        length = len(data)
+        if length > self.max_size:
+            raise ValueError('Cannot write %s bytes to %s. Maximum record '
+                             'size is %s.' % (length, self, self.max_size))
+        memory = self._memory
+        size = self.size
+        written = WRITTEN.unpack_from(memory, 0)[0]
+        free = size - written + READ.unpack_from(memory, 8)[0]
+        index = written % size
+        total = _align(RECORD.size + length)
+        tail = size - index
+        if total > tail:
+            # the record does not fit at the end of the buffer
+            if tail + total > free:
+                return False
+            RECORD.pack_into(memory, HEADER_SIZE + index, PADDING)
+            written += tail
+            index = 0
+        elif total > free:
+            return False
+        start = HEADER_SIZE + index
+        memory[start+RECORD.size:start+RECORD.size+length] = data
+        RECORD.pack_into(memory, start, length)
+        WRITTEN.pack_into(memory, 0, written + total)
+        self._notify_soon()
+        return True
+
+    def consume(self, callback, actor=None):
+        '''Consume this channel in ``actor``, the actor of the current
+        thread by default.
+
+        ``callback`` is called in the event loop of ``actor`` with a
+        view of each record, a :class:`memoryview` or a ``buffer`` in
+        python 2. The view must not be modified and is valid only until
+        ``callback`` returns, the record must be copied to be used later.'''
+        actor = actor or get_actor()
+        self._callback = callback
+        _consumers[self.name] = self
+        CONSUMER.pack_into(self._memory, 16, to_bytes(actor.aid))
+        # records written before the consumer was available
+        actor.event_loop.call_soon_threadsafe(self.read)
+
+    def read(self, callback=None):
+        '''Call ``callback``, or the callback of :meth:`consume`, with the
+        records available in this channel.
+
+        :return: the number of records read.
+        '''
+        callback = callback or self._callback
+        memory = self._memory
+        if memory is None:
+            return 0
+        size = self.size
+        read = READ.unpack_from(memory, 8)[0]
+        count = 0
+        while read != WRITTEN.unpack_from(memory, 0)[0]:
+            index = read % size
+            start = HEADER_SIZE + index
+            length = RECORD.unpack_from(memory, start)[0]
+            if length == PADDING:
+                read += size - index
+                READ.pack_into(memory, 8, read)
+            else:
+                count += 1
+                try:
+                    callback(self._view(start + RECORD.size, length))
+                finally:
+                    read += _align(RECORD.size + length)
+                    READ.pack_into(memory, 8, read)
+        return count
+
+    def close(self):
+        '''Close this channel. The file is removed when the channel
+        created by the :class:`Channel` constructor is closed.'''
+        if self._memory is not None:
+            if _consumers.get(self.name) is self:
+                _consumers.pop(self.name)
+            if self._buffer is not None:
+                self._buffer.release()
+                self._buffer = None
+            self._memory.close()
+            self._memory = None
+            if self._owner:
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass
+
+    def _view(self, start, length):
+        if self._buffer is not None:
+            return self._buffer[start:start+length]
+        else:
+            return buffer(self._memory, start, length)
+
+    def _notify_soon(self):
+        # Notify the consumer once per event loop iteration
+        actor = get_actor()
+        if actor is not None and not self._notify_scheduled:
+            self._notify_scheduled = True
+            event_loop = actor.event_loop
+            if getattr(event_loop, 'tid', None) == get_ident():
+                event_loop.call_soon(self._notify, actor)
+            else:
+                event_loop.call_soon_threadsafe(self._notify, actor)
+
+    def _notify(self, actor):
+        self._notify_scheduled = False
+        consumer = None if self._memory is None else self.consumer
+        if consumer:
+            actor.send(consumer, 'channel_read', self.name)
@@ -58,10 +58,18 @@ class Request(object):
 
     def connect(self, event_loop, connection):
         '''Called by a :class:`Client` when a new connection is needed.
+
+        The :attr:`address` is either a ``(host, port)`` tuple or the path
+        of a unix domain socket.
         '''
-        host, port = self.address
-        _, connection = yield event_loop.create_connection(
-            lambda: connection, host, port, ssl=self.ssl)
+        address = self.address
+        if isinstance(address, tuple):
+            host, port = address
+            _, connection = yield event_loop.create_connection(
+                lambda: connection, host, port, ssl=self.ssl)
+        else:
+            _, connection = yield event_loop.create_connection(
+                lambda: connection, path=address, ssl=self.ssl)
         # wait for the connection_made event
         yield connection.event('connection_made')
         # starts the new request
@@ -0,0 +1,225 @@
+'''Codecs used by the :mod:`pulsar.async.mailbox` to encode and decode
+the messages exchanged between actors.
+
+A message is a dictionary and its encoded body starts with the
+:attr:`MessageCodec.tag` of the codec which encoded it, so that a
+mailbox can always decode the messages it receives. Several messages can
+be encoded in one body by :meth:`MessageCodec.encode_batch`, in this case
+:func:`decode` returns a list of messages. The codec used to
+encode messages is negotiated when the mailbox connection is made: the
+:ref:`mailbox_codec <setting-mailbox_codec>` setting is used if the other
+end supports it, otherwise messages are pickled.
+
+.. autoclass:: MessageCodec
+   :members:
+   :member-order: bysource
+
+.. autoclass:: FastCodec
+   :members:
+   :member-order: bysource
+'''
+import sys
+import marshal
+from operator import itemgetter
+
+from pulsar import ProtocolError
+from pulsar.utils.structures import OrderedDict
+from pulsar.utils.pep import pickle
+
+
+CODECS = OrderedDict()
+
+MARSHAL_VERSION = marshal.version
+# Marshal versions above 2 write references to objects already written,
+# messages in a batch must not share objects
+BATCH_MARSHAL_VERSION = min(MARSHAL_VERSION, 2)
+# Fields of the messages encoded by the FastCodec, in order
+FIELDS = ('command', 'sender', 'target', 'ack', 'args', 'kwargs', 'result')
+
+
+__all__ = ['MessageCodec']
+
+
+class MessageCodec(object):
+    '''The interface for mailbox message codecs.'''
+    name = None
+    '''The name of the codec, used by the
+    :ref:`mailbox_codec <setting-mailbox_codec>` setting.'''
+    tag = None
+    '''The byte which starts the bodies encoded by this codec.'''
+    version = ''
+    '''The version of the encoding. Two mailboxes use this codec only if
+    they have the same version.'''
+
+    @property
+    def identity(self):
+        '''The identity of this codec in the mailbox handshake.'''
+        if self.version:
+            return '%s/%s' % (self.name, self.version)
+        else:
+            return self.name
+
+    def encode(self, data):
+        '''Encode the message ``data`` into bytes starting with
+        :attr:`tag`.'''
+        raise NotImplementedError
+
+    def encode_batch(self, messages):
+        '''Encode a list of ``messages`` into bytes starting with
+        :attr:`tag`.
+
+        The decoded messages must not share objects, as when they are
+        encoded one by one.'''
+        raise NotImplementedError
+
+    def decode(self, body):
+        '''Decode a ``body`` encoded by :meth:`encode` or
+        :meth:`encode_batch` into a message or a list of messages.'''
+        raise NotImplementedError
+
+
+class PickleCodec(MessageCodec):
+    '''Encode messages with the highest pickle protocol.
+
+    Pickle protocols above 1 start with the ``PROTO`` opcode which is the
+    tag of this codec.'''
+    name = 'pickle'
+    tag = b'\x80'
+
+    def encode(self, data):
+        return pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+
+    def encode_batch(self, messages):
+        # each message is pickled on its own
+        protocol = pickle.HIGHEST_PROTOCOL
+        return pickle.dumps([pickle.dumps(data, protocol)
+                             for data in messages], protocol)
+
+    def decode(self, body):
+        data = pickle.loads(body)
+        if isinstance(data, list):
+            return [pickle.loads(body) for body in data]
+        else:
+            return data
+
+
+class FastCodec(MessageCodec):
+    '''A compact and fast encoding for messages with the usual shape.
+
+    The values of the message fields (command, sender, target, ack,
+    args, kwargs and result) are encoded, without their keys, by the
+    :mod:`marshal` module, followed by a bit mask of the fields
+    available. Messages with other fields or with values which are
+    not built-in python types, such as a :class:`pulsar.Failure`, are
+    encoded by the :class:`PickleCodec`.'''
+    name = 'fast'
+    tag = b'm'
+    version = '%s.%s-%s' % (sys.version_info[0], sys.version_info[1],
+                            MARSHAL_VERSION)
+
+    def __init__(self):
+        self.fallback = PickleCodec()
+        self._getters = {}
+        self._fields = {}
+
+    def encode(self, data):
+        getter = self._getter(data)
+        if getter:
+            try:
+                return self.tag + marshal.dumps(getter(data),
+                                                MARSHAL_VERSION)
+            except ValueError:
+                pass
+        return self.fallback.encode(data)
+
+    def encode_batch(self, messages):
+        batch = []
+        for data in messages:
+            getter = self._getter(data)
+            if not getter:
+                break
+            batch.append(getter(data))
+        else:
+            try:
+                return self.tag + marshal.dumps(batch,
+                                                BATCH_MARSHAL_VERSION)
+            except ValueError:
+                pass
+        return self.fallback.encode_batch(messages)
+
+    def decode(self, body):
+        values = marshal.loads(body[1:])
+        if type(values) is list:
+            return [self._message(v) for v in values]
+        else:
+            return self._message(values)
+
+    def _message(self, values):
+        try:
+            fields = self._fields[values[-1]]
+        except KeyError:
+            mask = values[-1]
+            fields = self._fields[mask] = tuple(
+                (f for bit, f in enumerate(FIELDS) if mask & (1 << bit)))
+        return dict(zip(fields, values))
+
+    def _getter(self, data):
+        # A callable returning the values of the message fields followed
+        # by their mask, None if data has fields not in FIELDS
+        keys = tuple(data)
+        try:
+            return self._getters[keys]
+        except KeyError:
+            getter = self._getters[keys] = self._new_getter(data)
+            return getter
+
+    def _new_getter(self, data):
+        fields = tuple((f for f in FIELDS if f in data))
+        if len(fields) == len(data):
+            mask = sum((1 << bit for bit, f in enumerate(FIELDS)
+                        if f in data))
+            get = itemgetter(*fields)
+            if len(fields) == 1:
+                return lambda data: (get(data), mask)
+            else:
+                return lambda data: get(data) + (mask,)
+
+
+CODECS['fast'] = FastCodec
+CODECS['pickle'] = PickleCodec
+_decoders = {}
+
+
+def get_codec(name):
+    '''Return an instance of the codec registered with ``name``.'''
+    try:
+        return CODECS[name]()
+    except KeyError:
+        raise ValueError('Unknown mailbox codec "%s"' % name)
+
+
+def decode(body):
+    '''Decode a ``body`` with the codec which encoded it.
+
+    Return a message or a list of messages.'''
+    tag = body[0:1]
+    codec = _decoders.get(tag)
+    if codec is None:
+        for Codec in CODECS.values():
+            if Codec.tag == tag:
+                codec = _decoders[tag] = Codec()
+                break
+        else:
+            raise ProtocolError('Unknown message encoding')
+    return codec.decode(body)
+
+
+def negotiate(name, identities):
+    '''Return the codec ``name`` if its identity is in the ``identities``
+    supported by the other end of a mailbox connection, otherwise the
+    :class:`PickleCodec`.'''
+    codec = get_codec(name)
+    if codec.identity in identities:
+        return codec
+    else:
+        return PickleCodec()
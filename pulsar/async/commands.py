@@ -4,6 +4,7 @@ from pulsar import CommandError
 
 from .defer import async_while
 from .proxy import command, ActorProxyMonitor
+from .channels import consumed_channel
 
 
 @command()
@@ -68,6 +69,29 @@ The command perform the following actions:
     return t
 
 
+@command()
+def peer_address(request, aid):
+    '''Return the address of the peer mailbox of the actor with id ``aid``.
+
+    Used by :class:`pulsar.async.mailbox.MailboxPeers` to open direct
+    connections between actors. Return ``None`` if the actor is not known
+    or it does not serve a peer mailbox.'''
+    proxy = request.actor.get_actor(aid)
+    if isinstance(proxy, ActorProxyMonitor) and proxy.aid == aid:
+        return proxy.info.get('peers', {}).get('address')
+
+
+@command(ack=False)
+def channel_read(request, name):
+    '''Read the records available in the
+    :class:`pulsar.async.channels.Channel` ``name`` consumed by the actor.
+
+    Sent by the producer of the channel after writing records.'''
+    channel = consumed_channel(name)
+    if channel is not None:
+        channel.read()
+
+
 @command()
 def spawn(request, **kwargs):
     '''Spawn a new actor.'''
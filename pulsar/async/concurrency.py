@@ -3,14 +3,17 @@ from multiprocessing import Process, current_process
 
 from pulsar import system
 from pulsar.utils.security import gen_unique_id
+from pulsar.utils.internet import parse_address
 from pulsar.utils.pep import new_event_loop, itervalues
 
 from .proxy import ActorProxyMonitor, get_proxy
-from .access import get_actor, set_actor, remove_actor, logger
+from .access import (get_actor, set_actor, remove_actor, logger,
+                     process_local_data)
 from .threads import Thread
-from .mailbox import MailboxClient, MailboxConsumer, ProxyMailbox
+from .mailbox import (MailboxClient, MailboxConsumer, MailboxPeers,
+                      MailboxStats, ProxyMailbox, ThreadMailbox)
 from .defer import multi_async, maybe_failure, Failure, Deferred
-from .eventloop import signal, StopEventLoop
+from .eventloop import signal, StopEventLoop, EventLoopStats
 from .stream import TcpServer
 from .pollers import POLLERS
 from .consts import *
@@ -90,6 +93,22 @@ handler. By default it return nothing so that the best handler for the
 system is chosen.'''
         return POLLERS[self.cfg.poller]()
 
+    def create_event_loop(self, actor):
+        '''Create the :class:`EventLoop` for ``actor``.'''
+        cfg = self.cfg
+        if cfg.event_loop == 'asyncio':
+            from .aioloop import AsyncioEventLoop
+            return AsyncioEventLoop(logger=actor.logger)
+        stats = None
+        if cfg.loop_stats:
+            stats = EventLoopStats(slow_callback=cfg.slow_callback)
+        return new_event_loop(io=self.io_poller(), logger=actor.logger,
+                              poll_timeout=actor.params.poll_timeout,
+                              timing_wheel=cfg.timing_wheel,
+                              stats=stats,
+                              callback_budget=cfg.callback_budget,
+                              callback_time_budget=cfg.callback_time_budget)
+
     def run_actor(self, actor):
         '''Start running the ``actor``.'''
         actor.event_loop.run_forever()
@@ -129,11 +148,17 @@ system is chosen.'''
     def create_mailbox(self, actor, event_loop):
         '''Create the mailbox for ``actor``.'''
         set_actor(actor)
-        client = MailboxClient(actor.monitor.address, actor, event_loop)
+        client = self.mailbox_client(actor, event_loop)
+        if actor.cfg.peer_mailbox:
+            actor.peers = MailboxPeers(actor, event_loop)
         client.event_loop.call_soon_threadsafe(self.hand_shake, actor)
         client.bind_event('finish', lambda result: event_loop.stop())
         return client
 
+    def mailbox_client(self, actor, event_loop):
+        '''The client of the monitor mailbox for ``actor``.'''
+        return MailboxClient(actor.monitor.address, actor, event_loop)
+
     def periodic_task(self, actor):
         '''Implement the :ref:`actor period task <actor-periodic-task>`.
 
@@ -195,6 +220,8 @@ back with the acknowledgement from the monitor.
     def _stop_actor(self, actor):
         '''Exit from the :class:`Actor` domain.'''
         actor.state = ACTOR_STATES.CLOSE
+        if actor.peers is not None:
+            actor.peers.close()
         if actor.event_loop.is_running():
             actor.logger.debug('Closing mailbox')
             actor.mailbox.close()
@@ -213,8 +240,8 @@ class ProcessMixin(object):
         actor.start_coverage()
 
     def setup_event_loop(self, actor):
-        event_loop = new_event_loop(io=self.io_poller(), logger=actor.logger,
-                                    poll_timeout=actor.params.poll_timeout)
+        event_loop = self.create_event_loop(actor)
+        actor.mailbox_stats = MailboxStats()
         actor.mailbox = self.create_mailbox(actor, event_loop)
         proc_name = "%s-%s" % (actor.cfg.proc_name, actor)
         if system.set_proctitle(proc_name):
@@ -313,9 +340,15 @@ class ArbiterConcurrency(MonitorMixin, ProcessMixin, Concurrency):
         '''Override :meth:`Concurrency.create_mailbox` to create the
         mailbox server.
         '''
-        mailbox = TcpServer(event_loop, '127.0.0.1', 0,
-                            consumer_factory=MailboxConsumer,
-                            name='mailbox')
+        address = parse_address(actor.cfg.mailbox_address or '127.0.0.1:0')
+        if isinstance(address, tuple):
+            mailbox = TcpServer(event_loop, *address,
+                                consumer_factory=MailboxConsumer,
+                                name='mailbox')
+        else:
+            mailbox = TcpServer(event_loop, path=address,
+                                consumer_factory=MailboxConsumer,
+                                name='mailbox')
         # when the mailbox stop, close the event loop too
         mailbox.bind_event('stop', lambda _: event_loop.stop())
         mailbox.bind_event('start', lambda _: event_loop.call_soon_threadsafe(
@@ -409,10 +442,23 @@ class ActorThread(Concurrency, Thread):
 
     def setup_event_loop(self, actor):
         '''Create the event loop but don't install signals.'''
-        event_loop = new_event_loop(io=self.io_poller(), logger=actor.logger,
-                                    poll_timeout=actor.params.poll_timeout)
+        event_loop = self.create_event_loop(actor)
+        actor.mailbox_stats = MailboxStats()
         actor.mailbox = self.create_mailbox(actor, event_loop)
 
+    def mailbox_client(self, actor, event_loop):
+        '''Override :meth:`Concurrency.mailbox_client` to exchange
+        messages with the arbiter of this process via a
+        :class:`ThreadMailbox`.'''
+        arbiter = process_local_data('actor')
+        if (not actor.cfg.tcp_thread_mailbox and arbiter is not None and
+                arbiter.is_arbiter() and arbiter.is_running() and
+                arbiter.address == actor.monitor.address):
+            return ThreadMailbox(arbiter.address, event_loop,
+                                 arbiter.event_loop)
+        else:
+            return super(ActorThread, self).mailbox_client(actor, event_loop)
+
 
 concurrency_models = {'arbiter': ArbiterConcurrency,
                       'monitor': MonitorConcurrency,
@@ -60,6 +60,38 @@ DEFAULT_CONNECT_TIMEOUT = 10
 DEFAULT_ACCEPT_TIMEOUT = 10
 NUMBER_ACCEPTS = 30 if platform.type == "posix" else 1
 LOG_THRESHOLD_FOR_CONNLOST_WRITES = 5
+MIN_CANCELLED_TIMERS = 100
+'''Minimum number of cancelled callbacks in the :class:`pulsar.EventLoop`
+scheduled heap before the heap is compacted.'''
+CANCELLED_TIMERS_RATIO = 0.5
+'''The scheduled heap is compacted when the ratio of cancelled callbacks
+exceeds this value.'''
+DNS_CACHE_TTL = 300
+'''Number of seconds a name lookup is cached by the :class:`pulsar.Resolver`.
+'''
+DNS_NEGATIVE_CACHE_TTL = 5
+'''Number of seconds a failed name lookup is cached.'''
+DNS_CACHE_SIZE = 1000
+DNS_RESOLVER_THREADS = 4
+DRAIN_BUDGET = 1048576
+'''Maximum number of bytes a stream transport reads, or writes, in one go
+when the poller is edge-triggered. Once exhausted, the transport continues
+on the next loop iteration so that other connections are not starved.'''
+MIN_READ_CHUNK_SIZE = 4096
+'''Initial and minimum number of bytes a stream transport asks for in a read.
+The size doubles, up to the transport maximum, every time a read fills it and
+halves when a read returns less than a quarter of it.'''
+SENDFILE_CHUNK_SIZE = 262144
+'''Maximum number of bytes :meth:`pulsar.SocketStreamTransport.sendfile`
+sends in one system call. When the transport cannot use ``sendfile``, the
+file is read in chunks of this size.'''
+MAX_DATAGRAMS_PER_READ = 256
+'''Maximum number of datagrams a datagram transport reads on a read event.
+They are delivered to the protocol in one batch.'''
+WRITE_BUFFER_HIGH_WATER = 65536
+'''Default size, in bytes, of a stream transport write buffer above which
+the protocol is asked to pause writing. The default low water mark is a
+quarter of it.'''
 #
 # Globals
 EMPTY_TUPLE = ()
@@ -1,10 +1,11 @@
 import sys
 import traceback
+from functools import partial
 from collections import deque, namedtuple, Mapping
 from inspect import isgenerator, istraceback
 
 from pulsar.utils.pep import (iteritems, default_timer,
-                              get_event_loop, ispy3k)
+                              get_event_loop, get_ident, ispy3k)
 
 from .access import get_request_loop, logger
 from .consts import *
@@ -387,6 +388,7 @@ class Failure(object):
             failure.logged = True
 
     '''
+    __slots__ = ('exc_info',)
     _msg = 'Pulsar Asynchronous Failure'
 
     def __init__(self, exc_info):
@@ -395,6 +397,12 @@ class Failure(object):
     def __del__(self):
         self.log()
 
+    def __getstate__(self):
+        return self.exc_info
+
+    def __setstate__(self, state):
+        self.exc_info = state
+
     def __repr__(self):
         return ''.join(self.exc_info[2])
     __str__ = __repr__
@@ -501,15 +509,18 @@ which will be put off until later. It conforms with the
     this attribute when :meth:`done` is ``False`` will result in an
     ``AttributeError`` exception.
 """
-    paused = 0
-    _state = _PENDING
-    _runningCallbacks = False
-    _suppressAlreadyCalled = False
-    _timeout = None
-    _callbacks = None
-    _chained_to = None
+    __slots__ = ('paused', 'result', '_state', '_runningCallbacks',
+                 '_suppressAlreadyCalled', '_timeout', '_callbacks',
+                 '_chained_to', '_canceller', '_event_loop')
 
     def __init__(self, canceller=None, timeout=None, event_loop=None):
+        self.paused = 0
+        self._state = _PENDING
+        self._runningCallbacks = False
+        self._suppressAlreadyCalled = False
+        self._timeout = None
+        self._callbacks = None
+        self._chained_to = None
         self._canceller = canceller
         self._event_loop = event_loop
         if timeout:
@@ -557,7 +568,7 @@ can be set during initialisation.'''
                     "Incompatible event loop"
             # create the timeout. We don't cancel the timeout after
             # a callback is received since the result may be still asynchronous
-            self._timeout = event_loop.call_later(
+            self._timeout = event_loop.call_timeout(
                 timeout, self.cancel, 'timeout (%s seconds)' % timeout)
         return self
 
@@ -621,7 +632,7 @@ the :class:`Deferred` object.'''
         '''pep-3156_ API method, same as :meth:`callback`'''
         return self.callback(exc)
 
-    def add_callback(self, callback, errback=None, continuation=None):
+    def add_callback(self, callback, errback=None):
         '''Add a ``callback``, and an optional ``errback``.
 
         Add the two functions to the list of callbaks. Both of them take at
@@ -636,21 +647,18 @@ the :class:`Deferred` object.'''
             return
         if ((not callback or hasattr(callback, '__call__')) and
                 (not errback or hasattr(errback, '__call__'))):
-            if self._callbacks is None:
-                self._callbacks = deque()
-            self._callbacks.append(call_back(callback, errback, continuation))
-            self._run_callbacks()
+            self._add_callback(call_back(callback, errback, None))
         else:
             raise TypeError('callbacks must be callable or None')
         return self
 
-    def add_errback(self, errback, continuation=None):
+    def add_errback(self, errback):
         '''Same as :meth:`add_callback` but only for errors.'''
-        return self.add_callback(None, errback, continuation)
+        return self.add_callback(None, errback)
 
-    def add_both(self, callback, continuation=None):
+    def add_both(self, callback):
         '''Equivalent to `self.add_callback(callback, callback)`.'''
-        return self.add_callback(callback, callback, continuation)
+        return self.add_callback(callback, callback)
 
     def callback(self, result=None, state=None):
         '''Run registered callbacks with the given *result*.
@@ -668,11 +676,7 @@ this point, :meth:`add_callback` will run the *callbacks* immediately.
                 self._suppressAlreadyCalled = False
                 return self.result
             raise InvalidStateError
-        self.result = maybe_failure(result)
-        if not state:
-            state = (_CANCELLED if is_failure(self.result, CancelledError)
-                     else _FINISHED)
-        self._state = state
+        self._set_result(result, state)
         if self._callbacks:
             self._run_callbacks()
         return self.result
@@ -694,7 +698,7 @@ the result is a :class:`Failure`'''
         :return: this :class:`Deferred`
         '''
         deferred._chained_to = self
-        return self.add_both(deferred.callback, deferred.callback)
+        return self.add_both(deferred.callback)
 
     def then(self, deferred=None):
         '''Add another ``deferred`` to this :class:`Deferred` callbacks.
@@ -739,49 +743,102 @@ the result is a :class:`Failure`'''
             deferred.callback(result)
             return result
 
-        self.add_callback(cbk, cbk)
+        # deferred is the continuation of this callback, called back by
+        # _run_callbacks without nesting
+        self._add_callback(call_back(cbk, cbk, deferred))
         return deferred
 
     ##################################################    INTERNAL METHODS
+    def _add_callback(self, cbk):
+        if self._callbacks is None:
+            self._callbacks = deque()
+        self._callbacks.append(cbk)
+        self._run_callbacks()
+
+    def _set_result(self, result, state=None):
+        self.result = maybe_failure(result)
+        if not state:
+            state = (_CANCELLED if is_failure(self.result, CancelledError)
+                     else _FINISHED)
+        self._state = state
+
     def _run_callbacks(self):
         if not self.done() or self._runningCallbacks or self.paused:
             return
-        event_loop = self.event_loop
-        while self._callbacks:
-            callbacks = self._callbacks.popleft()
-            callback = callbacks[isinstance(self.result, Failure)]
-            if callback:
+        # Deferreds waiting for the result of the current one, either paused
+        # or created by then(), are pushed into the chain and run by this
+        # loop rather than by nested calls, so that long chains of deferreds
+        # do not grow the stack. Each entry of the chain is a deferred and,
+        # for a resumed deferred, the deferred which resumed it and which
+        # receives its final result.
+        chain = [(self, None)]
+        while chain:
+            current, source = chain[-1]
+            if current.paused or current._runningCallbacks:
+                chain.pop()
+                current._resumed(source)
+                continue
+            finished = True
+            event_loop = None
+            callbacks = current._callbacks
+            while callbacks:
+                cbk = callbacks.popleft()
+                target = cbk.continuation
+                if target is not None:
+                    if cbk.call is None:
+                        # target was paused waiting for current
+                        target.result = current.result
+                        target.paused -= 1
+                        chain.append((target, current))
+                        finished = False
+                        break
+                    elif not target.done():
+                        target._set_result(current.result)
+                        chain.append((target, None))
+                        finished = False
+                        break
+                callback = cbk[isinstance(current.result, Failure)]
+                if not callback:
+                    continue
+                if event_loop is None:
+                    event_loop = current.event_loop
                 try:
-                    self._runningCallbacks = True
+                    current._runningCallbacks = True
                     try:
-                        self.result = maybe_async(callback(self.result),
-                                                  event_loop=event_loop)
+                        current.result = maybe_async(callback(current.result),
+                                                     event_loop=event_loop)
                     finally:
-                        self._runningCallbacks = False
+                        current._runningCallbacks = False
                 except Exception:
-                    self.result = Failure(sys.exc_info())
+                    current.result = Failure(sys.exc_info())
                 else:
+                    result = current.result
                     # received an asynchronous instance, add a continuation
-                    if isinstance(self.result, Deferred):
-                        # Add a pause
-                        self._pause()
-                        # Add a callback to the result to resume callbacks
-                        self.result.add_both(self._continue, self)
+                    if isinstance(result, Deferred):
+                        current.paused += 1
+                        if result._callbacks is None:
+                            result._callbacks = deque()
+                        result._callbacks.append(call_back(None, None,
+                                                           current))
+                        if result.done():
+                            # current is paused, run result in its place
+                            chain[-1] = (result, source)
+                            finished = False
                         break
-
-    def _pause(self):
-        """Stop processing until :meth:`unpause` is called."""
-        self.paused += 1
-
-    def _unpause(self):
-        """Process all callbacks made since :meth:`pause` was called."""
-        self.paused -= 1
-        self._run_callbacks()
-
-    def _continue(self, result):
-        self.result = result
-        self._unpause()
-        return self.result
+            if finished:
+                chain.pop()
+                current._resumed(source)
+
+    def _resumed(self, source):
+        # The result of a deferred resumed by ``source`` is the result of
+        # source too. If it is a deferred, source waits for it.
+        if source is not None:
+            result = source.result = self.result
+            if isinstance(result, Deferred):
+                source.paused += 1
+                if result._callbacks is None:
+                    result._callbacks = deque()
+                result._callbacks.append(call_back(None, None, source))
 
 
 class Task(Deferred):
@@ -792,14 +849,12 @@ The callback will occur once the coroutine has finished
 Instances of :class:`Task` are never
 initialised directly, they are created by the :func:`maybe_async`
 function when a generator is passed as argument.'''
-    _waiting = None
+    __slots__ = ('_gen', '_waiting')
 
     def __init__(self, gen, event_loop, canceller=None, timeout=None):
+        super(Task, self).__init__(canceller, timeout, event_loop)
         self._gen = gen
-        self._event_loop = event_loop
-        self._canceller = canceller
-        if timeout:
-            self.set_timeout(timeout)
+        self._waiting = None
         self._consume(None)
 
     def _consume(self, result):
@@ -853,8 +908,14 @@ function when a generator is passed as argument.'''
 
     def _restart(self, result):
         self._waiting = None
-        # restart the coroutine in the same event loop it was started
-        self._event_loop.call_soon_threadsafe(self._consume, result)
+        # restart the coroutine in the same event loop it was started.
+        # When the result is available in the event loop thread there is
+        # no need to wake up the poller, the ready queue is enough.
+        event_loop = self._event_loop
+        if getattr(event_loop, 'tid', None) == get_ident():
+            event_loop.call_soon(self._consume, result)
+        else:
+            event_loop.call_soon_threadsafe(self._consume, result)
         # Important, this is a callback of a deferred, therefore we return
         # the passed result (which is synchronous).
         return result
@@ -872,13 +933,16 @@ class MultiDeferred(Deferred):
 
     The ``collection`` can be either a ``list`` or a ``dict``.
     '''
-    _locked = False
-    _time_locked = None
-    _time_finished = None
+    __slots__ = ('_pending', '_failures', '_mute_failures',
+                 '_raise_on_error', '_stream', '_locked', '_time_start',
+                 '_time_locked', '_time_finished')
 
     def __init__(self, data=None, type=None, raise_on_error=True,
                  mute_failures=False, **kwargs):
-        self._deferred = {}
+        self._locked = False
+        self._time_locked = None
+        self._time_finished = None
+        self._pending = 0
         self._failures = []
         self._mute_failures = mute_failures
         self._raise_on_error = raise_on_error
@@ -941,7 +1005,7 @@ If it was alread :attr:`locked` a runtime exception occurs.'''
                                ' cannot be locked twice.')
         self._time_locked = default_timer()
         self._locked = True
-        if not self._deferred:
+        if not self._pending:
             self._finish()
         return self
 
@@ -971,15 +1035,16 @@ both ``list`` and ``dict`` :attr:`type`.'''
                                ' cannot add a dependent once locked.')
         value = maybe_async(value)
         self._setitem(key, value)
-        # add callback if an asynchronous value
+        # Values already available only need storing, asynchronous values
+        # are counted and added a callback which stores their result
         if isinstance(value, Deferred):
-            self._deferred[key] = value
-            value.add_both(lambda result: self._deferred_done(key, result))
+            self._pending += 1
+            value.add_both(partial(self._deferred_done, key))
 
     def _deferred_done(self, key, result):
-        self._deferred.pop(key, None)
+        self._pending -= 1
         self._setitem(key, result)
-        if self._locked and not self._deferred and not self.done():
+        if self._locked and not self._pending and not self.done():
             self._finish()
         return result
 
@@ -987,10 +1052,10 @@ both ``list`` and ``dict`` :attr:`type`.'''
         if not self._locked:
             raise RuntimeError(self.__class__.__name__ +
                                ' cannot finish until completed.')
-        if self._deferred:
+        if self._pending:
             raise RuntimeError(self.__class__.__name__ +
                                ' cannot finish whilst waiting for '
-                               'dependents %r' % self._deferred)
+                               '%s dependents' % self._pending)
         self._time_finished = default_timer()
         if self.raise_on_error and self._failures:
             self.callback(self._failures[0])
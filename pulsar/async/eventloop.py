@@ -1,19 +1,22 @@
 import os
 import sys
 import socket
-from heapq import heappush, heappop
+from heapq import heappush, heappop, heapify
 from functools import partial
 from collections import deque
 from threading import current_thread
 from inspect import isgenerator
+from bisect import bisect_left
 try:
     import signal
 except ImportError:     # pragma    nocover
     signal = None
 
 from pulsar.utils.system import close_on_exec
+from pulsar.utils.config import (Global, validate_bool, validate_pos_int,
+                                 validate_pos_float)
 from pulsar.utils.pep import (default_timer, set_event_loop_policy,
-                              set_event_loop, range,
+                              set_event_loop, range, ispy26,
                               EventLoop as BaseEventLoop,
                               EventLoopPolicy as BaseEventLoopPolicy)
 from pulsar.utils.exceptions import StopEventLoop, ImproperlyConfigured
@@ -23,10 +26,13 @@ from .defer import Task, Deferred, Failure, TimeoutError
 from .stream import (create_connection, start_serving, sock_connect,
                      sock_accept, raise_socket_error)
 from .udp import create_datagram_endpoint
-from .consts import DEFAULT_CONNECT_TIMEOUT, DEFAULT_ACCEPT_TIMEOUT
+from .resolver import Resolver
+from .consts import (DEFAULT_CONNECT_TIMEOUT, DEFAULT_ACCEPT_TIMEOUT,
+                     MIN_CANCELLED_TIMERS, CANCELLED_TIMERS_RATIO)
 from .pollers import DefaultIO
 
-__all__ = ['EventLoop', 'TimedCall', 'run_in_loop_thread']
+__all__ = ['EventLoop', 'TimedCall', 'TimingWheel', 'EventLoopStats',
+           'run_in_loop_thread']
 
 
 def file_descriptor(fd):
@@ -100,10 +106,17 @@ it is created by :meth:`EventLoop.call_soon`, :meth:`EventLoop.call_later`,
 
     Flag indicating this callback is cancelled.
 """
+    # _scheduler is the event loop heap or the TimingWheel holding this
+    # callback. It is notified when the callback is cancelled.
+    __slots__ = ('_deadline', '_cancelled', '_callback', '_args',
+                 '_scheduler', '_bucket', '_tick')
+
     def __init__(self, deadline, callback, args):
         self.reschedule(deadline)
         self._callback = callback
         self._args = args
+        self._scheduler = None
+        self._bucket = None
 
     def __lt__(self, other):
         return self.deadline < other.deadline
@@ -130,7 +143,10 @@ it is created by :meth:`EventLoop.call_soon`, :meth:`EventLoop.call_later`,
 
     def cancel(self):
         '''Attempt to cancel the callback.'''
-        self._cancelled = True
+        if not self._cancelled:
+            self._cancelled = True
+            if self._scheduler is not None:
+                self._scheduler._timer_cancelled(self)
 
     def reschedule(self, new_deadline):
         self._deadline = new_deadline
@@ -142,6 +158,216 @@ it is created by :meth:`EventLoop.call_soon`, :meth:`EventLoop.call_later`,
             return self._callback(*args, **kwargs)
 
 
+class TimingWheel(object):
+    '''A hierarchical timing wheel for coarse grained timeouts.
+
+Callbacks are stored in buckets ``resolution`` seconds wide so that adding
+and cancelling a callback are ``O(1)`` operations, at the cost of
+firing up to ``resolution`` seconds late. It is used by
+:meth:`EventLoop.call_timeout` when the event loop is created with the
+``timing_wheel`` parameter.
+
+:param timer: the timer function of the :class:`EventLoop`.
+:param resolution: width in seconds of each bucket.
+:param slots: number of buckets in each wheel.
+:param levels: number of wheels. Deadlines beyond
+    ``resolution*slots**levels`` seconds cannot be handled by the
+    wheel and :meth:`add` returns ``False``.
+'''
+    def __init__(self, timer=None, resolution=0.1, slots=256, levels=3):
+        self.timer = timer or default_timer
+        self.resolution = resolution
+        self._slots = slots
+        self._levels = levels
+        self._wheels = [[set() for _ in range(slots)] for _ in range(levels)]
+        self._tick = self._to_tick(self.timer())
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, timer):
+        '''Add a :class:`TimedCall` to this wheel.
+
+        Return ``True`` if the ``timer`` was added, ``False`` if its
+        deadline is too far in the future.
+        '''
+        tick = max(self._to_tick(timer.deadline) + 1, self._tick + 1)
+        if self._insert(timer, tick):
+            timer._scheduler = self
+            self._size += 1
+            return True
+        return False
+
+    def advance(self, now):
+        '''Advance the wheel to time ``now``.
+
+        Return a list of :class:`TimedCall` which are due.
+        '''
+        now_tick = self._to_tick(now)
+        due = []
+        if not self._size:
+            self._tick = max(now_tick, self._tick)
+            return due
+        slots = self._slots
+        wheels = self._wheels
+        while self._tick < now_tick:
+            self._tick = tick = self._tick + 1
+            # cascade timers from the outer wheels, starting from the
+            # outermost one
+            for level in range(self._levels - 1, 0, -1):
+                span = slots ** level
+                if not tick % span:
+                    slot = (tick // span) % slots
+                    bucket = wheels[level][slot]
+                    if bucket:
+                        wheels[level][slot] = set()
+                        for timer in bucket:
+                            self._insert(timer, timer._tick)
+            slot = tick % slots
+            bucket = wheels[0][slot]
+            if bucket:
+                wheels[0][slot] = set()
+                for timer in bucket:
+                    timer._scheduler = None
+                    timer._bucket = None
+                self._size -= len(bucket)
+                due.extend(bucket)
+        return due
+
+    def clear(self):
+        for wheel in self._wheels:
+            for bucket in wheel:
+                bucket.clear()
+        self._size = 0
+
+    def _to_tick(self, when):
+        return int(when / self.resolution)
+
+    def _insert(self, timer, tick):
+        slots = self._slots
+        span = 1
+        for wheel in self._wheels:
+            if tick // span - self._tick // span < slots:
+                bucket = wheel[(tick // span) % slots]
+                bucket.add(timer)
+                timer._tick = tick
+                timer._bucket = bucket
+                return True
+            span *= slots
+        return False
+
+    def _timer_cancelled(self, timer):
+        timer._scheduler = None
+        if timer._bucket is not None:
+            timer._bucket.discard(timer)
+            timer._bucket = None
+            self._size -= 1
+
+
+class EventLoopStats(object):
+    '''Instrumentation of an :class:`EventLoop`.
+
+    When attached to an event loop, it records, at each iteration, the time
+    spent waiting for I/O events, handling them and running callbacks, the
+    number of callbacks ready and scheduled, and an histogram of the
+    durations of callbacks and I/O handlers.
+
+    :param slow_callback: callbacks and I/O handlers taking longer than
+        this number of seconds are logged as warnings. If ``0`` or ``None``
+        slow callbacks are not logged.
+
+    .. attribute:: buckets
+
+        Upper bounds, in seconds, of the callback durations histogram.
+    '''
+    buckets = (0.0001, 0.001, 0.01, 0.1, 1)
+
+    def __init__(self, slow_callback=None):
+        self.slow_callback = slow_callback
+        self.reset()
+
+    def reset(self):
+        '''Reset statistics.'''
+        self.iterations = 0
+        self.poll_time = 0
+        self.io_time = 0
+        self.callbacks_time = 0
+        self.max_iteration_time = 0
+        self.io_events = 0
+        self.callbacks = 0
+        self.slow_callbacks = 0
+        self.ready = 0
+        self.max_ready = 0
+        self.scheduled = 0
+        self.max_scheduled = 0
+        self.histogram = [0]*(len(self.buckets) + 1)
+
+    def iteration(self, poll_time, io_time, callbacks_time, ready,
+                  scheduled):
+        '''Record an event loop iteration.'''
+        self.iterations += 1
+        self.poll_time += poll_time
+        self.io_time += io_time
+        self.callbacks_time += callbacks_time
+        self.max_iteration_time = max(self.max_iteration_time,
+                                      poll_time + io_time + callbacks_time)
+        self.ready = ready
+        self.max_ready = max(self.max_ready, ready)
+        self.scheduled = scheduled
+        self.max_scheduled = max(self.max_scheduled, scheduled)
+
+    def callback(self, event_loop, callback, duration):
+        '''Record the ``duration`` of a ``callback`` run by ``event_loop``.
+        '''
+        self.callbacks += 1
+        self.histogram[bisect_left(self.buckets, duration)] += 1
+        if self.slow_callback and duration >= self.slow_callback:
+            self.slow_callbacks += 1
+            event_loop.logger.warning('Slow callback %r in %s took %.3f '
+                                      'seconds', callback.callback,
+                                      event_loop, duration)
+
+    def io_event(self, event_loop, fd, duration):
+        '''Record the ``duration`` of the handlers of I/O events on file
+        descriptor ``fd``.'''
+        self.io_events += 1
+        self.histogram[bisect_left(self.buckets, duration)] += 1
+        if self.slow_callback and duration >= self.slow_callback:
+            self.slow_callbacks += 1
+            try:
+                handlers = event_loop.io.handlers(fd)[1:]
+            except KeyError:
+                handlers = ()
+            event_loop.logger.warning(
+                'Slow I/O handler %r on file descriptor %s in %s took %.3f '
+                'seconds', [h.callback for h in handlers if h], fd,
+                event_loop, duration)
+
+    def info(self):
+        '''Dictionary of statistics.'''
+        iterations = self.iterations or 1
+        histogram = dict((('<=%gs' % b, n) for b, n in
+                          zip(self.buckets, self.histogram)))
+        histogram['>%gs' % self.buckets[-1]] = self.histogram[-1]
+        busy_time = self.io_time + self.callbacks_time
+        return {'iterations': self.iterations,
+                'poll_time': self.poll_time,
+                'io_time': self.io_time,
+                'callbacks_time': self.callbacks_time,
+                'mean_iteration_time': (self.poll_time + busy_time
+                                        )/iterations,
+                'max_iteration_time': self.max_iteration_time,
+                'io_events': self.io_events,
+                'callbacks': self.callbacks,
+                'slow_callbacks': self.slow_callbacks,
+                'ready': self.ready,
+                'max_ready': self.max_ready,
+                'scheduled': self.scheduled,
+                'max_scheduled': self.max_scheduled,
+                'callback_durations': histogram}
+
+
 class LoopingCall(object):
 
     def __init__(self, event_loop, callback, args, interval=None):
@@ -182,9 +408,9 @@ class LoopingCall(object):
             event_loop = self.event_loop
             if self.interval:
                 handler.reschedule(event_loop.timer() + self.interval)
-                heappush(event_loop._scheduled, handler)
+                event_loop._add_timer(handler)
             else:
-                self.event_loop._callbacks.append(self.handler)
+                event_loop._add_callback(handler)
 
 
 class EventLoop(BaseEventLoop):
@@ -205,6 +431,17 @@ class EventLoop(BaseEventLoop):
         The thread id where this event loop is running. If the
         event loop is not running this attribute is ``None``.
 
+    :param timing_wheel: optional ``True`` or a :class:`TimingWheel`.
+        If provided, :meth:`call_timeout` callbacks are handled by
+        the :class:`TimingWheel` rather than the scheduled heap.
+    :param stats: optional ``True`` or a :class:`EventLoopStats` for
+        instrumenting the event loop.
+    :param callback_budget: optional maximum number of callbacks run at
+        each iteration. Callbacks exceeding the budget are run at the next
+        iteration, after polling for I/O events.
+    :param callback_time_budget: optional number of seconds after which
+        the event loop stops running callbacks and polls for I/O events.
+        At least one callback is run at each iteration.
     """
     poll_timeout = 0.5
     tid = None
@@ -213,17 +450,32 @@ class EventLoop(BaseEventLoop):
     task_factory = Task
 
     def __init__(self, io=None, logger=None, poll_timeout=None, timer=None,
-                 iothreadloop=True):
+                 iothreadloop=True, timing_wheel=None, stats=None,
+                 callback_budget=None, callback_time_budget=None):
         self._io = io or DefaultIO()
         self.timer = timer or default_timer
         self.poll_timeout = poll_timeout if poll_timeout else self.poll_timeout
         self.logger = logger or LOGGER
         close_on_exec(self._io.fileno())
         self._iothreadloop = iothreadloop
+        if timing_wheel is True:
+            timing_wheel = TimingWheel(self.timer)
+        elif not isinstance(timing_wheel, TimingWheel):
+            timing_wheel = None
+        self._wheel = timing_wheel
+        if stats is True:
+            stats = EventLoopStats()
+        elif not isinstance(stats, EventLoopStats):
+            stats = None
+        self._stats = stats
+        self._callback_budget = callback_budget or None
+        self._callback_time_budget = callback_time_budget or None
         self.clear()
         self._name = None
         self._num_loops = 0
         self._default_executor = None
+        self._read_buffer = None
+        self._resolver = Resolver(self)
         self._waker = self._io.install_waker(self)
 
     def __repr__(self):
@@ -250,6 +502,12 @@ class EventLoop(BaseEventLoop):
 loop of the thread where it is run.'''
         return self._iothreadloop
 
+    @property
+    def resolver(self):
+        '''The :class:`Resolver` used by :meth:`getaddrinfo` and
+        :meth:`getnameinfo`.'''
+        return self._resolver
+
     @property
     def cpubound(self):
         '''If ``True`` this is a CPU bound event loop, otherwise it is an I/O
@@ -263,13 +521,42 @@ loop of the thread where it is run.'''
 
     @property
     def active(self):
-        return bool(self._callbacks or self._scheduled)
+        return bool(self._callbacks or self._idle_callbacks or
+                    self._scheduled or self._wheel)
+
+    @property
+    def timing_wheel(self):
+        '''The :class:`TimingWheel` used by :meth:`call_timeout` or ``None``.
+        '''
+        return self._wheel
+
+    @property
+    def stats(self):
+        '''The :class:`EventLoopStats` instrumenting this event loop or
+        ``None``.'''
+        return self._stats
 
     @property
     def num_loops(self):
         '''Total number of loops.'''
         return self._num_loops
 
+    def read_buffer(self, size):
+        '''A writable ``memoryview`` of at least ``size`` bytes shared by
+        the transports of this event loop.
+
+        Transports read into it and copy out the bytes received before
+        returning control to the event loop, so that a single buffer
+        serves all connections. On python 2.6, which has no
+        ``memoryview``, it is a ``bytearray``.'''
+        buffer = self._read_buffer
+        if buffer is None or len(buffer) < size:
+            buffer = bytearray(size)
+            if not ispy26:
+                buffer = memoryview(buffer)
+            self._read_buffer = buffer
+        return buffer
+
     #################################################    STARTING & STOPPING
     def run(self):
         '''Run the event loop until nothing left to do or stop() called.'''
@@ -338,7 +625,7 @@ Returns a :class:`TimedCall` with a :meth:`TimedCall.cancel` method
 that can be used to cancel the call.'''
         if when > self.timer():
             timeout = TimedCall(when, callback, args)
-            heappush(self._scheduled, timeout)
+            self._add_timer(timeout)
             return timeout
         else:
             return self.call_soon(callback, *args)
@@ -364,17 +651,46 @@ Any positional arguments after the callback will be passed to
 the callback when it is called.'''
         if seconds > 0:
             timeout = TimedCall(self.timer() + seconds, callback, args)
-            heappush(self._scheduled, timeout)
+            self._add_timer(timeout)
             return timeout
         else:
             return self.call_soon(callback, *args)
 
+    def call_timeout(self, seconds, callback, *args):
+        '''Same as :meth:`call_later` but for coarse grained timeouts.
+
+Timeouts are callbacks which are most likely cancelled before they are due,
+like the :meth:`Deferred.set_timeout` and idle connections timeouts.
+If the event loop has a :attr:`timing_wheel`, the callback is added to it,
+with ``O(1)`` cost for both scheduling and cancellation, and it may be
+called up to :attr:`TimingWheel.resolution` seconds late.
+Otherwise it is equivalent to :meth:`call_later`.'''
+        if self._wheel is not None and seconds > 0:
+            timeout = TimedCall(self.timer() + seconds, callback, args)
+            if self._wheel.add(timeout):
+                return timeout
+            self._add_timer(timeout)
+            return timeout
+        else:
+            return self.call_later(seconds, callback, *args)
+
     def call_soon(self, callback, *args):
         '''Equivalent to ``self.call_later(0, callback, *args)``.'''
         timeout = TimedCall(None, callback, args)
         self._callbacks.append(timeout)
         return timeout
 
+    def call_soon_idle(self, callback, *args):
+        '''Same as :meth:`call_soon` but for low priority callbacks.
+
+Idle callbacks are run after all callbacks ready at the start of the
+iteration, provided the ``callback_budget`` and ``callback_time_budget`` of
+this :class:`EventLoop` are not exhausted. Use it for background work, such
+as polling for tasks, which should not delay I/O callbacks.'''
+        timeout = TimedCall(None, callback, args)
+        self._idle_callbacks.append(timeout)
+        return timeout
+
     #################################################    THREAD INTERACTION
     def call_soon_threadsafe(self, callback, *args):
         '''Calls the given callback on the next I/O loop iteration.
@@ -401,10 +717,19 @@ to transfer control from other threads to the EventLoop's thread.'''
 
     #################################################    INTERNET NAME LOOKUPS
     def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
-        return socket.getaddrinfo(host, port, family, type, proto, flags)
+        '''Asynchronous equivalent of ``socket.getaddrinfo``.
+
+        Return a :class:`Deferred` called back with the list of address
+        informations. Lookups are performed by the :attr:`resolver`.'''
+        return self._resolver.getaddrinfo(host, port, family, type, proto,
+                                          flags)
 
     def getnameinfo(self, sockaddr, flags=0):
-        return socket.getnameinfo(sockaddr, flags)
+        '''Asynchronous equivalent of ``socket.getnameinfo``.
+
+        Return a :class:`Deferred` called back with a ``(host, port)``
+        tuple.'''
+        return self._resolver.getnameinfo(sockaddr, flags)
 
     #################################################    I/O CALLBACKS
     def add_reader(self, fd, callback, *args):
@@ -474,8 +799,9 @@ default signal handler ``signal.SIG_DFL``.'''
     #################################################    SOCKET METHODS
     def create_connection(self, protocol_factory, host=None, port=None,
                           ssl=None, family=0, proto=0, flags=0, sock=None,
-                          local_addr=None, timeout=None):
-        '''Creates a stream connection to a given internet host and port.
+                          local_addr=None, timeout=None, path=None):
+        '''Creates a stream connection to a given internet host and port,
+        or to the unix domain socket ``path``.
 
         It is the asynchronous equivalent of ``socket.create_connection``.
 
@@ -493,6 +819,8 @@ default signal handler ``signal.SIG_DFL``.'''
         :param local_addr: if supplied, it must be a 2-tuple
             ``(host, port)`` for the socket to bind to as its source address
             before connecting.
+        :param path: path of a unix domain socket to connect to. It can't
+            be specified with ``host``, ``port`` or ``sock``.
         :return: a :class:`Deferred` and its result on success is the
             ``(transport, protocol)`` pair.
 
@@ -501,13 +829,16 @@ default signal handler ``signal.SIG_DFL``.'''
         '''
         timeout = timeout or DEFAULT_CONNECT_TIMEOUT
         res = create_connection(self, protocol_factory, host, port,
-                                ssl, family, proto, flags, sock, local_addr)
+                                ssl, family, proto, flags, sock, local_addr,
+                                path)
         return self.async(res, timeout)
 
     def start_serving(self, protocol_factory, host=None, port=None, ssl=None,
                       family=socket.AF_UNSPEC, flags=socket.AI_PASSIVE,
-                      sock=None, backlog=100, reuse_address=None):
-        """Creates a TCP server bound to ``host`` and ``port``.
+                      sock=None, backlog=100, reuse_address=None,
+                      path=None, reuse_port=False):
+        """Creates a TCP server bound to ``host`` and ``port``, or a
+        server bound to the unix domain socket ``path``.
 
         :param protocol_factory: The :class:`Protocol` which handle server
             requests.
@@ -530,18 +861,32 @@ default signal handler ``signal.SIG_DFL``.'''
             ``TIME_WAIT`` state, without waiting for its natural timeout to
             expire. If not specified will automatically be set to ``True``
             on UNIX.
+        :param reuse_port: set ``SO_REUSEPORT`` on the sockets so that
+            several processes can bind the same address and the kernel
+            distributes connections among them.
+        :param path: path of a unix domain socket to bind to. A stale
+            socket file at ``path`` is removed. It can't be specified with
+            ``host``, ``port`` or ``sock``.
         :return: a :class:`Deferred` whose result will be a list of socket
             objects which will later be handled by ``protocol_factory``.
         """
         res = start_serving(self, protocol_factory, host, port, ssl,
-                            family, flags, sock, backlog, reuse_address)
+                            family, flags, sock, backlog, reuse_address,
+                            path, reuse_port)
         return self.async(res)
 
     def create_datagram_endpoint(self, protocol_factory, local_addr=None,
                                  remote_addr=None, family=socket.AF_UNSPEC,
-                                 proto=0, flags=0):
+                                 proto=0, flags=0, max_datagrams=None):
+        '''Create a datagram connection.
+
+        Returns a :class:`Deferred` called back with a
+        ``(transport, protocol)`` pair. ``max_datagrams`` is the maximum
+        number of datagrams delivered to the protocol on a read event.
+        '''
         res = create_datagram_endpoint(self, protocol_factory, local_addr,
-                                       remote_addr, family, proto, flags)
+                                       remote_addr, family, proto, flags,
+                                       max_datagrams)
         return self.async(res)
 
     def stop_serving(self, sock):
@@ -588,13 +933,20 @@ the event loop to poll with a 0 timeout all the times.'''
 
     def has_callback(self, callback):
         if callback.deadline:
+            if self._wheel is not None and callback._scheduler is self._wheel:
+                return True
             return callback in self._scheduled
         else:
-            return callback in self._callbacks
+            return (callback in self._callbacks or
+                    callback in self._idle_callbacks)
 
     def clear(self):
         self._callbacks = deque()
+        self._idle_callbacks = deque()
         self._scheduled = []
+        self._cancelled_timers = 0
+        if self._wheel is not None:
+            self._wheel.clear()
 
     def maybe_async(self, value):
         '''Run ``value`` in this event loop.
@@ -622,6 +974,28 @@ the event loop to poll with a 0 timeout all the times.'''
         return value
 
     #################################################    INTERNALS
+    def _add_callback(self, timer):
+        self._callbacks.append(timer)
+
+    def _add_timer(self, timer):
+        timer._scheduler = self
+        heappush(self._scheduled, timer)
+
+    def _timer_cancelled(self, timer):
+        self._cancelled_timers += 1
+
+    def _compact_scheduled(self):
+        # Remove cancelled callbacks from the scheduled heap
+        scheduled = []
+        for timer in self._scheduled:
+            if timer._cancelled:
+                timer._scheduler = None
+            else:
+                scheduled.append(timer)
+        heapify(scheduled)
+        self._scheduled = scheduled
+        self._cancelled_timers = 0
+
     def _before_run(self):
         ct = setid(self)
         self._name = ct.name
@@ -655,26 +1029,77 @@ the event loop to poll with a 0 timeout all the times.'''
         timeout = timeout or self.poll_timeout
         self._num_loops += 1
         #
+        # Remove cancelled callbacks from the heap if there are too many
+        if (self._cancelled_timers > MIN_CANCELLED_TIMERS and
+                self._cancelled_timers >
+                CANCELLED_TIMERS_RATIO*len(self._scheduled)):
+            self._compact_scheduled()
+        scheduled = self._scheduled
+        #
         # Compute the desired timeout
-        if self._callbacks:
+        if self._callbacks or self._idle_callbacks:
             timeout = 0
-        elif self._scheduled:
-            timeout = min(max(0, self._scheduled[0].deadline - self.timer()),
-                          timeout)
+        else:
+            if scheduled:
+                timeout = min(max(0, scheduled[0].deadline - self.timer()),
+                              timeout)
+            if self._wheel:
+                timeout = min(self._wheel.resolution, timeout)
         # poll events
-        self._poll(timeout)
+        stats = self._stats
+        if stats is None:
+            self._poll(timeout)
+        else:
+            clock = self.timer
+            start = clock()
+            poll_time = self._poll(timeout, stats)
+            io_time = clock() - start - poll_time
         #
         # append scheduled callback
         now = self.timer()
-        while self._scheduled and self._scheduled[0].deadline <= now:
-            self._callbacks.append(heappop(self._scheduled))
+        while scheduled and scheduled[0].deadline <= now:
+            timer = heappop(scheduled)
+            timer._scheduler = None
+            if timer._cancelled:
+                self._cancelled_timers -= 1
+            else:
+                self._callbacks.append(timer)
+        if self._wheel is not None:
+            self._callbacks.extend(self._wheel.advance(now))
         #
         # Run callbacks
         callbacks = self._callbacks
         todo = len(callbacks)
-        for i in range(todo):
+        budget = self._callback_budget
+        deadline = None
+        if self._callback_time_budget:
+            deadline = self.timer() + self._callback_time_budget
+        if stats is not None:
+            start = clock()
+        done = self._run_callbacks(callbacks, min(todo, budget or todo),
+                                   deadline, stats)
+        #
+        # Run idle callbacks if the budget allows it
+        idle = self._idle_callbacks
+        if (idle and done == todo and
+                (deadline is None or self.timer() < deadline)):
+            number = len(idle)
+            if budget:
+                number = min(number, budget - done)
+            self._run_callbacks(idle, number, deadline, stats)
+        if stats is not None:
+            stats.iteration(poll_time, io_time, clock() - start, todo,
+                            len(self._scheduled))
+
+    def _run_callbacks(self, callbacks, number, deadline, stats=None):
+        # Run ``number`` callbacks from the ``callbacks`` queue, stopping
+        # once past ``deadline``. Return the number of callbacks run.
+        clock = self.timer
+        for i in range(number):
             exc_info = None
             callback = callbacks.popleft()
+            if stats is not None:
+                callback_start = clock()
             try:
                 value = callback()
             except socket.error as e:
@@ -690,10 +1115,20 @@ the event loop to poll with a 0 timeout all the times.'''
             if exc_info:
                 Failure(exc_info).log(
                     msg='Unhadled exception in event loop callback.')
-
-    def _poll(self, timeout):
-        callbacks = self._callbacks
+            if stats is not None:
+                stats.callback(self, callback, clock() - callback_start)
+            if deadline is not None and clock() >= deadline:
+                return i + 1
+        return number
+
+    def _poll(self, timeout, stats=None):
+        # Poll for I/O events and run their handlers. When ``stats`` is
+        # given, handlers are timed and the time spent waiting for events
+        # is returned.
         io = self._io
+        if stats is not None:
+            clock = self.timer
+            start = clock()
         try:
             event_pairs = io.poll(timeout)
         except Exception as e:
@@ -702,8 +1137,97 @@ the event loop to poll with a 0 timeout all the times.'''
         except KeyboardInterrupt:
             raise StopEventLoop
         else:
+            if stats is None:
+                for fd, events in event_pairs:
+                    try:
+                        io.handle_events(self, fd, events)
+                    except KeyError:
+                        pass
+                return
+            poll_time = clock() - start
             for fd, events in event_pairs:
+                start = clock()
                 try:
                     io.handle_events(self, fd, events)
                 except KeyError:
                     pass
+                stats.io_event(self, fd, clock() - start)
+            return poll_time
+        if stats is not None:
+            return clock() - start
+
+
+class TimingWheelSetting(Global):
+    name = "timing_wheel"
+    flags = ["--timing-wheel"]
+    validator = validate_bool
+    action = "store_true"
+    default = False
+    desc = """\
+        Use a timing wheel for coarse grained timeouts.
+
+        When enabled, actors event loops schedule :class:`Deferred`
+        timeouts and idle connection timeouts on a :class:`TimingWheel`
+        rather than the scheduled heap. This reduces the cost of
+        scheduling and cancelling timeouts when serving a large number of
+        connections.
+        """
+
+
+class LoopStatsSetting(Global):
+    name = "loop_stats"
+    flags = ["--loop-stats"]
+    validator = validate_bool
+    action = "store_true"
+    default = False
+    desc = """\
+        Instrument actors event loops with :class:`EventLoopStats`.
+
+        Statistics are reported in the ``events`` entry of the
+        :ref:`info command <actor_info_command>`.
+        """
+
+
+class SlowCallbackSetting(Global):
+    name = "slow_callback"
+    flags = ["--slow-callback"]
+    validator = validate_pos_float
+    type = float
+    default = 0.1
+    meta = "SECONDS"
+    desc = """\
+        Log callbacks taking longer than this number of seconds.
+
+        Only used when :ref:`loop_stats <setting-loop_stats>` is enabled.
+        Set to 0 to disable logging of slow callbacks.
+        """
+
+
+class CallbackBudgetSetting(Global):
+    name = "callback_budget"
+    flags = ["--callback-budget"]
+    validator = validate_pos_int
+    type = int
+    default = 0
+    desc = """\
+        Maximum number of callbacks run at each event loop iteration.
+
+        Callbacks exceeding the budget are run after the event loop has
+        polled for I/O events. Set to 0 for no limit.
+        """
+
+
+class CallbackTimeBudgetSetting(Global):
+    name = "callback_time_budget"
+    flags = ["--callback-time-budget"]
+    validator = validate_pos_float
+    type = float
+    default = 0
+    meta = "SECONDS"
+    desc = """\
+        Maximum time, in seconds, spent running callbacks at each event loop
+        iteration.
+
+        Once exceeded, the event loop polls for I/O events before running
+        the remaining callbacks. Set to 0 for no limit.
+        """
@@ -1,8 +1,9 @@
 from inspect import isgenerator
+from itertools import chain
 
 from pulsar.utils.pep import itervalues
 
-from .defer import Deferred, maybe_async
+from .defer import Deferred, maybe_async, maybe_failure
 from .access import logger
 
 
@@ -11,6 +12,7 @@ __all__ = ['EventHandler', 'Event']
 
 class Event(object):
     '''An event managed by an :class:`EventHandler` class.'''
+    __slots__ = ()
     _silenced = False
 
     @property
@@ -52,10 +54,12 @@ class Event(object):
 
 
 class ManyEvent(Event):
+    __slots__ = ('name', '_handlers', '_silenced')
 
     def __init__(self, name):
         self.name = name
         self._handlers = []
+        self._silenced = False
 
     def __repr__(self):
         return repr(self._handlers)
@@ -80,11 +84,13 @@ class ManyEvent(Event):
 
 
 class OneTime(Deferred, Event):
+    __slots__ = ('name', '_events', '_silenced')
 
     def __init__(self, name):
         super(OneTime, self).__init__()
         self.name = name
         self._events = Deferred()
+        self._silenced = False
 
     def bind(self, callback, errback=None):
         self._events.add_callback(callback, errback)
@@ -98,7 +104,7 @@ class OneTime(Deferred, Event):
                 logger().warning('Event "%s" already fired for %s',
                                  self.name, arg)
             else:
-                assert not kwargs, ("One time events can don't support "
+                assert not kwargs, ("One time events don't support "
                                     "key-value parameters")
                 result = self._events.callback(arg)
                 if isinstance(result, Deferred):
@@ -116,34 +122,66 @@ class OneTime(Deferred, Event):
             return self.callback(result)
 
 
+class FiredEvent(object):
+    '''A one time event fired when nobody was listening.
+
+    It holds the result of the event until the :class:`OneTime` event is
+    requested, if ever.
+    '''
+    __slots__ = ('result',)
+
+    def __init__(self, result):
+        self.result = result
+
+
+def event_types(one_time_events, many_times_events):
+    '''Dictionary mapping event names to their :class:`Event` class.'''
+    types = dict(((e, OneTime) for e in one_time_events))
+    types.update(((e, ManyEvent) for e in many_times_events))
+    return types
+
+
+# Event types of EventHandler classes, built once per class
+_class_event_types = {}
+
+
 class EventHandler(object):
     '''A Mixin for handling events.
 
     It handles one time events and events that occur several
     times. This mixin is used in :class:`Protocol` and :class:`Producer`
     for scheduling connections and requests.
+
+    Events are created the first time they are accessed via the
+    :meth:`event` or :meth:`bind_event` methods. Firing an event nobody
+    is bound to does not create it.
     '''
+    __slots__ = ('_events', '_event_types')
     ONE_TIME_EVENTS = ()
     '''Event names which occur once only.'''
     MANY_TIMES_EVENTS = ()
     '''Event names which occur several times.'''
     def __init__(self, one_time_events=None, many_times_events=None):
-        one = self.ONE_TIME_EVENTS
-        if one_time_events:
-            one = set(one)
-            one.update(one_time_events)
-        events = dict(((e, OneTime(e)) for e in one))
-        many = self.MANY_TIMES_EVENTS
-        if many_times_events:
-            many = set(many)
-            many.update(many_times_events)
-        events.update(((e, ManyEvent(e)) for e in many))
-        self._events = events
+        if one_time_events or many_times_events:
+            types = event_types(
+                chain(self.ONE_TIME_EVENTS, one_time_events or ()),
+                chain(self.MANY_TIMES_EVENTS, many_times_events or ()))
+        else:
+            cls = type(self)
+            types = _class_event_types.get(cls)
+            if types is None:
+                types = event_types(self.ONE_TIME_EVENTS,
+                                    self.MANY_TIMES_EVENTS)
+                _class_event_types[cls] = types
+        self._event_types = types
+        self._events = {}
 
     @property
     def events(self):
         '''The dictionary of all events.
         '''
+        for name in self._event_types:
+            self.event(name)
         return self._events
 
     def event(self, name):
@@ -151,7 +189,16 @@ class EventHandler(object):
 
         If no event is registered returns nothing.
         '''
-        return self._events.get(name)
+        event = self._events.get(name)
+        if event is None:
+            event_type = self._event_types.get(name)
+            if event_type:
+                event = self._events[name] = event_type(name)
+        elif isinstance(event, FiredEvent):
+            fired, event = event, OneTime(name)
+            self._events[name] = event
+            event.fire(fired.result)
+        return event
 
     def bind_event(self, name, callback, errback=None):
         '''Register a ``callback`` with ``event``.
@@ -166,9 +213,9 @@ class EventHandler(object):
             can also be a list/tuple of callables.
         :return: nothing.
         '''
-        if name not in self._events:
-            self._events[name] = ManyEvent(name)
-        event = self._events[name]
+        event = self.event(name)
+        if event is None:
+            event = self._events[name] = ManyEvent(name)
         if isinstance(callback, (list, tuple)):
             assert errback is None, "list of callbacks with errback"
             for cbk in callback:
@@ -179,7 +226,7 @@ class EventHandler(object):
     def bind_events(self, **events):
         '''Register all known events found in ``events`` key-valued parameters.
         '''
-        for name in self._events:
+        for name in set(chain(self._event_types, self._events)):
             if name in events:
                 self.bind_event(name, events[name])
 
@@ -199,10 +246,23 @@ class EventHandler(object):
         """
         if arg is None:
             arg = self
-        if name in self._events:
-            return self._events[name].fire(arg, **kwargs)
+        event = self._events.get(name)
+        if event is None:
+            event_type = self._event_types.get(name)
+            if event_type is OneTime:
+                # Nobody is listening, keep the result for the OneTime
+                # event, created only if someone asks for it
+                assert not kwargs, ("One time events don't support "
+                                    "key-value parameters")
+                result = maybe_failure(arg)
+                self._events[name] = FiredEvent(result)
+                return result
+            elif event_type is None:
+                logger().warning('Unknown event "%s" for %s', name, self)
         else:
-            logger().warning('Unknown event "%s" for %s', name, self)
+            if isinstance(event, FiredEvent):
+                event = self.event(name)
+            return event.fire(arg, **kwargs)
 
     def silence_event(self, name):
         '''Silence event ``name``.
@@ -210,7 +270,7 @@ class EventHandler(object):
         This causes the event not to fire at the :meth:`fire_event` method
         is invoked with the event ``name``.
         '''
-        event = self._events.get(name)
+        event = self.event(name)
         if event:
             event.silence()
 
@@ -220,9 +280,9 @@ class EventHandler(object):
         :param other: an :class:`EventHandler` to chain to.
         :param name: event name to chain.
         '''
-        event = self._events.get(name)
+        event = self.event(name)
         if event and isinstance(other, EventHandler):
-            event2 = other._events.get(name)
+            event2 = other.event(name)
             if event2:
                 event.chain(event2)
 
@@ -233,10 +293,9 @@ class EventHandler(object):
         provided the events handlers already exist.
         '''
         if isinstance(other, EventHandler):
-            events = self._events
-            for event in itervalues(other._events):
-                if isinstance(event, ManyEvent):
-                    ev = events.get(event.name)
+            for event in list(itervalues(other._events)):
+                if isinstance(event, ManyEvent) and event._handlers:
+                    ev = self.event(event.name)
                     # If the event is available add it
                     if ev:
                         for callback in event._handlers:
@@ -1,12 +1,11 @@
 import socket
-from collections import deque
 
 from pulsar.utils.internet import nice_address, BUFFER_MAX_SIZE
 
 from .access import logger
 
-__all__ = ['BaseProtocol', 'Protocol', 'DatagramProtocol',
-           'Transport', 'SocketTransport']
+__all__ = ['BaseProtocol', 'Protocol', 'BufferedProtocol',
+           'DatagramProtocol', 'Transport', 'SocketTransport']
 
 
 AF_INET6 = getattr(socket, 'AF_INET6', 0)
@@ -17,7 +16,7 @@ if hasattr(socket, 'AF_UNIX'):
     FAMILY_NAME[socket.AF_UNIX] = 'UNIX'
 
 
-class BaseProtocol:
+class BaseProtocol(object):
     """ABC for base protocol class.
 
     Usually user implements protocols that derived from BaseProtocol
@@ -26,6 +25,8 @@ class BaseProtocol:
     The only case when BaseProtocol should be implemented directly is
     write-only transport like write pipe
     """
+    __slots__ = ()
+
     def connection_made(self, transport):
         """Called when a connection is made.
 
@@ -42,6 +43,18 @@ class BaseProtocol:
         aborted or closed).
         """
 
+    def pause_writing(self):
+        """Called when the transport's write buffer goes over the high
+        water mark.
+
+        The protocol should stop writing until :meth:`resume_writing` is
+        called. Data written in the meantime is still buffered.
+        """
+
+    def resume_writing(self):
+        """Called when the transport's write buffer drains below the low
+        water mark."""
+
 
 class Protocol(BaseProtocol):
     """ABC representing a protocol for a stream.
@@ -63,6 +76,8 @@ class Protocol(BaseProtocol):
 
       start -> CM [-> DR*] [-> ER?] -> CL -> end
     """
+    __slots__ = ()
+
     def data_received(self, data):
         """Called when some data is received.
 
@@ -80,12 +95,47 @@ class Protocol(BaseProtocol):
         """
 
 
+class BufferedProtocol(Protocol):
+    """A :class:`Protocol` which receives data into buffers it provides.
+
+    Stream transports read directly into the buffer returned by
+    :meth:`get_buffer` and then call :meth:`buffer_updated`, rather than
+    calling :meth:`Protocol.data_received` with a new bytes object.
+    """
+    __slots__ = ()
+
+    def get_buffer(self, sizehint):
+        """Return a writable buffer, for example a ``memoryview`` of a
+        ``bytearray``, where the transport reads incoming data.
+
+        ``sizehint`` is the number of bytes the transport would like to
+        read. The buffer can be smaller or larger but must not be empty.
+        """
+        raise NotImplementedError
+
+    def buffer_updated(self, nbytes):
+        """Called when ``nbytes`` bytes were written into the buffer
+        returned by :meth:`get_buffer`."""
+
+
 class DatagramProtocol(BaseProtocol):
     """ABC representing a datagram protocol."""
+    __slots__ = ()
 
     def datagram_received(self, data, addr):
         """Called when some datagram is received."""
 
+    def datagrams_received(self, datagrams):
+        """Called with a list of ``(data, addr)`` datagrams received on
+        a read event.
+
+        The default implementation calls :meth:`datagram_received` for
+        each datagram. Protocols handling many small datagrams should
+        override it and process the whole batch at once.
+        """
+        for data, addr in datagrams:
+            self.datagram_received(data, addr)
+
     def connection_refused(self, exc):
         """Connection is refused."""
 
@@ -112,6 +162,8 @@ class Transport(object):
 
         The :class:`Protocol` for this :class:`Transport`.
     '''
+    __slots__ = ()
+
     def get_extra_info(self, name, default=None):
         return default
 
@@ -128,6 +180,9 @@ class SocketTransport(Transport):
     :attr:`Transport.protocol` that the connection is available via the
     :meth:`BaseProtocol.connection_made` method.
     '''
+    __slots__ = ('_protocol', '_sock', '_sock_fd', '_event_loop', '_closing',
+                 '_extra', '_read_chunk_size', '_read_buffer', '_conn_lost',
+                 '_consecutive_writes', '_write_buffer', 'logger')
     SocketError = socket.error
 
     def __init__(self, event_loop, sock, protocol, extra=None,
@@ -140,16 +195,18 @@ class SocketTransport(Transport):
         self._closing = False
         self._extra = extra or {}
         self._read_chunk_size = read_chunk_size or BUFFER_MAX_SIZE
-        self._read_buffer = []
+        # buffers are created when needed, most connections are idle
+        self._read_buffer = None
         self._conn_lost = 0
         self._consecutive_writes = 0
-        self._write_buffer = deque()
+        self._write_buffer = None
         self.logger = logger(event_loop)
         self._do_handshake()
 
     def __repr__(self):
         address = self.address
-        if address:
+        # the address of an unbound unix socket is an empty string
+        if address is not None:
             family = FAMILY_NAME.get(self._sock.family, 'UNKNOWN')
             return nice_address(address, family)
         else:
@@ -198,7 +255,12 @@ class SocketTransport(Transport):
     def get_extra_info(self, name, default=None):
         if name == 'socket':
             name = 'sock'
-        return self.__dict__.get('_%s' % name, default)
+        name = '_%s' % name
+        for cls in type(self).__mro__:
+            if name in cls.__dict__.get('__slots__', ()):
+                return getattr(self, name, default)
+        # subclasses without __slots__
+        return getattr(self, '__dict__', {}).get(name, default)
 
     def close(self, async=True, exc=None):
         """Closes the transport.
@@ -235,15 +297,14 @@ class SocketTransport(Transport):
         raise NotImplementedError
 
     def _check_closed(self):
-        address = self.address
-        if not address:
+        if self.address is None:
             raise IOError("Transport is closed")
         elif self._closing:
             raise IOError("Transport is closing")
 
     def _shutdown(self, exc=None):
         if self._sock is not None:
-            self._write_buffer = deque()
+            self._write_buffer = None
             self._event_loop.remove_writer(self._sock_fd)
             try:
                 self._sock.shutdown(socket.SHUT_WR)
@@ -25,8 +25,25 @@ The implementation details are outlined below:
   the arbiter and any given actor.
 * Messages are encoded and decoded using the unmasked websocket protocol
   implemented in :class:`pulsar.utils.websocket.FrameParser`.
+* The body of a message is encoded by one of the codecs in
+  :mod:`pulsar.async.codecs`. When a connection is made, both ends send a
+  text frame with the codecs they support and choose the
+  :ref:`mailbox_codec <setting-mailbox_codec>` if the other end supports
+  it. Until then, and otherwise, messages are pickled.
+* Messages sent to a connection during an event loop iteration are written
+  with a single write at the next iteration. When the
+  :ref:`mailbox_batch_frames <setting-mailbox_batch_frames>` setting is on,
+  they are encoded in a single multi-message frame.
 * If, for some reasons, the connection between an actor and the arbiter
   get broken, the actor will eventually stop running and garbaged collected.
+* When the :ref:`peer_mailbox <setting-peer_mailbox>` setting is on, actors
+  open direct connections with each other via :class:`MailboxPeers`. The
+  arbiter is used to discover the address of a peer and to route messages
+  until the direct connection is available.
+* Actors running on a thread of the arbiter process exchange messages with
+  the arbiter via a :class:`ThreadMailbox`, without sockets and
+  serialisation, unless the
+  :ref:`tcp_thread_mailbox <setting-tcp_thread_mailbox>` setting is on.
 
 
 Actor mailbox protocol
@@ -36,22 +53,40 @@ Actor mailbox protocol
   .. autoclass:: MailboxConsumer
    :members:
    :member-order: bysource
+
+  .. autoclass:: MailboxStats
+   :members:
+   :member-order: bysource
+
+  .. autoclass:: MailboxPeers
+   :members:
+   :member-order: bysource
+
+  .. autoclass:: ThreadMailbox
+   :members:
+   :member-order: bysource
 '''
 import sys
 import logging
-from collections import namedtuple
+import marshal
+from functools import partial
+from collections import namedtuple, deque
 
 from pulsar import ProtocolError, CommandError
-from pulsar.utils.pep import pickle
-from pulsar.utils.internet import nice_address
+from pulsar.utils.pep import default_timer, get_ident
+from pulsar.utils.internet import nice_address, parse_address
 from pulsar.utils.websocket import FrameParser
 from pulsar.utils.security import gen_unique_id
 
 from .access import get_actor
 from .defer import Failure, Deferred, maybe_async
+from .events import EventHandler
 from .protocols import ProtocolConsumer
 from .clients import Client, Request
+from .stream import TcpServer
 from .proxy import actorid, get_proxy, get_command, ActorProxy
+from .consts import MIN_NOTIFY
+from .codecs import CODECS, PickleCodec, decode, negotiate
 
 
 LOGGER = logging.getLogger('pulsar.mailbox')
@@ -66,6 +101,14 @@ def command_in_context(command, caller, actor, args, kwargs):
     return cmnd(request, args, kwargs)
 
 
+def _copy_data(data):
+    # Copy messages made of built-in types only, share the others
+    try:
+        return marshal.loads(marshal.dumps(data))
+    except ValueError:
+        return data
+
+
 class ProxyMailbox(object):
     '''A proxy for the arbiter :class:`Mailbox`.
     '''
@@ -93,6 +136,49 @@ class ProxyMailbox(object):
         pass
 
 
+class MailboxStats(object):
+    '''Statistics about the messages written by the mailbox connections
+    of an actor.
+
+    Messages sent to a connection during an event loop iteration are
+    written in one batch. The flush latency is the time between the first
+    message of a batch and its write.
+    '''
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        '''Reset statistics.'''
+        self.batches = 0
+        self.messages = 0
+        self.max_batch_size = 0
+        self.multi_message_frames = 0
+        self.flush_latency = 0
+        self.max_flush_latency = 0
+
+    def batch(self, size, latency, multi_message_frame=False):
+        '''Record a batch of ``size`` messages written ``latency`` seconds
+        after the first message was sent.'''
+        self.batches += 1
+        self.messages += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        if multi_message_frame:
+            self.multi_message_frames += 1
+        self.flush_latency += latency
+        self.max_flush_latency = max(self.max_flush_latency, latency)
+
+    def info(self):
+        '''Dictionary of statistics.'''
+        batches = self.batches or 1
+        return {'batches': self.batches,
+                'messages': self.messages,
+                'mean_batch_size': self.messages/float(batches),
+                'max_batch_size': self.max_batch_size,
+                'multi_message_frames': self.multi_message_frames,
+                'mean_flush_latency': self.flush_latency/batches,
+                'max_flush_latency': self.max_flush_latency}
+
+
 class Message(Request):
     '''A message which travels from actor to actor.
     '''
@@ -127,37 +213,18 @@ class Message(Request):
         return cls(data)
 
 
-class MailboxConsumer(ProtocolConsumer):
-    '''The :class:`pulsar.ProtocolConsumer` for internal message passing
-between actors. Encoding and decoding uses the unmasked websocket
-protocol.'''
-    def connection_made(self, connection):
-        self._pending_responses = {}
-        self._parser = FrameParser(kind=2)
-        actor = get_actor()
-        if actor.is_arbiter():
-            self.connection.bind_event('connection_lost', None,
-                                       self._connection_lost)
+class MailboxMixin(object):
+    '''Send messages to, and handle messages from, the other end of a
+mailbox. Implemented by :class:`MailboxConsumer` and :class:`ThreadMailbox`.
 
+Subclasses must set the ``_pending_responses`` dictionary and implement
+the ``_write`` method.'''
     def request(self, command, sender, target, args, kwargs):
-        '''Used by the server to send messages to the client.'''
+        '''Send a message to the other end of the mailbox.'''
         req = Message.command(command, sender, target, args, kwargs)
         self.start_request(req)
         return req.future
 
-    #######################################################################
-    ##    PROTOCOL CONSUMER IMPLEMENTATION
-    def data_received(self, data):
-        # Feed data into the parser
-        msg = self._parser.decode(data)
-        while msg:
-            try:
-                message = pickle.loads(msg.body)
-            except Exception as e:
-                raise ProtocolError('Could not decode message body: %s' % e)
-            maybe_async(self._responde(message), event_loop=self.event_loop)
-            msg = self._parser.decode()
-
     def start_request(self, req=None):
         if req:
             if req.future and 'ack' in req.data:
@@ -168,17 +235,9 @@ protocol.'''
                     req.future.callback(e)
             else:
                 self._write(req)
-    start = start_request
 
-    ########################################################################
-    ##    INTERNALS
-    def _connection_lost(self, failure):
-        actor = get_actor()
-        if actor.is_running():
-            failure.log(msg='Connection lost with actor.', level='warning')
-        else:
-            failure.mute()
-        return failure
+    def _write(self, req):
+        raise NotImplementedError
 
     def _responde(self, message):
         actor = get_actor()
@@ -227,15 +286,141 @@ protocol.'''
             raise KeyError('Callback %s not in pending callbacks' % ack)
         pending.callback(result)
 
+    def _write_error(self, req, exc):
+        if req.future is not None:
+            self._pending_responses.pop(req.data.get('ack'), None)
+            req.future.callback(exc)
+        else:
+            LOGGER.error('Could not send %s: %s', req, exc)
+
+
+class MailboxConsumer(MailboxMixin, ProtocolConsumer):
+    '''The :class:`pulsar.ProtocolConsumer` for internal message passing
+between actors. Encoding and decoding uses the unmasked websocket
+protocol.'''
+    def connection_made(self, connection):
+        self._pending_responses = {}
+        self._parser = FrameParser(kind=2)
+        self._codec = PickleCodec()
+        self._handshake_sent = False
+        self._batch_frames = False
+        self._queue = deque()
+        self._batch_started = None
+        actor = get_actor()
+        self._codec_name = actor.cfg.mailbox_codec
+        self._batch_frames_setting = actor.cfg.mailbox_batch_frames
+        self._stats = actor.mailbox_stats
+        if actor.is_arbiter():
+            self.connection.bind_event('connection_lost', None,
+                                       self._connection_lost)
+
+    @property
+    def codec(self):
+        '''The :class:`pulsar.async.codecs.MessageCodec` which encodes the
+        messages sent by this consumer.'''
+        return self._codec
+
+    #######################################################################
+    ##    PROTOCOL CONSUMER IMPLEMENTATION
+    def data_received(self, data):
+        # Feed data into the parser
+        msg = self._parser.decode(data)
+        while msg:
+            if msg.is_message:
+                # the codecs supported by the other end
+                features = msg.body.split()
+                self._codec = negotiate(self._codec_name, features)
+                self._batch_frames = (self._batch_frames_setting and
+                                      'batch' in features)
+                if not self._handshake_sent:
+                    self._handshake()
+            else:
+                try:
+                    messages = decode(msg.body)
+                except Exception as e:
+                    raise ProtocolError('Could not decode message body: %s'
+                                        % e)
+                if not isinstance(messages, list):
+                    # a multi-message frame is decoded into a list
+                    messages = (messages,)
+                for message in messages:
+                    maybe_async(self._responde(message),
+                                event_loop=self.event_loop)
+            msg = self._parser.decode()
+
+    start = MailboxMixin.start_request
+
+    ########################################################################
+    ##    INTERNALS
+    def _connection_lost(self, failure):
+        actor = get_actor()
+        if actor.is_running():
+            failure.log(msg='Connection lost with actor.', level='warning')
+        else:
+            failure.mute()
+        return failure
+
+    def _handshake(self):
+        # Send the codecs supported by this end of the connection and
+        # the support for multi-message frames
+        self._handshake_sent = True
+        features = [Codec().identity for Codec in CODECS.values()]
+        features.append('batch')
+        features = ' '.join(features)
+        self.transport.write(self._parser.encode(features, opcode=0x1).msg)
+
     def _write(self, req):
-        obj = pickle.dumps(req.data, protocol=2)
-        data = self._parser.encode(obj, opcode=0x2).msg
-        try:
-            self.transport.write(data)
-        except IOError:
-            actor = get_actor()
-            if actor.is_running():
-                raise
+        # Messages are written at the next event loop iteration, all
+        # together. They can be sent from other threads.
+        self._queue.append(req)
+        if self._batch_started is None:
+            self._batch_started = default_timer()
+            event_loop = self.event_loop
+            if getattr(event_loop, 'tid', None) == get_ident():
+                event_loop.call_soon(self._flush)
+            else:
+                event_loop.call_soon_threadsafe(self._flush)
+
+    def _flush(self):
+        started, self._batch_started = self._batch_started, None
+        queue = self._queue
+        requests = []
+        while queue:
+            requests.append(queue.popleft())
+        if not requests:
+            return
+        encode = self._parser.encode
+        codec = self._codec
+        frames = []
+        multi = self._batch_frames and len(requests) > 1
+        if multi:
+            try:
+                body = codec.encode_batch([req.data for req in requests])
+            except Exception:
+                # encode messages one by one to find which ones failed
+                multi = False
+            else:
+                frames.append(encode(body, opcode=0x2).msg)
+        if not multi:
+            for req in requests:
+                try:
+                    frames.append(encode(codec.encode(req.data),
+                                         opcode=0x2).msg)
+                except Exception as e:
+                    self._write_error(req, e)
+        if frames:
+            try:
+                if not self._handshake_sent:
+                    self._handshake()
+                self.transport.writelines(frames)
+            except IOError as e:
+                actor = get_actor()
+                if actor.is_running():
+                    for req in requests:
+                        self._write_error(req, e)
+        if self._stats is not None:
+            self._stats.batch(len(requests), default_timer() - started,
+                              multi)
 
 
 class MailboxClient(Client):
@@ -263,3 +448,200 @@ class MailboxClient(Client):
                               self.address, self.timeout)
         self.response(req)
         return req.future
+
+
+class ThreadMailbox(MailboxMixin, EventHandler):
+    '''An in-process mailbox between an actor running on a thread and
+the :class:`pulsar.Arbiter` of the same process.
+
+It is the :attr:`pulsar.Actor.mailbox` of the actor and its :attr:`other`
+end is the mailbox of the actor proxy in the arbiter. Messages are not
+serialised: they are passed to the event loop of the other end via
+:meth:`pulsar.EventLoop.call_soon_threadsafe`. Arguments and results made
+of built-in python types are copied, other objects are shared.
+
+.. attribute:: other
+
+    The :class:`ThreadMailbox` at the other end.
+'''
+    ONE_TIME_EVENTS = ('finish',)
+
+    def __init__(self, address, event_loop, other_event_loop=None,
+                 other=None):
+        super(ThreadMailbox, self).__init__()
+        self.address = address
+        self.event_loop = event_loop
+        self.name = 'Thread mailbox'
+        self._pending_responses = {}
+        self._closed = False
+        if other is None:
+            other = ThreadMailbox(address, other_event_loop, other=self)
+        self.other = other
+
+    def __repr__(self):
+        return '%s %s' % (self.name, nice_address(self.address))
+    __str__ = __repr__
+
+    @property
+    def closed(self):
+        '''``True`` if one end of the mailbox was closed.'''
+        return self._closed or self.other._closed
+
+    @property
+    def connection(self):
+        # the mailbox is its own connection, the notify command sets its
+        # current consumer as the mailbox of the actor proxy
+        return self
+
+    @property
+    def current_consumer(self):
+        return self
+
+    def close(self):
+        '''Close both ends of the mailbox and fire the ``finish`` event.
+
+        Messages waiting for a response are called back with an
+        ``IOError``.'''
+        if not self._closed:
+            self._closed = True
+            pending, self._pending_responses = self._pending_responses, {}
+            for future in pending.values():
+                future.callback(IOError('%s is closed' % self))
+            other = self.other
+            other.event_loop.call_soon_threadsafe(other.close)
+            self.fire_event('finish')
+        return self.event('finish')
+    abort = close
+
+    def _write(self, req):
+        if self.closed:
+            # messages without a response are dropped, as when the
+            # connection of a MailboxClient is lost
+            if req.future is not None:
+                self._write_error(req, IOError('%s is closed' % self))
+        else:
+            other = self.other
+            other.event_loop.call_soon_threadsafe(other._receive,
+                                                  _copy_data(req.data))
+
+    def _receive(self, message):
+        if not self._closed:
+            maybe_async(self._responde(message), event_loop=self.event_loop)
+
+
+class MailboxPeers(object):
+    '''Direct mailbox connections between an :class:`pulsar.Actor` and
+    other actors.
+
+    The :attr:`server` receives messages from other actors and its address
+    is published in the ``peers`` entry of the actor info, which is how the
+    arbiter knows it. The first time a message is sent to a given actor id,
+    the arbiter is asked for the address of the target server and a
+    :class:`MailboxClient` connects to it. Until the connection is
+    available, or if it is lost, messages are routed by the arbiter.
+
+    .. attribute:: server
+
+        The :class:`pulsar.TcpServer` serving the actor mailbox.
+    '''
+    def __init__(self, actor, event_loop):
+        self.actor = actor
+        self.event_loop = event_loop
+        self.direct_messages = 0
+        self.routed_messages = 0
+        self._clients = {}
+        address = parse_address(actor.cfg.mailbox_address or '127.0.0.1:0')
+        if isinstance(address, tuple):
+            self.server = TcpServer(event_loop, address[0], 0,
+                                    consumer_factory=MailboxConsumer,
+                                    name='peer mailbox')
+        else:
+            self.server = TcpServer(event_loop,
+                                    path='%s.%s' % (address, actor.aid),
+                                    consumer_factory=MailboxConsumer,
+                                    name='peer mailbox')
+        self.server.start_serving()
+
+    def __repr__(self):
+        return 'Peer mailbox for %s' % self.actor
+    __str__ = __repr__
+
+    @property
+    def address(self):
+        '''Address of the :attr:`server`.'''
+        return self.server.address
+
+    def mailbox(self, target):
+        '''The :class:`MailboxClient` connected with ``target``.
+
+        Return ``None`` when messages to ``target`` must be routed by the
+        arbiter. In this case, the first time ``target`` is seen, the
+        direct connection is requested.
+        '''
+        aid = actorid(target)
+        try:
+            client = self._clients[aid]
+        except KeyError:
+            client = self._clients[aid] = None
+            monitor = self.actor.monitor
+            if aid != 'arbiter' and not (monitor and aid == monitor.aid):
+                # messages can be sent from other threads
+                self.event_loop.call_soon_threadsafe(self.event_loop.async,
+                                                     self._connect(aid))
+        if client is None:
+            self.routed_messages += 1
+        else:
+            self.direct_messages += 1
+        return client
+
+    def info(self):
+        connections = sum((1 for c in self._clients.values() if c))
+        return {'address': self.address,
+                'connections': connections,
+                'incoming_connections': self.server.concurrent_connections,
+                'direct_messages': self.direct_messages,
+                'routed_messages': self.routed_messages}
+
+    def close(self):
+        '''Close the :attr:`server` and all direct connections.'''
+        clients = self._clients
+        self._clients = {}
+        for client in clients.values():
+            if client:
+                client.close()
+        self.server.close()
+
+    def _connect(self, aid):
+        actor = self.actor
+        client = None
+        try:
+            address = yield actor.send('arbiter', 'peer_address', aid)
+            if address:
+                client = MailboxClient(address, actor, self.event_loop)
+                # a ping establishes the connection
+                yield client.request('ping', actor, aid, None, None)
+        except Exception as e:
+            LOGGER.debug('%s could not connect with %s: %s', self, aid, e)
+            if client:
+                client.abort()
+            client = None
+        if aid in self._clients:
+            if client:
+                connection = client._consumer.connection
+                lost = partial(self._connection_lost, aid, client)
+                connection.bind_event('connection_lost', lost, lost)
+                self._clients[aid] = client
+            else:
+                # Route via the arbiter and try again later
+                self.event_loop.call_later(MIN_NOTIFY, self._clients.pop,
+                                           aid, None)
+        elif client:
+            client.close()
+
+    def _connection_lost(self, aid, client, result):
+        if self._clients.get(aid) is client:
+            self._clients.pop(aid)
+            client.abort()
+        if isinstance(result, Failure):
+            result.mute()
+        return result
@@ -31,9 +31,21 @@ __all__ = ['Poller']
 
 class Poller(object):
     '''The Poller interface'''
+    edge_triggered = False
+    '''``True`` if the poller can deliver edge-triggered notifications.'''
+
     def __init__(self):
         self._handlers = {}
 
+    def set_edge_triggered(self, fd):
+        '''Request edge-triggered notifications for file descriptor ``fd``.
+
+        It must be called before adding handlers for ``fd``. Return ``True``
+        if the request is granted, in which case the handlers of ``fd`` must
+        read or write until the operation would block, otherwise no further
+        event is delivered.'''
+        return False
+
     def handlers(self, fd):
         '''Return the handlers for file descriptor ``fd``.'''
         return self._handlers[fd]
@@ -166,7 +178,9 @@ class Poller(object):
             processed = True
             if error:
                 error()
-            else:
+            elif not events & READ:
+                # A hang up reported with a read event (unix sockets) is
+                # handled by the reader when it reads the end of file
                 loop.logger.warning('Error callback without handler for file'
                                     ' descriptor %s.', fd)
         if not processed:
@@ -220,7 +234,32 @@ if hasattr(select, 'epoll'):
             else:
                 self._epoll.modify(fd, events)
 
+    class IOepollET(IOepoll):
+        '''An :class:`IOepoll` which delivers edge-triggered notifications
+        for file descriptors registered via :meth:`set_edge_triggered`.
+
+        All other file descriptors are level-triggered.'''
+        edge_triggered = True
+
+        def __init__(self):
+            super(IOepollET, self).__init__()
+            self._edge_fds = set()
+
+        def set_edge_triggered(self, fd):
+            self._edge_fds.add(fd)
+            return True
+
+        def unregister(self, fd):
+            self._edge_fds.discard(fd)
+            super(IOepollET, self).unregister(fd)
+
+        def _register(self, fd, events, old_events=None):
+            if fd in self._edge_fds:
+                events |= _EPOLLET
+            super(IOepollET, self)._register(fd, events, old_events)
+
     POLLERS['epoll'] = IOepoll
+    POLLERS['epoll-et'] = IOepollET
 
 if hasattr(select, 'kqueue'):     # pragma    nocover
 
@@ -354,5 +393,21 @@ class PollerSetting(Global):
         Specify the default selector used for I/O event polling.
 
         The default value is the best possible for the system running the
-        application.
+        application. ``epoll-et`` is an edge-triggered version of ``epoll``
+        which lets TCP transports read and write until the socket would
+        block, reducing the number of system calls on busy connections.
+        """
+
+
+class EventLoopSetting(Global):
+    name = "event_loop"
+    flags = ["--event-loop"]
+    choices = ('pulsar', 'asyncio')
+    default = 'pulsar'
+    desc = """\
+        The event loop implementation used by actors.
+
+        ``asyncio`` runs actors on top of an asyncio event loop, which
+        requires python 3.4 or trollius. In this case the
+        :ref:`poller <setting-poller>` setting is not used.
         """
@@ -4,7 +4,7 @@ from functools import partial
 from pulsar import TooManyConnections, ProtocolError
 from pulsar.utils.internet import nice_address, format_address
 
-from .defer import multi_async, log_failure
+from .defer import multi_async, log_failure, Deferred
 from .events import EventHandler
 from .internet import Protocol, logger
 
@@ -164,6 +164,14 @@ class ProtocolConsumer(EventHandler):
                 #TODO: should we abort the transport here?
                 self.finished(sys.exc_info())
 
+    def drain(self):
+        '''Wait for the :attr:`transport` write buffer to drain.
+
+        Same as :meth:`Connection.drain`.
+        '''
+        if self._connection:
+            return self._connection.drain()
+
     def finished(self, result=None):
         '''Call this method when done with this :class:`ProtocolConsumer`.
 
@@ -216,14 +224,18 @@ class Connection(EventHandler, Protocol):
     * ``connection_made``
     * ``connection_lost``
     '''
+    __slots__ = ('_session', '_processed', '_timeout', '_consumer_factory',
+                 '_producer', '_transport', '_current_consumer',
+                 '_idle_timeout', '_paused_writing', '_drain_waiter')
     ONE_TIME_EVENTS = ('connection_made', 'connection_lost')
-    #
-    _transport = None
-    _current_consumer = None
-    _idle_timeout = None
 
     def __init__(self, session, consumer_factory, producer, timeout=0):
         super(Connection, self).__init__()
+        self._transport = None
+        self._current_consumer = None
+        self._idle_timeout = None
+        self._paused_writing = False
+        self._drain_waiter = None
         self._session = session
         self._processed = 0
         self._timeout = timeout
@@ -232,7 +244,7 @@ class Connection(EventHandler, Protocol):
 
     def __repr__(self):
         address = self.address
-        if address:
+        if address is not None:
             return '%s session %s' % (nice_address(address), self._session)
         else:
             return '<pending-connection> session %s' % self._session
@@ -389,6 +401,37 @@ class Connection(EventHandler, Protocol):
                 raise ProtocolError('current consumer not done.')
         self._add_idle_timeout()
 
+    def pause_writing(self):
+        '''Implements the :meth:`BaseProtocol.pause_writing` method.'''
+        self._paused_writing = True
+
+    def resume_writing(self):
+        '''Implements the :meth:`BaseProtocol.resume_writing` method.
+
+        Calls back the :class:`Deferred` returned by :meth:`drain`.'''
+        self._paused_writing = False
+        waiter, self._drain_waiter = self._drain_waiter, None
+        if waiter is not None:
+            waiter.callback(None)
+
+    def drain(self):
+        '''Wait for the :attr:`transport` write buffer to drain.
+
+        Producers writing large amounts of data should call this method
+        after each write::
+
+            transport.write(data)
+            yield connection.drain()
+
+        :return: ``None`` if writing is not paused, otherwise a
+            :class:`Deferred` called back when the transport write buffer
+            is below its low water mark.
+        '''
+        if self._paused_writing:
+            if self._drain_waiter is None:
+                self._drain_waiter = Deferred()
+            return self._drain_waiter
+
     def connection_lost(self, exc):
         '''Implements the :meth:`BaseProtocol.connection_lost` method.
 
@@ -396,11 +439,16 @@ class Connection(EventHandler, Protocol):
 
         * Fire the ``connection_lost`` :ref:`one time event <one-time-event>`
           if not fired before, with ``exc`` as event data.
+        * Errback the :class:`Deferred` returned by :meth:`drain` with an
+          ``IOError``.
         * Cancel the idle timeout if set.
         * Invokes the :meth:`ProtocolConsumer.connection_lost` method in the
           :attr:`current_consumer` if available.
           '''
         if self.fire_event('connection_lost', exc):
+            waiter, self._drain_waiter = self._drain_waiter, None
+            if waiter is not None:
+                waiter.callback(IOError('Connection lost'))
             self._cancel_timeout()
             if self._current_consumer:
                 self._current_consumer.connection_lost(exc)
@@ -446,8 +494,8 @@ class Connection(EventHandler, Protocol):
 
     def _add_idle_timeout(self):
         if not self.closed and not self._idle_timeout and self._timeout:
-            self._idle_timeout = self.event_loop.call_later(self._timeout,
-                                                            self._timed_out)
+            self._idle_timeout = self.event_loop.call_timeout(
+                self._timeout, self._timed_out)
 
     def _cancel_timeout(self):
         if self._idle_timeout:
@@ -628,19 +676,45 @@ class Server(ConnectionProducer):
     .. attribute:: consumer_factory
 
         Factory of :class:`ProtocolConsumer` handling the server sockets.
+
+    A server listens either on ``host`` and ``port``, on the unix domain
+    socket ``path`` or on an existing socket ``sock``.
+
+    When ``max_concurrent_connections`` is given, the server stops accepting
+    new connections once that many connections are open (see
+    :meth:`pause_accepting`) and resumes as soon as one of them is lost.
+    Clients waiting to be accepted are queued by the operating system in the
+    listening socket backlog.
+
+    .. attribute:: pending_requests
+
+        Number of requests being processed. Updated by consumers which
+        support load shedding, such as the WSGI server.
+
+    .. attribute:: shed_requests
+
+        Number of requests rejected because the server was overloaded.
     '''
     ONE_TIME_EVENTS = ('start', 'stop')
     MANY_TIMES_EVENTS = ('connection_made', 'pre_request', 'post_request',
                          'connection_lost')
     consumer_factory = None
+    pending_requests = 0
+    shed_requests = 0
 
     def __init__(self, event_loop, host=None, port=None,
-                 consumer_factory=None, name=None, sock=None, **kw):
+                 consumer_factory=None, name=None, sock=None, path=None,
+                 max_concurrent_connections=None, **kw):
         super(Server, self).__init__(**kw)
+        self._max_concurrent_connections = max_concurrent_connections or 0
+        self._open_connections = 0
+        self._accepting = True
+        self._accept_pauses = 0
         self._name = name or self.__class__.__name__
         self._event_loop = event_loop
         self._host = host
         self._port = port
+        self._path = path
         self._sock = sock
         self.logger = logger(event_loop)
         if consumer_factory:
@@ -657,6 +731,19 @@ class Server(ConnectionProducer):
         '''Stop serving and close the listening socket.'''
         raise NotImplementedError
 
+    def pause_accepting(self):
+        '''Stop accepting new connections.
+
+        Connections already accepted are not affected.
+        Called when the number of open connections reaches
+        :attr:`max_concurrent_connections`.'''
+        raise NotImplementedError
+
+    def resume_accepting(self):
+        '''Resume accepting new connections after :meth:`pause_accepting`.
+        '''
+        raise NotImplementedError
+
     def protocol_factory(self):
         '''The protocol factory for a server.'''
         return self.new_connection(self.build_consumer)
@@ -680,8 +767,30 @@ class Server(ConnectionProducer):
             logger().info('Reached maximum number of connections %s. '
                           'Stop serving.' % self._max_connections)
             self.close()
+        self._open_connections += 1
+        if (self._accepting and self._max_concurrent_connections and
+                self._open_connections >= self._max_concurrent_connections):
+            self._accepting = False
+            self._accept_pauses += 1
+            self.pause_accepting()
         return conn
 
+    @property
+    def max_concurrent_connections(self):
+        '''Maximum number of open connections, ``0`` for no limit.'''
+        return self._max_concurrent_connections
+
+    @property
+    def accepting(self):
+        '''``True`` when the server is accepting new connections.'''
+        return self._accepting
+
+    @property
+    def accept_pauses(self):
+        '''Number of times the server stopped accepting new connections
+        because :attr:`max_concurrent_connections` was reached.'''
+        return self._accept_pauses
+
     @property
     def event_loop(self):
         '''The :class:`EventLoop` running the server'''
@@ -699,3 +808,12 @@ class Server(ConnectionProducer):
             return self._sock.getsockname()
         except Exception:
             return None
+
+    #   INTERNALS
+    def _connection_lost(self, connection, exc):
+        self._open_connections -= 1
+        if (not self._accepting and
+                self._open_connections < self._max_concurrent_connections):
+            self._accepting = True
+            self.resume_accepting()
+        return super(Server, self)._connection_lost(connection, exc)
@@ -0,0 +1,169 @@
+'''Asynchronous name resolution for the :class:`EventLoop`.
+
+Name lookups which may block, i.e. when the host is not a numeric
+address, are performed by a pool of daemon threads shared by all event
+loops in a process. Results are handed back to the event loop thread via
+:meth:`EventLoop.call_soon_threadsafe`.
+'''
+import os
+import sys
+import socket
+from threading import Lock, Thread
+
+from .consts import (DNS_CACHE_TTL, DNS_NEGATIVE_CACHE_TTL, DNS_CACHE_SIZE,
+                     DNS_RESOLVER_THREADS)
+from .defer import Deferred
+from .threads import ThreadQueue
+
+
+__all__ = ['Resolver']
+
+
+class ResolverPool(object):
+    '''A pool of daemon threads performing blocking name lookups.'''
+    def __init__(self, threads=None):
+        self._threads = threads or DNS_RESOLVER_THREADS
+        self._lock = Lock()
+        self._reset()
+
+    def apply(self, callback, func, args):
+        '''Run ``func(*args)`` in a resolver thread and invoke
+``callback(result)`` with the result or the exception info.'''
+        with self._lock:
+            if self._pid != os.getpid():
+                # the pool was created in a parent process, threads did not
+                # survive the fork
+                self._reset()
+            self._queue.put((callback, func, args))
+            if self._idle < 1 and len(self._workers) < self._threads:
+                worker = Thread(target=self._run,
+                                name='pulsar-resolver-%s' % len(self._workers))
+                worker.daemon = True
+                self._workers.append(worker)
+                self._idle += 1
+                worker.start()
+            self._idle -= 1
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._queue = ThreadQueue()
+        self._workers = []
+        self._idle = 0
+
+    def _run(self):
+        queue = self._queue
+        while True:
+            callback, func, args = queue.get()
+            try:
+                result = func(*args)
+            except Exception:
+                result = sys.exc_info()[1]
+            with self._lock:
+                self._idle += 1
+            callback(result)
+
+
+_pool = ResolverPool()
+
+
+class Resolver(object):
+    '''Name resolver with cache for an :class:`EventLoop`.
+
+Lookups of non numeric hosts are executed in a thread so that the event loop
+is never blocked. Results are cached for ``ttl`` seconds and failures for
+``negative_ttl`` seconds. Concurrent lookups for the same host are coalesced
+into one.
+
+:param event_loop: the :class:`EventLoop` using this resolver.
+:param ttl: number of seconds a successful lookup is cached.
+:param negative_ttl: number of seconds a failed lookup is cached.
+'''
+    def __init__(self, event_loop, ttl=None, negative_ttl=None, pool=None):
+        self._event_loop = event_loop
+        self.ttl = ttl if ttl is not None else DNS_CACHE_TTL
+        self.negative_ttl = (negative_ttl if negative_ttl is not None
+                             else DNS_NEGATIVE_CACHE_TTL)
+        self._pool = pool or _pool
+        self._cache = {}
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def info(self):
+        '''Dictionary of statistics for this resolver.'''
+        return {'cache_size': len(self._cache),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'pending': len(self._pending)}
+
+    def clear(self):
+        '''Clear the cache.'''
+        self._cache.clear()
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        '''Asynchronous equivalent of ``socket.getaddrinfo``.
+
+        :return: a :class:`Deferred` called back with the list of addresses.
+        '''
+        try:
+            # Numeric hosts are resolved without blocking
+            result = socket.getaddrinfo(host, port, family, type, proto,
+                                        flags | socket.AI_NUMERICHOST)
+        except socket.gaierror:
+            key = ('addrinfo', host, port, family, type, proto, flags)
+            return self._lookup(key, socket.getaddrinfo,
+                                (host, port, family, type, proto, flags))
+        else:
+            return self._done(result)
+
+    def getnameinfo(self, sockaddr, flags=0):
+        '''Asynchronous equivalent of ``socket.getnameinfo``.
+
+        :return: a :class:`Deferred` called back with a ``(host, port)``
+            tuple.
+        '''
+        key = ('nameinfo', sockaddr, flags)
+        return self._lookup(key, socket.getnameinfo, (sockaddr, flags))
+
+    def _done(self, result):
+        d = Deferred(event_loop=self._event_loop)
+        d.callback(result)
+        return d
+
+    def _lookup(self, key, func, args):
+        entry = self._cache.get(key)
+        if entry is not None:
+            expiry, result = entry
+            if expiry > self._event_loop.timer():
+                self.hits += 1
+                return self._done(result)
+            self._cache.pop(key, None)
+        d = Deferred(event_loop=self._event_loop)
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            pending.append(d)
+        else:
+            self.misses += 1
+            self._pending[key] = [d]
+            self._pool.apply(
+                lambda result: self._event_loop.call_soon_threadsafe(
+                    self._resolved, key, result), func, args)
+        return d
+
+    def _resolved(self, key, result):
+        ttl = (self.negative_ttl if isinstance(result, Exception)
+               else self.ttl)
+        if ttl > 0:
+            cache = self._cache
+            if len(cache) >= DNS_CACHE_SIZE:
+                now = self._event_loop.timer()
+                for k in [k for k, v in cache.items() if v[0] <= now]:
+                    cache.pop(k)
+                if len(cache) >= DNS_CACHE_SIZE:
+                    cache.clear()
+            cache[key] = (self._event_loop.timer() + ttl, result)
+        for d in self._pending.pop(key, ()):
+            d.callback(result)
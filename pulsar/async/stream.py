@@ -18,30 +18,87 @@ TcpServer
 '''
 import os
 import sys
+import stat
 import socket
 from functools import partial
+from itertools import islice, takewhile
+from collections import deque
 
 from pulsar.utils.exceptions import PulsarException
+from pulsar.utils.pep import ispy26, ispy33
+from pulsar.utils.system import sendfile
 from pulsar.utils.internet import (TRY_WRITE_AGAIN, TRY_READ_AGAIN,
                                    ACCEPT_ERRORS, EWOULDBLOCK, EPERM,
                                    format_address, ssl_context, ssl,
-                                   ESHUTDOWN, BUFFER_MAX_SIZE,
-                                   SOCKET_INTERRUPT_ERRORS)
-from pulsar.utils.structures import merge_prefix
+                                   ESHUTDOWN, SOCKET_INTERRUPT_ERRORS)
 
-from .consts import NUMBER_ACCEPTS
+from .consts import (NUMBER_ACCEPTS, DRAIN_BUDGET, MIN_READ_CHUNK_SIZE,
+                     SENDFILE_CHUNK_SIZE, WRITE_BUFFER_HIGH_WATER)
 from .defer import multi_async, Deferred
-from .internet import SocketTransport, AF_INET6
+from .internet import SocketTransport, BufferedProtocol, AF_INET6
 from .protocols import Server, logger
 
 SSLV3_ALERT_CERTIFICATE_UNKNOWN = 1
 # Got this error on pypy
 SSL3_WRITE_PENDING = 1
 MAX_CONSECUTIVE_WRITES = 500
+try:
+    IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):     # pragma    nocover
+    IOV_MAX = 16
 
 
 class TooManyConsecutiveWrite(PulsarException):
-    '''Raise when too many consecutive writes are attempted.'''
+    '''Raise when too many consecutive writes are attempted after the
+    protocol was asked to pause writing.'''
+
+
+if ispy26:    # pragma    nocover
+    # No memoryview, data is buffered as bytes and copied when sliced
+    view_type = bytes
+else:
+    view_type = memoryview
+
+
+def _is_view(data):
+    return data.__class__ is view_type
+
+
+class _FileSegment(object):
+    # A region of a file queued in the write buffer of a transport
+    __slots__ = ('fd', 'offset', 'count', 'sent', 'chunk', 'done')
+
+    def __init__(self, fd, offset, count):
+        self.fd = fd
+        self.offset = offset
+        self.count = count
+        self.sent = 0
+        self.chunk = None
+        self.done = Deferred()
+
+    def send(self, sock, zero_copy):
+        # Send the next part of the segment. Return the number of bytes
+        # sent, 0 at the end of the file or None if the socket would block.
+        size = min(self.count, SENDFILE_CHUNK_SIZE)
+        if zero_copy:
+            try:
+                sent = sendfile(sock.fileno(), self.fd, self.offset, size)
+            except OSError as e:
+                if e.args[0] in TRY_WRITE_AGAIN:
+                    return None
+                raise
+        else:
+            if not self.chunk:
+                os.lseek(self.fd, self.offset, os.SEEK_SET)
+                self.chunk = view_type(os.read(self.fd, size))
+                if not self.chunk:
+                    return 0
+            sent = sock.send(self.chunk)
+            self.chunk = self.chunk[sent:]
+        self.offset += sent
+        self.count -= sent
+        self.sent += sent
+        return sent
 
 
 def raise_socket_error(e):
@@ -60,10 +117,41 @@ The primary feature of a stream transport is sending bytes to a protocol
 and receiving bytes from the underlying protocol. Writing to the transport
 is done using the :meth:`write` and :meth:`writelines` methods.
 The latter method is a performance optimisation, to allow software to take
-advantage of specific capabilities in some transport mechanisms.'''
-    _paused_reading = False
+advantage of specific capabilities in some transport mechanisms.
+Files are sent with the :meth:`sendfile` method.
+
+Write flow control follows pep-3156_. When the write buffer goes over the
+high water mark the protocol's :meth:`pulsar.BaseProtocol.pause_writing`
+method is called, once it drains below the low water mark
+:meth:`pulsar.BaseProtocol.resume_writing` is called. A protocol which keeps
+writing while paused is aborted after :data:`MAX_CONSECUTIVE_WRITES` writes.
+
+Data is read into the :meth:`pulsar.EventLoop.read_buffer` shared by all
+transports of the event loop, or into the buffer provided by a
+:class:`pulsar.BufferedProtocol`. The number of bytes asked for adapts to
+the connection, starting from :data:`MIN_READ_CHUNK_SIZE`.
+
+When the :attr:`pulsar.EventLoop.io` poller is edge-triggered, the transport
+reads and writes until the socket would block, up to
+:data:`DRAIN_BUDGET` bytes per event.'''
+    __slots__ = ('_paused_reading', '_drain_budget', '_read_size',
+                 '_paused_writing', '_write_buffer_size', '_high_water',
+                 '_low_water')
+    _vectored = True
+    _zero_copy = True
+
+    def __init__(self, *args, **kwargs):
+        self._paused_reading = False
+        self._paused_writing = False
+        self._drain_budget = 0
+        self._write_buffer_size = 0
+        super(SocketStreamTransport, self).__init__(*args, **kwargs)
+        self._read_size = min(MIN_READ_CHUNK_SIZE, self._read_chunk_size)
+        self.set_write_buffer_limits()
 
     def _do_handshake(self):
+        if self._event_loop.io.set_edge_triggered(self._sock_fd):
+            self._drain_budget = DRAIN_BUDGET
         self._event_loop.add_reader(self._sock_fd, self._ready_read)
         self._event_loop.call_soon(self._protocol.connection_made, self)
 
@@ -72,55 +160,101 @@ advantage of specific capabilities in some transport mechanisms.'''
         :meth:`resume_reading` call.
 
         Between :meth:`pause_reading` and :meth:`resume_reading`, the
-        protocol's data_received() method will not be called.
+        protocol's data_received() method will not be called and the
+        socket is not read, so that the peer eventually stops sending.
         '''
         if self._closing:
             raise RuntimeError('Cannot pause_reading() when closing')
         if self._paused_reading:
             raise RuntimeError('Already paused')
         self._paused_reading = True
-        self._loop.remove_reader(self._sock_fd)
+        self._event_loop.remove_reader(self._sock_fd)
 
     def resume_reading(self):
-        """Resume the receiving end."""
+        '''Resume the receiving end.
+
+        Data read while paused is delivered to the protocol, on the next
+        iteration of the event loop, before reading the socket again.
+        '''
         if not self._paused_reading:
             raise RuntimeError('Not paused')
         self._paused_reading = False
         if not self._closing:
-            self._loop.add_reader(self._sock_fd)
+            if self._read_buffer:
+                self._event_loop.call_soon(self._replay_read)
+            else:
+                self._add_reader()
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        '''Set the high and low water marks for write flow control.
+
+        :param high: number of buffered bytes above which the protocol is
+            asked to pause writing. Default :data:`WRITE_BUFFER_HIGH_WATER`.
+        :param low: number of buffered bytes below which the protocol is
+            asked to resume writing. Default a quarter of ``high``.
+        '''
+        if high is None:
+            high = WRITE_BUFFER_HIGH_WATER if low is None else 4*low
+        if low is None:
+            low = high // 4
+        if not high >= low >= 0:
+            raise ValueError('high (%r) must be >= low (%r) must be >= 0' %
+                             (high, low))
+        self._high_water = high
+        self._low_water = low
+        if self._write_buffer:
+            self._maybe_pause_protocol()
+
+    def get_write_buffer_size(self):
+        '''The number of bytes of data waiting in the write buffer.
+
+        Files queued by :meth:`sendfile` are not included.'''
+        return self._write_buffer_size
 
     def write(self, data):
         '''Write chunk of ``data`` to the endpoint.
+
+        ``data`` can be ``bytes``, a ``bytearray`` or a ``memoryview``.
+        It is not copied unless it is mutable and cannot be sent straight
+        away.
         '''
-        if not data:
-            return
-        self._check_closed()
-        is_writing = bool(self._write_buffer)
         if data:
-            # Add data to the buffer
-            assert isinstance(data, bytes)
-            if len(data) > BUFFER_MAX_SIZE:
-                for i in range(0, len(data), BUFFER_MAX_SIZE):
-                    self._write_buffer.append(data[i:i+BUFFER_MAX_SIZE])
-            else:
-                self._write_buffer.append(data)
-        # Try to write only when not waiting for write callbacks
-        if not is_writing:
-            self._consecutive_writes = 0
-            self._ready_write()
-            if self._write_buffer:    # still writing
-                self._event_loop.add_writer(self._sock_fd, self._ready_write)
-            elif self._closing:
-                self._event_loop.call_soon(self._shutdown)
-        else:
-            self._consecutive_writes += 1
-            if self._consecutive_writes > MAX_CONSECUTIVE_WRITES:
-                self.abort(TooManyConsecutiveWrite())
+            self._write_views((data,))
 
     def writelines(self, list_of_data):
         '''Write a list (or any iterable) of data bytes to the transport.
+
+        The chunks are not joined, when available ``sendmsg`` sends several
+        of them with one system call.
         '''
-        self.write(b''.join(list_of_data))
+        self._write_views(list_of_data)
+
+    def sendfile(self, fileobj, offset=0, count=None):
+        '''Send ``count`` bytes of ``fileobj`` starting at ``offset``.
+
+        ``fileobj`` is a file object opened in binary mode, or a file
+        descriptor. If ``count`` is ``None`` the file is sent up to its end.
+        The file is sent after the data already written, and data written
+        afterwards follows it.
+
+        The ``sendfile`` system call copies data from the file to the socket
+        without passing it through user space. SSL transports, and platforms
+        without ``sendfile``, read the file in chunks of
+        :data:`SENDFILE_CHUNK_SIZE` bytes instead.
+
+        :return: a :class:`Deferred` called back with the number of bytes
+            sent.
+        '''
+        self._check_closed()
+        fd = fileobj if isinstance(fileobj, int) else fileobj.fileno()
+        if count is None:
+            count = max(os.fstat(fd).st_size - offset, 0)
+        segment = _FileSegment(fd, offset, count)
+        if count:
+            self._extend_buffer((segment,))
+        else:
+            segment.done.callback(0)
+        return segment.done
 
     ##    INTERNALS
 
@@ -130,21 +264,128 @@ advantage of specific capabilities in some transport mechanisms.'''
     def _read_continue(self, e):
         return e.args[0] == EWOULDBLOCK
 
+    def _write_views(self, list_of_data):
+        self._check_closed()
+        views = []
+        mutable = False
+        for data in list_of_data:
+            if isinstance(data, bytes):
+                data = view_type(data)
+            elif isinstance(data, bytearray):
+                data = view_type(data)
+                # python 2.6 copies it into bytes
+                mutable = mutable or not ispy26
+            elif isinstance(data, view_type):
+                if data.itemsize != 1:
+                    # len() counts items, send() returns bytes
+                    data = (data.cast('B') if ispy33 else
+                            memoryview(data.tobytes()))
+                mutable = mutable or not data.readonly
+            else:
+                raise TypeError('data must be bytes, bytearray or memoryview,'
+                                ' got %s' % type(data).__name__)
+            if data:
+                views.append(data)
+        if views:
+            self._write_buffer_size += sum((len(v) for v in views))
+            self._extend_buffer(views, mutable)
+
+    def _extend_buffer(self, items, mutable=False):
+        buffer = self._write_buffer
+        if buffer is None:
+            buffer = self._write_buffer = deque()
+        is_writing = bool(buffer)
+        buffer.extend(items)
+        # Try to write only when not waiting for write callbacks
+        if not is_writing:
+            self._consecutive_writes = 0
+            self._ready_write()
+            if self._write_buffer:    # still writing
+                if self._paused_reading and self._drain_budget:
+                    # no reader, the file descriptor may be unregistered
+                    self._event_loop.io.set_edge_triggered(self._sock_fd)
+                self._event_loop.add_writer(self._sock_fd, self._ready_write)
+            elif self._closing:
+                self._event_loop.call_soon(self._shutdown)
+        elif self._paused_writing:
+            self._consecutive_writes += 1
+            if self._consecutive_writes > MAX_CONSECUTIVE_WRITES:
+                self.abort(TooManyConsecutiveWrite())
+        if self._write_buffer:
+            if mutable:
+                # the caller owns mutable buffers, copy what is still pending
+                self._write_buffer = deque((
+                    memoryview(v.tobytes()) if _is_view(v) and not v.readonly
+                    else v for v in self._write_buffer))
+            self._maybe_pause_protocol()
+
+    def _maybe_pause_protocol(self):
+        if (not self._paused_writing and
+                self._write_buffer_size > self._high_water):
+            self._paused_writing = True
+            self._consecutive_writes = 0
+            try:
+                self._protocol.pause_writing()
+            except Exception:
+                self.logger.exception('%s pause_writing() failed',
+                                      self._protocol)
+
+    def _maybe_resume_protocol(self):
+        if (self._paused_writing and
+                self._write_buffer_size <= self._low_water):
+            self._paused_writing = False
+            try:
+                self._protocol.resume_writing()
+            except Exception:
+                self.logger.exception('%s resume_writing() failed',
+                                      self._protocol)
+
     def _ready_write(self):
-        # Do the actual writing
+        # Do the actual writing. The buffer is a deque of memoryviews and
+        # file segments, a partial send replaces the first view with a slice
+        # of it, which does not copy data.
         buffer = self._write_buffer
+        budget = self._drain_budget
+        sendmsg = self._sendmsg
+        zero_copy = self._zero_copy and sendfile is not None
         tot_bytes = 0
         if not buffer:
             self.logger.warning('handling write on a 0 length buffer')
         try:
             while buffer:
+                if budget and tot_bytes >= budget:
+                    # edge-triggered, the socket is still writable so no
+                    # more events will be delivered
+                    self._event_loop.call_soon(self._drain_write)
+                    break
                 try:
-                    sent = self._sock.send(buffer[0])
+                    segment = buffer[0]
+                    if segment.__class__ is _FileSegment:
+                        sent = segment.send(self._sock, zero_copy)
+                        if sent is None:
+                            break
+                        tot_bytes += sent
+                        if not sent or not segment.count:
+                            buffer.popleft()
+                            self._event_loop.call_soon(segment.done.callback,
+                                                       segment.sent)
+                        continue
+                    elif sendmsg and len(buffer) > 1:
+                        sent = sendmsg(list(takewhile(
+                            _is_view, islice(buffer, IOV_MAX))))
+                    else:
+                        sent = self._sock.send(buffer[0])
                     if sent == 0:
                         break
-                    merge_prefix(buffer, sent)
-                    buffer.popleft()
                     tot_bytes += sent
+                    self._write_buffer_size -= sent
+                    while sent:
+                        view = buffer[0]
+                        if sent < len(view):
+                            buffer[0] = view[sent:]
+                            break
+                        sent -= len(view)
+                        buffer.popleft()
                 except self.SocketError as e:
                     if self._write_continue(e):
                         break
@@ -154,36 +395,77 @@ advantage of specific capabilities in some transport mechanisms.'''
             failure = sys.exc_info()
         else:
             if not self._write_buffer:
+                # release the buffer, idle connections don't need it
+                self._write_buffer = None
                 self._event_loop.remove_writer(self._sock_fd)
                 if self._closing:
                     self._event_loop.call_soon(self._shutdown)
+            if self._paused_writing and not self._closing:
+                self._maybe_resume_protocol()
             return tot_bytes
         if not self._closing:
             self.abort(failure)
 
+    @property
+    def _sendmsg(self):
+        # Scatter/gather send, not available on python 2 and ssl sockets
+        if self._vectored:
+            return getattr(self._sock, 'sendmsg', None)
+
     def _ready_read(self):
+        budget = self._drain_budget
+        protocol = self._protocol
+        buffered = isinstance(protocol, BufferedProtocol)
+        tot_bytes = 0
         try:
-            try:
-                chunk = self._sock.recv(self._read_chunk_size)
-            except self.SocketError as e:
-                if self._read_continue(e):
-                    return
-                if raise_socket_error(e):
-                    raise
-                else:
-                    chunk = None
-            if chunk:
-                if self._paused_reading:
-                    self._read_buffer.append(chunk)
+            while True:
+                size = self._read_size
+                if buffered:
+                    if self._paused_reading:
+                        return
+                    buffer = protocol.get_buffer(size)
+                    size = len(buffer)
                 else:
-                    self._protocol.data_received(chunk)
-            else:
-                # We got empty data. Close the socket
+                    buffer = self._event_loop.read_buffer(size)
                 try:
-                    self._protocol.eof_received()
-                finally:
-                    self.close()
-            return
+                    nbytes = self._sock.recv_into(buffer, size)
+                except self.SocketError as e:
+                    if self._read_continue(e):
+                        return
+                    if raise_socket_error(e):
+                        raise
+                    else:
+                        nbytes = 0
+                if nbytes:
+                    self._adapt_read_size(size, nbytes)
+                    if buffered:
+                        protocol.buffer_updated(nbytes)
+                    else:
+                        # copy out of the shared buffer
+                        chunk = (bytes(buffer[:nbytes]) if ispy26 else
+                                 buffer[:nbytes].tobytes())
+                        if self._paused_reading:
+                            if self._read_buffer is None:
+                                self._read_buffer = []
+                            self._read_buffer.append(chunk)
+                        else:
+                            protocol.data_received(chunk)
+                    # When edge-triggered, keep reading until the socket
+                    # would block or the budget is exhausted
+                    if (not budget or self._closing or
+                            self._paused_reading):
+                        return
+                    tot_bytes += nbytes
+                    if tot_bytes >= budget:
+                        self._event_loop.call_soon(self._drain_read)
+                        return
+                else:
+                    # We got empty data. Close the socket
+                    try:
+                        protocol.eof_received()
+                    finally:
+                        self.close()
+                    return
         except self.SocketError:
             failure = None if self._closing else sys.exc_info()
         except Exception:
@@ -191,6 +473,59 @@ advantage of specific capabilities in some transport mechanisms.'''
         if failure:
             self.abort(failure)
 
+    def _adapt_read_size(self, size, nbytes):
+        # Large reads for bulk transfers, small ones for chatty connections
+        if nbytes == size:
+            if size < self._read_chunk_size:
+                self._read_size = min(2*size, self._read_chunk_size)
+        elif nbytes < size >> 2 and size > MIN_READ_CHUNK_SIZE:
+            self._read_size = max(size >> 1, MIN_READ_CHUNK_SIZE)
+
+    def _drain_read(self):
+        if not self._closing and not self._paused_reading:
+            self._ready_read()
+
+    def _replay_read(self):
+        # Deliver data read while paused, then read the socket again
+        if (self._closing or self._paused_reading or
+                self._read_buffer is None):
+            return
+        chunks, self._read_buffer = self._read_buffer, None
+        while chunks:
+            try:
+                self._protocol.data_received(chunks.pop(0))
+            except Exception:
+                self.abort(sys.exc_info())
+                return
+            if self._paused_reading:
+                # paused again, keep the rest for the next resume
+                if chunks:
+                    self._read_buffer = chunks
+                return
+        if not self._closing:
+            self._add_reader()
+
+    def _add_reader(self):
+        if self._drain_budget:
+            # the poller forgets the edge-triggered file descriptors left
+            # without handlers, as it happens while reading is paused
+            self._event_loop.io.set_edge_triggered(self._sock_fd)
+        self._event_loop.add_reader(self._sock_fd, self._ready_read)
+
+    def _drain_write(self):
+        if self._sock is not None and self._write_buffer:
+            self._ready_write()
+
+    def _shutdown(self, exc=None):
+        buffer = self._write_buffer
+        self._write_buffer_size = 0
+        super(SocketStreamTransport, self)._shutdown(exc)
+        if buffer:
+            for segment in buffer:
+                if segment.__class__ is _FileSegment:
+                    segment.done.callback(
+                        IOError('Transport closed before sending the file'))
+
     def mute_read_error(self, error):
         '''Return ``True`` if a socket error from a read operation is muted.
 
@@ -201,7 +536,10 @@ advantage of specific capabilities in some transport mechanisms.'''
 
 
 class SocketStreamSslTransport(SocketStreamTransport):
+    __slots__ = ('_rawsock', '_handshake_reading', '_handshake_writing')
     SocketError = getattr(ssl, 'SSLError', None)
+    _vectored = False
+    _zero_copy = False
 
     def __init__(self, event_loop, rawsock, protocol, sslcontext,
                  server_side=True, server_hostname=None, **kwargs):
@@ -279,20 +617,26 @@ class TcpServer(Server):
         sending of data.
 
     '''
-    def start_serving(self, backlog=100, sslcontext=None):
+    _sslcontext = None
+
+    def start_serving(self, backlog=100, sslcontext=None, reuse_port=False):
         '''Start serving the Tcp socket.
 
         :param backlog: Number of maximum connections
         :param sslcontext: optional SSLContext object.
+        :param reuse_port: bind the socket with ``SO_REUSEPORT``.
         :return: a :class:`pulsar.Deferred` called back when the server is
             serving the socket.'''
         if not self.event('start').done():
+            self._sslcontext = sslcontext
             res = self._event_loop.start_serving(self.protocol_factory,
                                                  host=self._host,
                                                  port=self._port,
+                                                 path=self._path,
                                                  sock=self._sock,
                                                  backlog=backlog,
-                                                 ssl=sslcontext)
+                                                 ssl=sslcontext,
+                                                 reuse_port=reuse_port)
             return res.add_callback(self._got_sockets
                                     ).add_both(partial(self.fire_event,
                                                        'start'))
@@ -302,15 +646,31 @@ class TcpServer(Server):
         if self._sock:
             sock, self._sock = self._sock, None
             self._event_loop.stop_serving(sock)
+            self._remove_path()
 
     def close(self):
         '''Same as :meth:`stop_serving` method.'''
         if self._sock:
             sock, self._sock = self._sock, None
             self._event_loop.stop_serving(sock)
+            self._remove_path()
             self._event_loop.call_soon(self._close)
         self.stop_serving()
 
+    def pause_accepting(self):
+        '''Remove the listening socket from the event loop poller.'''
+        if self._sock:
+            self._event_loop.remove_reader(self._sock.fileno())
+
+    def resume_accepting(self):
+        '''Add the listening socket back to the event loop poller.'''
+        if self._sock:
+            self._event_loop.add_reader(self._sock.fileno(),
+                                        sock_accept_connection,
+                                        self._event_loop,
+                                        self.protocol_factory,
+                                        self._sock, self._sslcontext)
+
     def _got_sockets(self, sockets):
         self._sock = sockets[0]
         self.logger.info('%s serving on %s', self._name,
@@ -322,10 +682,31 @@ class TcpServer(Server):
         self.fire_event('stop')
         yield self
 
+    def _remove_path(self):
+        # Remove the unix domain socket created by start_serving
+        if self._path:
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+
 
 def create_connection(event_loop, protocol_factory, host, port, ssl,
-                      family, proto, flags, sock, local_addr):
-    if host is not None or port is not None:
+                      family, proto, flags, sock, local_addr, path=None):
+    if path is not None:
+        if host is not None or port is not None or sock is not None:
+            raise ValueError(
+                'path and host/port/sock can not be specified at the '
+                'same time')
+        socket_factory = getattr(event_loop, 'socket_factory', socket.socket)
+        sock = socket_factory(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.setblocking(0)
+            yield event_loop.sock_connect(sock, path)
+        except socket.error:
+            sock.close()
+            raise
+    elif host is not None or port is not None:
         if sock is not None:
             raise ValueError(
                 'host/port and sock can not be specified at the same time')
@@ -403,14 +784,38 @@ def create_connection(event_loop, protocol_factory, host, port, ssl,
 
 
 def start_serving(event_loop, protocol_factory, host, port, ssl,
-                  family, flags, sock, backlog, reuse_address):
+                  family, flags, sock, backlog, reuse_address, path=None,
+                  reuse_port=False):
     #Coroutine which starts socket servers
-    if host is not None or port is not None:
+    if path is not None:
+        if host is not None or port is not None or sock is not None:
+            raise ValueError(
+                'path and host/port/sock can not be specified at the '
+                'same time')
+        # Remove a stale unix socket left by a previous server
+        try:
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                os.remove(path)
+        except OSError:
+            pass
+        socket_factory = getattr(event_loop, 'socket_factory', socket.socket)
+        sock = socket_factory(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(path)
+        except socket.error as err:
+            sock.close()
+            raise socket.error(err.errno, 'error while attempting '
+                               'to bind on address %r: %s'
+                               % (path, err.strerror.lower()))
+        sockets = [sock]
+    elif host is not None or port is not None:
         if sock is not None:
             raise ValueError(
                 'host/port and sock can not be specified at the same time')
         if reuse_address is None:
             reuse_address = os.name == 'posix' and sys.platform != 'cygwin'
+        if reuse_port and not hasattr(socket, 'SO_REUSEPORT'):
+            raise ValueError('reuse_port not supported by socket module')
         sockets = []
         if host == '':
             host = None
@@ -430,6 +835,9 @@ def start_serving(event_loop, protocol_factory, host, port, ssl,
                 if reuse_address:
                     sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR,
                                     True)
+                if reuse_port:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT,
+                                    True)
                 # Disable IPv4/IPv6 dual stack support (enabled by
                 # default on Linux) which makes a single socket
                 # listen on both address families.
@@ -485,7 +893,8 @@ def sock_connect(event_loop, sock, address, future=None):
                     raise
         else:   # This is the callback from the event loop
             event_loop.remove_connector(fd)
-            if future.cancelled():
+            # both the write and error handlers may fire in the same event
+            if future.done():
                 return
             err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
             if err != 0:
@@ -525,7 +934,13 @@ def sock_accept(event_loop, sock, future=None):    # pragma    nocover
 
 
 def sock_accept_connection(event_loop, protocol_factory, sock, ssl):
-    '''Used by start_serving.'''
+    '''Used by start_serving.
+
+    Accept up to ``NUMBER_ACCEPTS`` connections. It stops as soon as the
+    ``protocol_factory`` removes the reader of ``sock`` from the poller,
+    which is how a :class:`TcpServer` stops accepting connections when it
+    reaches its maximum number of concurrent connections.'''
+    fd = sock.fileno()
     try:
         for i in range(NUMBER_ACCEPTS):
             try:
@@ -549,5 +964,14 @@ def sock_accept_connection(event_loop, protocol_factory, sock, ssl):
             else:
                 SocketStreamTransport(event_loop, conn, protocol,
                                       extra={'addr': address})
+            if not _has_reader(event_loop, fd):
+                break
     except Exception:
         logger(event_loop).exception('Could not accept new connection')
+
+
+def _has_reader(event_loop, fd):
+    try:
+        return event_loop.io.handlers(fd)[1] is not None
+    except KeyError:
+        return False
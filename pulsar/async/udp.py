@@ -1,19 +1,43 @@
 import socket
+from collections import deque
 
 from pulsar.utils.structures import OrderedDict
 from pulsar.utils.internet import (TRY_WRITE_AGAIN, TRY_READ_AGAIN,
                                    ECONNREFUSED, BUFFER_MAX_SIZE)
 
+from pulsar.utils.pep import range
+
 from .internet import SocketTransport
-from .consts import LOG_THRESHOLD_FOR_CONNLOST_WRITES
+from .consts import LOG_THRESHOLD_FOR_CONNLOST_WRITES, MAX_DATAGRAMS_PER_READ
 
 
 class SocketDatagramTransport(SocketTransport):
+    '''A :class:`SocketTransport` for datagram (UDP) sockets.
+
+    On a read event the transport reads up to :attr:`max_datagrams`
+    datagrams, or until the socket would block, and delivers them to the
+    protocol with a single call to
+    :meth:`pulsar.DatagramProtocol.datagrams_received`.
+
+    .. attribute:: max_datagrams
+
+        Maximum number of datagrams read on a read event. Default
+        :data:`MAX_DATAGRAMS_PER_READ`.
+    '''
+    max_packet_size = BUFFER_MAX_SIZE
 
-    def __init__(self, event_loop, sock, protocol, address=None, **kwargs):
+    def __init__(self, event_loop, sock, protocol, address=None,
+                 max_datagrams=None, **kwargs):
         self._address = address
+        self.max_datagrams = max_datagrams or MAX_DATAGRAMS_PER_READ
         super(SocketDatagramTransport, self).__init__(event_loop, sock,
                                                       protocol, **kwargs)
+        self._write_buffer = deque()
+
+    @property
+    def writing(self):
+        '''``True`` when datagrams are waiting to be sent.'''
+        return bool(self._write_buffer)
 
     def _do_handshake(self):
         self._event_loop.add_reader(self._sock_fd, self._ready_read)
@@ -28,23 +52,32 @@ class SocketDatagramTransport(SocketTransport):
 
     def sendto(self, data, addr=None):
         '''Send chunk of ``data`` to the endpoint.'''
-        if not data:
-            return
+        if data:
+            self.sendmany((data,), addr)
+
+    def sendmany(self, datagrams, addr=None):
+        '''Send several ``datagrams`` to the endpoint ``addr``.
+
+        The datagrams are sent in a single pass, until the socket would
+        block. The rest is sent when the socket becomes writable.
+        '''
         if self._address:
             assert addr in (None, self._address)
+            addr = None
         if self._check_closed():
             return
         writing = self.writing
-        if data:
-            assert isinstance(data, bytes)
-            if len(data) > BUFFER_MAX_SIZE:
-                for i in range(0, len(data), BUFFER_MAX_SIZE):
-                    chunk = data[i:i+BUFFER_MAX_SIZE]
-                    self._write_buffer.append((chunk, addr))
-            else:
-                self._write_buffer.append((data, addr))
+        buffer = self._write_buffer
+        for data in datagrams:
+            if data:
+                assert isinstance(data, bytes)
+                if len(data) > BUFFER_MAX_SIZE:
+                    for i in range(0, len(data), BUFFER_MAX_SIZE):
+                        buffer.append((data[i:i+BUFFER_MAX_SIZE], addr))
+                else:
+                    buffer.append((data, addr))
         # Try to write only when not waiting for write callbacks
-        if not writing:
+        if not writing and buffer:
             self._ready_sendto()
             if self.writing:    # still writing
                 self._event_loop.add_writer(self._sock_fd, self._ready_sendto)
@@ -52,27 +85,29 @@ class SocketDatagramTransport(SocketTransport):
                 self._event_loop.call_soon(self._shutdown)
 
     def _ready_read(self):
-        # Read from the socket until we get EWOULDBLOCK or equivalent.
-        # If any other error occur, abort the connection and re-raise.
-        passes = 0
-        chunk = True
-        while chunk:
-            try:
+        # Read up to max_datagrams datagrams, until we get EWOULDBLOCK or
+        # equivalent, and deliver them in one batch. If any other error
+        # occur, abort the connection.
+        recvfrom = self._sock.recvfrom
+        size = self.max_packet_size
+        datagrams = []
+        append = datagrams.append
+        try:
+            for _ in range(self.max_datagrams):
                 try:
-                    data, addr = self._sock.recvfrom(self.max_packet_size)
+                    append(recvfrom(size))
                 except socket.error as e:
                     if e.args[0] in TRY_READ_AGAIN:
-                        return
+                        break
+                    elif e.args[0] == ECONNREFUSED:
+                        self._protocol.connection_refused(e)
+                        break
                     else:
                         raise
-                if chunk:
-                    if self._paused:
-                        self._read_buffer.append((data, addr))
-                    else:
-                        self._protocol.datagram_received(data, addr)
-                passes += 1
-            except Exception as exc:
-                self.abort(exc)
+            if datagrams:
+                self._protocol.datagrams_received(datagrams)
+        except Exception as exc:
+            self.abort(exc)
 
     def _ready_sendto(self):
         # Do the actual writing
@@ -80,23 +115,26 @@ class SocketDatagramTransport(SocketTransport):
         tot_bytes = 0
         if not buffer:
             self.logger.warning('handling write on a 0 length buffer')
+        send = self._sock.send
+        sendto = self._sock.sendto
+        popleft = buffer.popleft
         try:
             while buffer:
                 data, addr = buffer[0]
                 try:
-                    if self._address:
-                        sent = self._sock.send(data)
+                    if addr is None:
+                        tot_bytes += send(data)
                     else:
-                        sent = self._sock.sendto(data, addr)
-                    buffer.popleft()
-                    if sent < len(data):
-                        buffer.appendleft((data[sent:], addr))
-                    tot_bytes += sent
+                        tot_bytes += sendto(data, addr)
+                    # a datagram is sent whole or not at all
+                    popleft()
                 except self.SocketError as e:
                     if e.args[0] in TRY_WRITE_AGAIN:
                         break
-                    elif e.args[0] == ECONNREFUSED and not self._address:
-                        break
+                    elif e.args[0] == ECONNREFUSED:
+                        # drop the datagram
+                        popleft()
+                        self._protocol.connection_refused(e)
                     else:
                         raise
         except Exception as e:
@@ -110,7 +148,8 @@ class SocketDatagramTransport(SocketTransport):
 
 
 def create_datagram_endpoint(event_loop, protocol_factory, local_addr,
-                             remote_addr, family, proto, flags):
+                             remote_addr, family, proto, flags,
+                             max_datagrams=None):
     if not (local_addr or remote_addr):
         if family == socket.AF_UNSPEC:
             raise ValueError('unexpected address family')
@@ -168,5 +207,6 @@ def create_datagram_endpoint(event_loop, protocol_factory, local_addr,
         raise exceptions[0]
     protocol = protocol_factory()
     transport = SocketDatagramTransport(event_loop, sock, protocol, r_addr,
+                                        max_datagrams=max_datagrams,
                                         extra={'addr': l_addr})
     yield transport, protocol
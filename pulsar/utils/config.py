@@ -816,6 +816,86 @@ class Coverage(Global):
         """
 
 
+class MailboxAddress(Global):
+    name = "mailbox_address"
+    flags = ["--mailbox-address"]
+    meta = "ADDRESS"
+    validator = validate_string
+    default = None
+    desc = """\
+        The address of the arbiter mailbox.
+
+        A string of the form ``HOST:PORT`` or ``unix:PATH``. A unix domain
+        socket avoids the TCP/IP stack for messages between actors on the
+        same host. If not set, the mailbox listens on a random port of
+        ``127.0.0.1``.
+        """
+
+
+class PeerMailbox(Global):
+    name = "peer_mailbox"
+    flags = ["--peer-mailbox"]
+    validator = validate_bool
+    action = "store_true"
+    default = False
+    desc = """\
+        Actors exchange messages over direct connections.
+
+        Each actor serves its own mailbox and, the first time it sends a
+        message to another actor, asks the arbiter for the address of the
+        target mailbox and connects to it. Messages are routed by the
+        arbiter until the direct connection is available, or if it is lost.
+        """
+
+
+class MailboxBatchFrames(Global):
+    name = "mailbox_batch_frames"
+    flags = ["--mailbox-batch-frames"]
+    validator = validate_bool
+    action = "store_true"
+    default = False
+    desc = """\
+        Send messages as multi-message frames.
+
+        Messages sent to a mailbox connection during an event loop
+        iteration are always sent with a single write. With this option
+        they are also encoded in a single frame, which the receiver
+        decodes in one pass, if the other end of the connection supports
+        it.
+        """
+
+
+class MailboxCodec(Global):
+    name = "mailbox_codec"
+    flags = ["--mailbox-codec"]
+    validator = validate_string
+    choices = ('fast', 'pickle')
+    default = 'fast'
+    desc = """\
+        The codec used to encode messages exchanged between actors.
+
+        ``fast`` encodes messages made of built-in python types with the
+        :mod:`marshal` module and pickles the others. It is used only when
+        both ends of a mailbox connection run the same python version,
+        otherwise messages are pickled.
+        """
+
+
+class TcpThreadMailbox(Global):
+    name = "tcp_thread_mailbox"
+    flags = ["--tcp-thread-mailbox"]
+    validator = validate_bool
+    action = "store_true"
+    default = False
+    desc = """\
+        Thread actors exchange messages with the arbiter via TCP.
+
+        By default, actors running on a thread of the arbiter process
+        pass messages to the arbiter event loop, without sockets and
+        without encoding them.
+        """
+
+
 ############################################################################
 ##    Worker Processes
 section_docs['Worker Processes'] = '''
@@ -71,7 +71,10 @@ SOCKET_INTERRUPT_ERRORS = (EINTR, ECONNRESET)
 
 def parse_address(netloc, default_port=8000):
     '''Parse an internet address ``netloc`` and return a tuple with
-``host`` and ``port``.'''
+``host`` and ``port``.
+
+A ``unix:PATH`` address returns ``PATH``, the path of a unix domain
+socket.'''
     if isinstance(netloc, tuple):
         if len(netloc) != 2:
             raise ValueError('Invalid address %s' % str(netloc))
@@ -122,10 +125,17 @@ and this example::
 
     >>> parse_connection_string('redis://127.0.0.1:6379?db=3&password=bla')
     ('redis', ('127.0.0.1', 6379), {'db': '3', 'password': 'bla'})
+
+A unix domain socket address is a string::
+
+    >>> parse_connection_string('redis://unix:/tmp/redis.sock?db=3')
+    ('redis', '/tmp/redis.sock', {'db': '3'})
 """
     if '://' not in connection_string:
         connection_string = 'dummy://%s' % connection_string
     scheme, host, path, query, fragment = urlsplit(connection_string)
+    if host.endswith('unix:') and path:
+        host, path = host + path, ''
     if not scheme and not host:
         host, path = path, ''
     elif path and not query:
@@ -147,7 +157,10 @@ and this example::
 
 
 def get_connection_string(scheme, address, params):
-    address = ':'.join((str(b) for b in address))
+    if isinstance(address, tuple):
+        address = ':'.join((str(b) for b in address))
+    else:
+        address = 'unix:%s' % address
     if params:
         address += '?' + urlencode(params)
     return scheme + '://' + address
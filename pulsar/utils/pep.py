@@ -21,6 +21,7 @@ except ImportError:
 
 if ispy3k:  # Python 3
     import pickle
+    from _thread import get_ident
     string_type = str
     ascii_letters = string.ascii_letters
     zip = zip
@@ -71,6 +72,7 @@ if ispy3k:  # Python 3
 else:   # pragma : no cover
     from itertools import izip as zip, imap as map
     import cPickle as pickle
+    from thread import get_ident
     from .fallbacks.py2 import *
     string_type = unicode
     ascii_letters = string.letters
@@ -1,4 +1,5 @@
 import os
+import sys
 import fcntl
 import resource
 import grp
@@ -6,7 +7,8 @@ import pwd
 import signal
 import socket
 import ctypes
-from multiprocessing import Pipe
+import struct
+from threading import RLock
 
 from .base import *
 
@@ -18,7 +20,8 @@ __all__ = ['close_on_exec',
            'get_uid',
            'get_gid',
            'get_maxfd',
-           'set_owner_process']
+           'set_owner_process',
+           'sendfile']
 
 # standard signal quit
 EXIT_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGABRT, signal.SIGQUIT)
@@ -26,6 +29,10 @@ EXIT_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGABRT, signal.SIGQUIT)
 REDIRECT_TO = getattr(os, "devnull", "/dev/null")
 
 socketpair = socket.socketpair
+# eventfd flags on linux
+EFD_CLOEXEC = 0o2000000
+EFD_NONBLOCK = 0o4000
+_EVENTFD_ONE = struct.pack('@Q', 1)
 
 
 def get_parent_id():
@@ -115,33 +122,103 @@ ActiveState recipe at http://code.activestate.com/recipes/278731/"""
     os.dup2(0, 2)
 
 
+def _eventfd():
+    # A non blocking eventfd, or None if not available
+    if hasattr(os, 'eventfd'):
+        return os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+    elif sys.platform.startswith('linux'):
+        try:
+            eventfd = ctypes.CDLL(None, use_errno=True).eventfd
+        except (OSError, AttributeError):
+            return None
+        fd = eventfd(0, EFD_NONBLOCK | EFD_CLOEXEC)
+        if fd >= 0:
+            return fd
+
+
+def _libc_sendfile():
+    # sendfile(2) via ctypes on linux, when os.sendfile is not available
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        func = ctypes.CDLL(None, use_errno=True).sendfile64
+    except (OSError, AttributeError):
+        return None
+    func.argtypes = (ctypes.c_int, ctypes.c_int,
+                     ctypes.POINTER(ctypes.c_int64), ctypes.c_size_t)
+    func.restype = ctypes.c_ssize_t
+
+    def sendfile(out_fd, in_fd, offset, count):
+        sent = func(out_fd, in_fd, ctypes.byref(ctypes.c_int64(offset)),
+                    count)
+        if sent < 0:
+            eno = ctypes.get_errno()
+            raise OSError(eno, os.strerror(eno))
+        return sent
+
+    return sendfile
+
+
+sendfile = getattr(os, 'sendfile', None) or _libc_sendfile()
+'''Copy ``count`` bytes from file descriptor ``in_fd``, starting at
+``offset``, to file descriptor ``out_fd`` without passing the data through
+user space. ``None`` when not supported by the platform.'''
+
+
 class Waker(object):
+    '''Wake up an event loop waiting for I/O from another thread.
 
+    It uses an eventfd on linux and a pipe elsewhere. Wake-ups are
+    coalesced: :meth:`wake` writes only if no wake-up is pending and
+    :meth:`consume` drains all of them in one read.
+    '''
     def __init__(self):
-        r, w = Pipe(duplex=False)
-        _set_non_blocking(r.fileno())
-        _set_non_blocking(w.fileno())
-        close_on_exec(r.fileno())
-        close_on_exec(w.fileno())
-        self._writer = w
-        self._reader = r
+        self._pending = False
+        # Re-entrant, a signal handler can wake the loop while it consumes
+        self._lock = RLock()
+        fd = _eventfd()
+        if fd is None:
+            r, w = os.pipe()
+            for fd in (r, w):
+                _set_non_blocking(fd)
+                close_on_exec(fd)
+            self._reader, self._writer = r, w
+            self._data = b'x'
+            self._size = 4096
+        else:
+            self._reader = self._writer = fd
+            self._data = _EVENTFD_ONE
+            self._size = 8
 
     def __str__(self):
-        return 'Pipe waker %s' % self.fileno()
+        if self._reader == self._writer:
+            return 'Eventfd waker %s' % self._reader
+        else:
+            return 'Pipe waker %s' % self._reader
 
     def fileno(self):
-        return self._reader.fileno()
+        return self._reader
 
     def wake(self):
-        try:
-            self._writer.send(b'x')
-        except IOError:
-            pass
+        with self._lock:
+            if not self._pending:
+                self._pending = True
+                try:
+                    os.write(self._writer, self._data)
+                except OSError:
+                    pass
 
     def consume(self):
-        r = self._reader
-        try:
-            while r.poll():
-                r.recv()
-        except (IOError, EOFError):
-            pass
+        # The flag is cleared after the read, under the lock shared with
+        # wake(), so that a pending flag always has data to read
+        with self._lock:
+            try:
+                os.read(self._reader, self._size)
+            except OSError:
+                pass
+            self._pending = False
+
+    def close(self):
+        os.close(self._reader)
+        if self._writer != self._reader:
+            os.close(self._writer)
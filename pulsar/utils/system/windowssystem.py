@@ -16,7 +16,8 @@ __all__ = ['close_on_exec',
            'get_uid',
            'get_gid',
            'get_maxfd',
-           'set_owner_process']
+           'set_owner_process',
+           'sendfile']
 
 # See: http://msdn.microsoft.com/en-us/library/ms724935(VS.85).aspx
 SetHandleInformation = ctypes.windll.kernel32.SetHandleInformation
@@ -29,6 +30,7 @@ EXIT_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGABRT, signal.SIGBREAK)
 
 
 set_owner_process = lambda gid, uid: None
+sendfile = None
 
 
 def get_parent_id():
@@ -531,6 +531,19 @@ class TestHttpClient(TestHttpClientBase, unittest.TestCase):
         self.assertEqual(response.status_code, 304)
         self.assertFalse('Content-length' in response.headers)
 
+    def test_media_file_content(self):
+        http = self.client()
+        response = yield http.get(self.httpbin('media/httpbin.css')
+                                  ).on_finished
+        self.assertEqual(response.status_code, 200)
+        path = os.path.join(os.path.dirname(examples.__file__), 'httpbin',
+                            'assets', 'httpbin.css')
+        with open(path, 'rb') as f:
+            content = f.read()
+        self.assertEqual(int(response.headers['content-length']),
+                         len(content))
+        self.assertEqual(response.get_content(), content)
+
     def test_http_get_timeit(self):
         N = 10
         client = self.client()
@@ -1,15 +1,19 @@
 '''Tests the wsgi middleware in pulsar.apps.wsgi'''
 import time
 import sys
+from functools import partial
+from io import BytesIO
 from datetime import datetime, timedelta
 
 import pulsar
 from pulsar import Http404
-from pulsar.utils.pep import range, zip, pickle
+from pulsar.utils.pep import range, zip, pickle, get_event_loop
 from pulsar.apps import wsgi
 from pulsar.apps import http
 from pulsar.utils.multipart import parse_form_data, MultipartError
 from pulsar.apps.wsgi.utils import cookie_date
+from pulsar.apps.wsgi.server import StreamReader
+from pulsar.utils.httpurl import Headers, http_parser
 from pulsar.apps.test import unittest
 
 
@@ -81,6 +85,19 @@ class WsgiResponseTests(unittest.TestCase):
             self.assertEqual(a, ('line {0}\n'.format(l+1)).encode('utf-8'))
         self.assertEqual(len(data), 10)
 
+    def test_file_wrapper(self):
+        environ = wsgi.test_wsgi_environ()
+        file_wrapper = environ['wsgi.file_wrapper']
+        self.assertEqual(file_wrapper, wsgi.FileWrapper)
+        wrapper = file_wrapper(BytesIO(b'x'*10), 4)
+        self.assertEqual(wrapper.fileno(), None)
+        r = wsgi.WsgiResponse(content=wrapper)
+        self.assertTrue(r.is_streamed)
+        self.assertEqual(iter(r), wrapper)
+        self.assertEqual(list(wrapper), [b'xxxx', b'xxxx', b'xx'])
+        r.close()
+        self.assertTrue(wrapper.filelike.closed)
+
     def testForCoverage(self):
         r = wsgi.WsgiResponse(environ={'PATH_INFO': 'bla/'})
         self.assertEqual(r.path, 'bla/')
@@ -141,6 +158,64 @@ class WsgiResponseTests(unittest.TestCase):
         self.assertEqual(response['content-type'], 'text/plain')
 
 
+class ReadingTransport(object):
+    closing = False
+
+    def __init__(self):
+        self.calls = []
+
+    def pause_reading(self):
+        self.calls.append('pause')
+
+    def resume_reading(self):
+        self.calls.append('resume')
+
+
+class TestStreamReader(unittest.TestCase):
+
+    def stream(self, length, limit):
+        parser = http_parser(kind=0)
+        transport = ReadingTransport()
+        stream = StreamReader(Headers(kind='client'), parser, transport,
+                              limit=limit)
+        self.feed(stream, ('POST / HTTP/1.1\r\nContent-Length: %s\r\n\r\n'
+                           % length).encode('utf-8'))
+        return stream
+
+    def feed(self, stream, data):
+        stream.parser.execute(data, len(data))
+        stream.data_processed(None, data=data)
+
+    def test_backpressure(self):
+        stream = self.stream(100, 20)
+        calls = stream.transport.calls
+        self.feed(stream, 30*b'x')
+        self.assertEqual(calls, ['pause'])
+        self.assertEqual(stream.read(10), 10*b'x')
+        self.assertEqual(calls, ['pause', 'resume'])
+        d = stream.read(50)
+        self.assertFalse(d.done())
+        self.feed(stream, 40*b'y')
+        self.assertEqual(d.result, 20*b'x' + 30*b'y')
+        self.feed(stream, 25*b'z')
+        self.assertEqual(calls, ['pause', 'resume', 'pause'])
+        self.feed(stream, 5*b'z')
+        self.assertTrue(stream.done())
+        self.assertEqual(stream.read(), 10*b'y' + 30*b'z')
+        self.assertEqual(calls, ['pause', 'resume', 'pause', 'resume'])
+        self.assertEqual(stream.read(), b'')
+
+    def test_read_whole_body(self):
+        stream = self.stream(100, 20)
+        calls = stream.transport.calls
+        self.feed(stream, 30*b'x')
+        d = stream.read()
+        self.assertEqual(calls, ['pause', 'resume'])
+        self.feed(stream, 70*b'y')
+        self.assertEqual(d.result, 30*b'x' + 70*b'y')
+        self.assertEqual(calls, ['pause', 'resume'])
+
+
 class testWsgiApplication(unittest.TestCase):
 
     def testBuildWsgiApp(self):
@@ -226,3 +301,37 @@ class TestWsgiMiddleware(unittest.TestCase):
             pass
         else:
             assert False
+
+
+class TestLoadShedding(unittest.TestCase):
+
+    def test_service_unavailable(self):
+        loop = get_event_loop()
+        waiting = pulsar.Deferred()
+
+        def slow(environ, start_response):
+            def respond(result):
+                start_response('200 OK', [('Content-Length', '2')])
+                return [b'OK']
+            return waiting.add_callback(respond)
+
+        cfg = pulsar.Config(apps=['socket', 'wsgi'])
+        cfg.set('max_pending_requests', 1)
+        server = pulsar.TcpServer(
+            loop, '127.0.0.1', 0,
+            consumer_factory=partial(wsgi.HttpServerResponse, slow, cfg))
+        yield server.start_serving()
+        url = 'http://%s:%s/' % server.address
+        client = http.HttpClient()
+        first = client.get(url)
+        yield pulsar.async_while(2, lambda: not server.pending_requests)
+        self.assertEqual(server.pending_requests, 1)
+        response = yield client.get(url).on_finished
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['connection'], 'close')
+        self.assertEqual(server.shed_requests, 1)
+        waiting.callback(None)
+        response = yield first.on_finished
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(server.pending_requests, 0)
+        server.close()
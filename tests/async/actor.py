@@ -37,6 +37,29 @@ class create_echo_server(object):
         yield actor
 
 
+def ping_peer(actor, aid, num):
+    '''Ping ``aid`` until the direct connection is available, then ``num``
+    times more.'''
+    yield actor.send(aid, 'ping')
+    yield async_while(5, lambda: not actor.peers.info()['connections'])
+    for i in range(num):
+        pong = yield actor.send(aid, 'ping')
+        assert pong == 'pong'
+    yield actor.peers.info()
+
+
+def mailbox_class(actor, aid=None):
+    if aid:
+        actor = actor.get_actor(aid)
+    return actor.mailbox.__class__.__name__
+
+
+def echo_arbiter(actor, value):
+    result = yield actor.send('arbiter', 'echo', value)
+    assert result == value
+    yield result is value
+
+
 class TestProxy(unittest.TestCase):
 
     def test_get_proxy(self):
@@ -121,6 +144,45 @@ class TestActorThread(ActorTestMixin, unittest.TestCase):
         self.assertEqual(result, b'Hello')
         yield self.stop_actors(proxy)
 
+    def test_peer_mailbox(self):
+        proxy1 = yield self.spawn(peer_mailbox=True)
+        proxy2 = yield self.spawn(peer_mailbox=True)
+        info = yield send(proxy1, 'run', ping_peer, proxy2.aid, 5)
+        self.assertEqual(info['connections'], 1)
+        self.assertEqual(info['direct_messages'], 5)
+        self.assertTrue(info['routed_messages'] >= 1)
+        info = yield send(proxy2, 'info')
+        self.assertEqual(info['peers']['incoming_connections'], 1)
+        # only the arbiter knows the address of peer mailboxes
+        info = yield send(proxy1, 'peer_address', proxy2.aid)
+        self.assertEqual(info, None)
+        yield self.stop_actors(proxy1, proxy2)
+
+    def test_thread_mailbox(self):
+        proxy = yield self.spawn(tcp_thread_mailbox=False)
+        if self.concurrency == 'thread':
+            names = ('ThreadMailbox', 'ThreadMailbox')
+        else:
+            names = ('MailboxClient', 'MailboxConsumer')
+        yield self.async.assertEqual(send(proxy, 'run', mailbox_class),
+                                     names[0])
+        # the mailbox of the actor proxy in the arbiter
+        yield self.async.assertEqual(
+            send('arbiter', 'run', mailbox_class, proxy.aid), names[1])
+        yield self.async.assertEqual(send(proxy, 'ping'), 'pong')
+        # messages are copied
+        yield self.async.assertEqual(
+            send(proxy, 'run', echo_arbiter, {'a': [1, 2]}), False)
+        yield self.stop_actors(proxy)
+
+    def test_tcp_thread_mailbox(self):
+        proxy = yield self.spawn(tcp_thread_mailbox=True)
+        yield self.async.assertEqual(send(proxy, 'run', mailbox_class),
+                                     'MailboxClient')
+        yield self.async.assertEqual(send(proxy, 'ping'), 'pong')
+        yield self.stop_actors(proxy)
+
+
 @dont_run_with_thread
 class TestActorProcess(TestActorThread):
     concurrency = 'process'
@@ -0,0 +1,118 @@
+'''Tests the asyncio event loop.'''
+import socket
+
+from pulsar import (Deferred, Protocol, SocketStreamTransport, TcpServer,
+                    maybe_async)
+from pulsar.apps.test import unittest, tcp_socketpair, CountingProtocol
+
+try:
+    from pulsar.async.aioloop import (asyncio, AsyncioEventLoop, from_future,
+                                      to_future)
+except ImportError:     # pragma    nocover
+    asyncio = None
+
+from examples.echo.manage import EchoServerProtocol
+
+
+@unittest.skipUnless(asyncio, 'Requires asyncio or trollius')
+class TestAsyncioEventLoop(unittest.TestCase):
+
+    def loop(self):
+        return AsyncioEventLoop(iothreadloop=False)
+
+    def test_call_soon(self):
+        loop = self.loop()
+        d = Deferred()
+        calls = []
+        cbk = loop.call_soon(calls.append, 1)
+        self.assertTrue(loop.has_callback(cbk))
+        loop.call_soon(calls.append, 2).cancel()
+        loop.call_soon_idle(calls.append, 3)
+        loop.call_soon(d.callback, 'OK')
+        self.assertEqual(loop.run_until_complete(d), 'OK')
+        self.assertEqual(calls, [1, 3])
+        self.assertFalse(loop.has_callback(cbk))
+
+    def test_call_later(self):
+        loop = self.loop()
+        d = Deferred()
+        calls = []
+        loop.call_later(0.2, calls.append, 1).cancel()
+        loop.call_later(0.1, calls.append, 2)
+        loop.call_timeout(0.3, d.callback, 'OK')
+        self.assertEqual(loop.run_until_complete(d, timeout=2), 'OK')
+        self.assertEqual(calls, [2])
+
+    def test_coroutine(self):
+        loop = self.loop()
+
+        def coro():
+            d = Deferred()
+            loop.call_later(0.1, d.callback, 'OK')
+            result = yield d
+            yield result
+        d = maybe_async(coro(), event_loop=loop)
+        self.assertEqual(loop.run_until_complete(d, timeout=2), 'OK')
+
+    def test_stop(self):
+        loop = self.loop()
+        loop.call_later(0.1, loop.stop)
+        loop.run_forever()
+        self.assertFalse(loop.is_running())
+
+    def test_transport(self):
+        loop = self.loop()
+        size = 1024*1024
+        r, w = tcp_socketpair()
+        sink = CountingProtocol(size)
+        reader = SocketStreamTransport(loop, r, sink)
+        writer = SocketStreamTransport(loop, w, Protocol())
+        writer.write(size*b'x')
+        loop.run_until_complete(sink.done, timeout=10)
+        self.assertEqual(sink.received, size)
+        reader.close()
+        writer.close()
+
+    def test_echo_server(self):
+        loop = self.loop()
+        server = TcpServer(loop, '127.0.0.1', 0, EchoServerProtocol)
+        loop.run_until_complete(server.start_serving(), timeout=5)
+        client = socket.create_connection(server.address)
+        client.sendall(b'ping\r\n\r\n')
+        d = Deferred()
+        loop.add_reader(client.fileno(), lambda: d.callback(client.recv(100)))
+        self.assertEqual(loop.run_until_complete(d, timeout=5),
+                         b'ping\r\n\r\n')
+        loop.remove_reader(client.fileno())
+        client.close()
+        server.close()
+
+    def test_from_future(self):
+        loop = self.loop()
+        future = asyncio.Future(loop=loop.asyncio_loop)
+        d = maybe_async(future)
+        self.assertTrue(isinstance(d, Deferred))
+        loop.call_soon(future.set_result, 'OK')
+        self.assertEqual(loop.run_until_complete(d, timeout=2), 'OK')
+        future = asyncio.Future(loop=loop.asyncio_loop)
+        d = from_future(future)
+        loop.call_soon(future.set_exception, ValueError('test'))
+        self.assertRaises(ValueError, loop.run_until_complete, d, 2)
+        future = asyncio.Future(loop=loop.asyncio_loop)
+        d = from_future(future)
+        d.cancel()
+        self.assertTrue(future.cancelled())
+
+    def test_to_future(self):
+        loop = self.loop()
+        d = Deferred()
+        future = to_future(d, loop=loop.asyncio_loop)
+        self.assertFalse(future.done())
+        d.callback('OK')
+        self.assertEqual(future.result(), 'OK')
+        d = Deferred()
+        future = to_future(d, loop=loop.asyncio_loop)
+        d.callback(ValueError('test'))
+        self.assertTrue(isinstance(future.exception(), ValueError))
+        future = to_future(3, loop=loop.asyncio_loop)
+        self.assertEqual(future.result(), 3)
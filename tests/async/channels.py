@@ -0,0 +1,105 @@
+'''Tests the shared memory channels.'''
+import os
+
+from pulsar import send, async_while, Channel
+from pulsar.utils.pep import pickle, range
+from pulsar.apps.test import (unittest, ActorTestMixin,
+                              dont_run_with_thread)
+
+
+def start_consumer(actor, channel):
+    '''Consume ``channel`` and store the records in ``actor.extra``.'''
+    records = actor.extra['records'] = []
+    channel.consume(lambda view: records.append(bytes(view)))
+    actor.extra['channel'] = channel
+    return channel.consumer
+
+
+def records(actor, num):
+    '''Wait for ``num`` records.'''
+    records = actor.extra['records']
+    yield async_while(5, lambda: len(records) < num)
+    yield records
+
+
+class TestChannel(unittest.TestCase):
+
+    def setUp(self):
+        self.channel = Channel(256)
+
+    def tearDown(self):
+        self.channel.close()
+
+    def read(self, channel=None):
+        result = []
+        (channel or self.channel).read(lambda view: result.append(
+            bytes(view)))
+        return result
+
+    def test_channel(self):
+        channel = self.channel
+        self.assertEqual(channel.size, 256)
+        self.assertEqual(channel.max_size, 120)
+        self.assertEqual(channel.consumer, None)
+        self.assertTrue(os.path.isfile(channel.path))
+        self.assertEqual(str(channel), 'Channel(%s)' % channel.name)
+        self.assertTrue(channel.write(b'Hello'))
+        self.assertTrue(channel.write(b''))
+        self.assertEqual(self.read(), [b'Hello', b''])
+        self.assertEqual(self.read(), [])
+
+    def test_wrap_around(self):
+        records = [os.urandom(i % 100) for i in range(200)]
+        result = []
+        for data in records:
+            self.assertTrue(self.channel.write(data))
+            result.extend(self.read())
+        self.assertEqual(result, records)
+
+    def test_full(self):
+        channel = self.channel
+        self.assertTrue(channel.write(b'a'*120))
+        self.assertTrue(channel.write(b'b'*50))
+        self.assertFalse(channel.write(b'c'*120))
+        self.assertEqual(self.read(), [b'a'*120, b'b'*50])
+        # the record goes after the end of the buffer
+        self.assertTrue(channel.write(b'c'*120))
+        self.assertEqual(self.read(), [b'c'*120])
+        self.assertRaises(ValueError, channel.write, b'd'*121)
+
+    def test_pickle(self):
+        self.channel.write(b'Hello')
+        channel = pickle.loads(pickle.dumps(self.channel))
+        self.assertEqual(channel.path, self.channel.path)
+        self.assertEqual(channel.size, 256)
+        self.assertEqual(self.read(channel), [b'Hello'])
+        self.assertEqual(self.read(), [])
+        channel.close()
+        self.assertTrue(channel.closed)
+        self.assertTrue(os.path.isfile(channel.path))
+        self.channel.close()
+        self.assertFalse(os.path.isfile(channel.path))
+
+
+class TestChannelActor(ActorTestMixin, unittest.TestCase):
+    concurrency = 'thread'
+
+    def test_consume(self):
+        proxy = yield self.spawn()
+        channel = Channel(2**17)
+        self.assertTrue(channel.write(b'first'))
+        consumer = yield send(proxy, 'run', start_consumer, channel)
+        self.assertEqual(consumer, proxy.aid)
+        self.assertEqual(channel.consumer, proxy.aid)
+        data = [os.urandom(2**12) for i in range(30)]
+        for record in data:
+            self.assertTrue(channel.write(record))
+        result = yield send(proxy, 'run', records, len(data) + 1)
+        channel.close()
+        self.assertEqual(result, [b'first'] + data)
+        yield self.stop_actors(proxy)
+
+
+@dont_run_with_thread
+class TestChannelProcess(TestChannelActor):
+    concurrency = 'process'
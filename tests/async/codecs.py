@@ -0,0 +1,173 @@
+'''Tests the mailbox message codecs.'''
+import sys
+from collections import namedtuple
+
+from pulsar import send, multi_async, Failure, ProtocolError
+from pulsar.utils.pep import to_string
+from pulsar.utils.config import Config
+from pulsar.async.codecs import (CODECS, MessageCodec, FastCodec,
+                                 PickleCodec, decode, negotiate)
+from pulsar.apps.test import unittest, ActorTestMixin, mute_failure
+
+
+Point = namedtuple('Point', 'x y')
+
+
+def mailbox_codec(actor):
+    return actor.mailbox._consumer.codec.name
+
+
+def ping_arbiter(actor, num):
+    '''Send ``num`` ping messages to the arbiter in the same event loop
+    iteration.'''
+    actor.mailbox_stats.reset()
+    yield multi_async((actor.send('arbiter', 'ping') for i in range(num)))
+    yield actor.info()['mailbox']
+
+
+class TestCodecs(unittest.TestCase):
+
+    def message(self, **kwargs):
+        data = {'command': 'notify', 'sender': 'abc', 'target': 'arbiter',
+                'args': ({'pid': 45, 'age': 1.5, 'ok': True,
+                          'name': to_string(b'w\xc3\xa0', 'utf-8')},),
+                'kwargs': {}, 'ack': '12345678'}
+        data.update(kwargs)
+        return data
+
+    def test_registry(self):
+        self.assertEqual(tuple(CODECS), ('fast', 'pickle'))
+        self.assertEqual(Config().settings['mailbox_codec'].choices,
+                         tuple(CODECS))
+        codec = MessageCodec()
+        self.assertRaises(NotImplementedError, codec.encode, {})
+        self.assertRaises(NotImplementedError, codec.decode, b'')
+
+    def test_fast(self):
+        codec = FastCodec()
+        data = self.message()
+        body = codec.encode(data)
+        self.assertEqual(body[0:1], codec.tag)
+        self.assertTrue(len(body) < len(PickleCodec().encode(data)))
+        result = codec.decode(body)
+        self.assertEqual(result, data)
+        self.assertTrue(isinstance(result['args'], tuple))
+        self.assertEqual(decode(body), data)
+
+    def test_fast_callback(self):
+        codec = FastCodec()
+        data = {'command': 'callback', 'result': None, 'ack': '12345678'}
+        self.assertEqual(decode(codec.encode(data)), data)
+
+    def test_fast_fallback(self):
+        codec = FastCodec()
+        # not a built-in type
+        data = self.message(args=(Point(1, 2),))
+        body = codec.encode(data)
+        self.assertEqual(body[0:1], PickleCodec.tag)
+        result = decode(body)
+        self.assertEqual(result, data)
+        self.assertTrue(isinstance(result['args'][0], Point))
+        # not a message field
+        data = self.message(foo='bla')
+        body = codec.encode(data)
+        self.assertEqual(body[0:1], PickleCodec.tag)
+        self.assertEqual(decode(body), data)
+
+    def test_fast_failure(self):
+        try:
+            raise ValueError('bla')
+        except ValueError:
+            failure = Failure(sys.exc_info())
+        mute_failure(self, failure)
+        data = {'command': 'callback', 'result': failure, 'ack': '12345678'}
+        result = decode(FastCodec().encode(data))
+        self.assertTrue(isinstance(result['result'], Failure))
+        mute_failure(self, result['result'])
+
+    def test_batch(self):
+        messages = [self.message(),
+                    {'command': 'callback', 'result': 'pong', 'ack': '1'}]
+        for codec in (FastCodec(), PickleCodec()):
+            body = codec.encode_batch(messages)
+            self.assertEqual(body[0:1], codec.tag)
+            self.assertEqual(decode(body), messages)
+
+    def test_batch_no_shared_objects(self):
+        args = ({'a': 1},)
+        messages = [self.message(args=args), self.message(args=args)]
+        for codec in (FastCodec(), PickleCodec()):
+            result = decode(codec.encode_batch(messages))
+            self.assertEqual(result, messages)
+            self.assertFalse(result[0]['args'][0] is result[1]['args'][0])
+        messages = [self.message(args=(Point(1, args),)),
+                    self.message(args=(Point(2, args),))]
+        result = decode(FastCodec().encode_batch(messages))
+        self.assertEqual(result, messages)
+        self.assertFalse(result[0]['args'][0].y is result[1]['args'][0].y)
+
+    def test_fast_batch_fallback(self):
+        codec = FastCodec()
+        messages = [self.message(), self.message(args=(Point(1, 2),))]
+        body = codec.encode_batch(messages)
+        self.assertEqual(body[0:1], PickleCodec.tag)
+        self.assertEqual(decode(body), messages)
+        messages = [self.message(), self.message(foo='bla')]
+        body = codec.encode_batch(messages)
+        self.assertEqual(body[0:1], PickleCodec.tag)
+        self.assertEqual(decode(body), messages)
+
+    def test_unknown_tag(self):
+        self.assertRaises(ProtocolError, decode, b'xbla')
+
+    def test_negotiate(self):
+        fast = FastCodec()
+        codec = negotiate('fast', [fast.identity, 'pickle'])
+        self.assertEqual(codec.name, 'fast')
+        codec = negotiate('fast', ['fast/1.0-0', 'pickle'])
+        self.assertEqual(codec.name, 'pickle')
+        codec = negotiate('pickle', [fast.identity, 'pickle'])
+        self.assertEqual(codec.name, 'pickle')
+        self.assertRaises(ValueError, negotiate, 'foo', ['pickle'])
+
+
+class TestMailboxCodec(ActorTestMixin, unittest.TestCase):
+    concurrency = 'thread'
+
+    def spawn(self, **kwargs):
+        # thread actors use a socket mailbox only with this setting
+        kwargs['tcp_thread_mailbox'] = True
+        return super(TestMailboxCodec, self).spawn(**kwargs)
+
+    def test_fast(self):
+        proxy = yield self.spawn(mailbox_codec='fast')
+        yield self.async.assertEqual(send(proxy, 'ping'), 'pong')
+        yield self.async.assertEqual(send(proxy, 'run', mailbox_codec),
+                                     'fast')
+        yield self.stop_actors(proxy)
+
+    def test_pickle(self):
+        proxy = yield self.spawn(mailbox_codec='pickle')
+        yield self.async.assertEqual(send(proxy, 'ping'), 'pong')
+        yield self.async.assertEqual(send(proxy, 'run', mailbox_codec),
+                                     'pickle')
+        yield self.async.assertEqual(send(proxy, 'echo', Point(1, 2)),
+                                     Point(1, 2))
+        yield self.stop_actors(proxy)
+
+    def test_batch(self):
+        proxy = yield self.spawn(mailbox_batch_frames=False)
+        info = yield send(proxy, 'run', ping_arbiter, 10)
+        self.assertTrue(info['messages'] >= 10)
+        self.assertTrue(info['batches'] < 10)
+        self.assertTrue(info['max_batch_size'] > 1)
+        self.assertEqual(info['multi_message_frames'], 0)
+        self.assertTrue(info['max_flush_latency'] >= 0)
+        yield self.stop_actors(proxy)
+
+    def test_batch_frames(self):
+        proxy = yield self.spawn(mailbox_batch_frames=True)
+        info = yield send(proxy, 'run', ping_arbiter, 10)
+        self.assertTrue(info['messages'] >= 10)
+        self.assertTrue(info['multi_message_frames'] >= 1)
+        yield self.stop_actors(proxy)
@@ -1,5 +1,6 @@
 '''Deferred and asynchronous tools.'''
 from pulsar import Deferred, maybe_async
+from pulsar.utils.pep import new_event_loop
 from pulsar.apps.test import unittest, mute_failure
 
 
@@ -18,6 +19,25 @@ class TestCoroDeferred(unittest.TestCase):
         self.assertEqual(a.result, 3)
         self.assertEqual(d1.result, 1)
 
+    def test_restart_same_thread(self):
+        # A coroutine resumed from the event loop thread does not wake the
+        # event loop.
+        loop = new_event_loop(iothreadloop=False)
+        wakes = []
+        loop.wake = lambda: wakes.append(1)
+
+        def _(loop):
+            for i in range(3):
+                d = Deferred()
+                loop.call_soon(d.callback, i)
+                result = yield d
+            yield result
+
+        d = loop.async(_(loop))
+        loop.run_until_complete(d)
+        self.assertEqual(d.result, 2)
+        self.assertFalse(wakes)
+
     def test_deferred1(self):
         a = Deferred()
         d1 = Deferred().add_callback(lambda r: a.callback(r+2))
@@ -235,6 +235,36 @@ class TestDeferred(unittest.TestCase):
         self.assertEqual(d1.result, 1)
         self.assertEqual(d2.result, 2)
 
+    def test_resumed_result(self):
+        # The deferred returned by a callback receives the final result of
+        # the deferred it resumes
+        d1 = Deferred()
+        d2 = Deferred()
+        d1.add_callback(lambda r: d2)
+        d1.add_callback(lambda r: r + 100)
+        d1.callback(0)
+        self.assertEqual(d1.paused, 1)
+        d2.callback(1)
+        self.assertEqual(d1.paused, 0)
+        self.assertEqual(d1.result, 101)
+        self.assertEqual(d2.result, 101)
+
+    def test_resumed_result_nested(self):
+        d1, d2, d3 = Deferred(), Deferred(), Deferred()
+        d1.add_callback(lambda r: d2)
+        d1.add_callback(lambda r: r + 100)
+        d2.add_callback(lambda r: d3)
+        d2.add_callback(lambda r: r + 10)
+        d2.callback(0)
+        # d2 is paused waiting for d3, d1 waits for d3 too
+        d1.callback(0)
+        self.assertEqual(d1.paused, 1)
+        self.assertEqual(d2.paused, 1)
+        d3.callback(1)
+        self.assertEqual(d2.result, 11)
+        self.assertEqual(d1.result, 111)
+        self.assertEqual(d3.result, 111)
+
     def test_throw(self):
         d = Deferred()
         d.throw()
@@ -263,7 +293,7 @@ class TestMultiDeferred(unittest.TestCase):
         d = MultiDeferred()
         self.assertFalse(d.done())
         self.assertFalse(d._locked)
-        self.assertFalse(d._deferred)
+        self.assertFalse(d._pending)
         self.assertFalse(d._stream)
         d.lock()
         self.assertTrue(d.done())
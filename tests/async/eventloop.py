@@ -3,9 +3,10 @@ import sys
 from threading import current_thread
 
 import pulsar
-from pulsar import Failure, run_in_loop_thread, Deferred
+from pulsar import (Failure, run_in_loop_thread, Deferred, TimedCall,
+                    TimingWheel, EventLoopStats)
 from pulsar.utils.pep import get_event_loop, new_event_loop
-from pulsar.apps.test import unittest, mute_failure
+from pulsar.apps.test import unittest, mute_failure, mock
 
 
 class TestEventLoop(unittest.TestCase):
@@ -74,6 +75,127 @@ class TestEventLoop(unittest.TestCase):
         t1, t2 = yield pulsar.multi_async((d1, d2))
         self.assertTrue(t1 <= t2)
 
+    def test_compact_scheduled(self):
+        event_loop = new_event_loop(iothreadloop=False)
+        timers = [event_loop.call_later(100, lambda: None)
+                  for _ in range(300)]
+        for timer in timers[:200]:
+            timer.cancel()
+            timer.cancel()
+        self.assertEqual(event_loop._cancelled_timers, 200)
+        event_loop.call_soon(lambda: None)
+        event_loop._run_once()
+        self.assertEqual(event_loop._cancelled_timers, 0)
+        self.assertEqual(len(event_loop._scheduled), 100)
+        self.assertFalse(event_loop.has_callback(timers[0]))
+        self.assertTrue(event_loop.has_callback(timers[-1]))
+
+    def test_timing_wheel(self):
+        wheel = TimingWheel(timer=lambda: 0, resolution=1, slots=4, levels=3)
+        noop = lambda: None
+        timers = [TimedCall(d, noop, ()) for d in (0.5, 3.5, 9, 40, 50)]
+        for timer in timers:
+            self.assertTrue(wheel.add(timer))
+        self.assertEqual(len(wheel), 5)
+        self.assertFalse(wheel.add(TimedCall(70, noop, ())))
+        self.assertEqual(wheel.advance(0.9), [])
+        self.assertEqual(wheel.advance(1), [timers[0]])
+        timers[2].cancel()
+        self.assertEqual(len(wheel), 3)
+        self.assertEqual(wheel.advance(9.9), [timers[1]])
+        self.assertEqual(wheel.advance(40.5), [])
+        self.assertEqual(wheel.advance(41), [timers[3]])
+        self.assertEqual(wheel.advance(50.5), [])
+        self.assertEqual(wheel.advance(51), [timers[4]])
+        self.assertEqual(len(wheel), 0)
+        timers[4].cancel()
+        self.assertEqual(len(wheel), 0)
+
+    def test_call_timeout(self):
+        event_loop = new_event_loop(iothreadloop=False, timing_wheel=True)
+        self.assertIsInstance(event_loop.timing_wheel, TimingWheel)
+        d = pulsar.Deferred()
+        timeout = event_loop.call_timeout(0.3, d.callback, 'OK')
+        self.assertTrue(event_loop.has_callback(timeout))
+        self.assertFalse(event_loop._scheduled)
+        event_loop.call_timeout(0.1, lambda: None).cancel()
+        event_loop.run_until_complete(d)
+        self.assertEqual(d.result, 'OK')
+        self.assertFalse(event_loop.has_callback(timeout))
+
+    def test_stats(self):
+        event_loop = new_event_loop(iothreadloop=False)
+        self.assertEqual(event_loop.stats, None)
+        stats = EventLoopStats(slow_callback=0.05)
+        logger = mock.MagicMock(name='logger')
+        event_loop = new_event_loop(iothreadloop=False, stats=stats,
+                                    logger=logger)
+        self.assertEqual(event_loop.stats, stats)
+        slow = lambda: time.sleep(0.06)
+        event_loop.call_soon(lambda: None)
+        event_loop.call_soon(slow)
+        event_loop.call_later(0, lambda: None)
+        event_loop.call_later(10, lambda: None)
+        event_loop._run_once()
+        info = stats.info()
+        self.assertEqual(info['iterations'], 1)
+        self.assertEqual(info['callbacks'], 3)
+        self.assertEqual(info['slow_callbacks'], 1)
+        self.assertEqual(info['ready'], 3)
+        self.assertEqual(info['scheduled'], 1)
+        self.assertTrue(info['callbacks_time'] >= 0.06)
+        self.assertEqual(sum(info['callback_durations'].values()), 3)
+        self.assertEqual(info['callback_durations']['<=0.1s'], 1)
+        self.assertEqual(logger.warning.call_count, 1)
+        self.assertEqual(logger.warning.call_args[0][1], slow)
+        stats.reset()
+        self.assertEqual(stats.info()['callbacks'], 0)
+
+    def test_callback_budget(self):
+        event_loop = new_event_loop(iothreadloop=False, callback_budget=2)
+        calls = []
+        for i in range(5):
+            event_loop.call_soon(calls.append, i)
+        event_loop.call_soon_idle(calls.append, 'idle')
+        event_loop._run_once()
+        self.assertEqual(calls, [0, 1])
+        event_loop._run_once()
+        self.assertEqual(calls, [0, 1, 2, 3])
+        event_loop._run_once()
+        self.assertEqual(calls, [0, 1, 2, 3, 4, 'idle'])
+        self.assertFalse(event_loop.active)
+
+    def test_callback_time_budget(self):
+        event_loop = new_event_loop(iothreadloop=False,
+                                    callback_time_budget=0.05)
+        calls = []
+        event_loop.call_soon(time.sleep, 0.06)
+        event_loop.call_soon(calls.append, 1)
+        event_loop._run_once()
+        self.assertEqual(calls, [])
+        event_loop._run_once()
+        self.assertEqual(calls, [1])
+
+    def test_call_soon_idle(self):
+        event_loop = new_event_loop(iothreadloop=False)
+        calls = []
+        idle = event_loop.call_soon_idle(calls.append, 'idle')
+        self.assertTrue(event_loop.has_callback(idle))
+        self.assertTrue(event_loop.active)
+        event_loop.call_soon(calls.append, 1)
+        event_loop._run_once()
+        self.assertEqual(calls, [1, 'idle'])
+        self.assertFalse(event_loop.has_callback(idle))
+        # an idle callback does not wait for callbacks added while
+        # running the current iteration
+        def again():
+            calls.append(2)
+            event_loop.call_soon(again)
+        event_loop.call_soon(again)
+        event_loop.call_soon_idle(calls.append, 'idle')
+        event_loop._run_once()
+        self.assertEqual(calls, [1, 'idle', 2, 'idle'])
+
     def test_periodic(self):
         test = self
         ioloop = get_event_loop()
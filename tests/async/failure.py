@@ -74,8 +74,11 @@ class TestFailure(unittest.TestCase):
     def testLog(self):
         failure = maybe_failure(Exception('test'))
         error = failure.error
-        log = mock.MagicMock(name='log')
-        failure.log = log
-        del failure
-        gc.collect()
-        log.assert_called_once_with()
\ No newline at end of file
+        fid = id(failure)
+        # Failure has __slots__, patch the class
+        with mock.patch.object(Failure, 'log', autospec=True) as log:
+            del failure
+            gc.collect()
+        calls = [c for c in log.call_args_list if id(c[0][0]) == fid]
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0][0][1:], ())
\ No newline at end of file
@@ -19,4 +19,54 @@ class TestFailure(unittest.TestCase):
         result = h.fire_event('finish')
         self.assertTrue(h.event('finish').done())
         self.assertTrue(isinstance(result, Failure))
-        result.mute()
\ No newline at end of file
+        result.mute()
+
+
+class TestLazyEvents(unittest.TestCase):
+
+    def test_events_created_on_access(self):
+        h = EventHandler(one_time_events=('start',),
+                         many_times_events=('data',))
+        self.assertFalse(h._events)
+        self.assertEqual(h.event('data').name, 'data')
+        self.assertEqual(list(h._events), ['data'])
+        self.assertEqual(h.event('foo'), None)
+        self.assertEqual(set(h.events), set(('start', 'data')))
+
+    def test_fire_many_times_no_listeners(self):
+        h = EventHandler(many_times_events=('data',))
+        self.assertEqual(h.fire_event('data', data=1), None)
+        self.assertFalse(h._events)
+
+    def test_fire_one_time_no_listeners(self):
+        h = EventHandler(one_time_events=('finish',))
+        self.assertEqual(h.fire_event('finish', 'OK'), 'OK')
+        self.assertEqual(len(h._events), 1)
+        event = h.event('finish')
+        self.assertTrue(event.has_fired())
+        self.assertTrue(event.done())
+        self.assertEqual(event.result, 'OK')
+        # late binding receives the result
+        results = []
+        h.bind_event('finish', results.append)
+        self.assertEqual(results, ['OK'])
+        # a second fire is ignored
+        self.assertEqual(h.fire_event('finish', 'BAD'), None)
+        self.assertEqual(event.result, 'OK')
+
+    def test_fire_one_time_failure_no_listeners(self):
+        h = EventHandler(one_time_events=('finish',))
+        result = h.fire_event('finish', ValueError('test'))
+        self.assertTrue(isinstance(result, Failure))
+        self.assertEqual(h.event('finish').result, result)
+        result.mute()
+
+    def test_copy_many_times_events(self):
+        h1 = EventHandler(many_times_events=('data', 'other'))
+        h2 = EventHandler(many_times_events=('data', 'other'))
+        results = []
+        h1.bind_event('data', results.append)
+        h2.copy_many_times_events(h1)
+        self.assertEqual(list(h2._events), ['data'])
+        h2.fire_event('data', 3)
+        self.assertEqual(results, [3])
@@ -0,0 +1,94 @@
+'''Megabytes per second of bulk data sent from an actor to another.'''
+import os
+
+import pulsar
+from pulsar import send, multi_async, Channel
+from pulsar.utils.pep import range, default_timer
+from pulsar.apps.test import unittest
+
+
+PAYLOAD = 2**20
+
+
+def size(actor, data):
+    return len(data)
+
+
+def start_consumer(actor, channel):
+    received = actor.extra['received'] = [0]
+
+    def _consume(view):
+        received[0] += len(view)
+    channel.consume(_consume)
+
+
+def received(actor):
+    return actor.extra['received'][0]
+
+
+def send_mailbox(actor, target, num):
+    '''Send ``num`` payloads via the mailbox and return the time taken.'''
+    data = os.urandom(PAYLOAD)
+    start = default_timer()
+    yield multi_async((actor.send(target, 'run', size, data)
+                       for i in range(num)))
+    yield default_timer() - start
+
+
+def send_channel(actor, target, num):
+    '''Send ``num`` payloads via a channel and return the time taken.'''
+    data = os.urandom(PAYLOAD)
+    channel = Channel(2*(num + 1)*PAYLOAD)
+    yield actor.send(target, 'run', start_consumer, channel)
+    start = default_timer()
+    for i in range(num):
+        channel.write(data)
+    total = num*PAYLOAD
+    result = 0
+    while result < total:
+        result = yield actor.send(target, 'run', received)
+    elapsed = default_timer() - start
+    channel.close()
+    yield elapsed
+
+
+class TestMailboxBulk(unittest.TestCase):
+    '''Megabytes per second of 1MB payloads sent via the mailbox by an
+actor to another.'''
+    __benchmark__ = True
+    __number__ = 5
+    concurrency = 'process'
+    num_payloads = 10
+    benchmark_template = ('\nRepeated {0[number]} times. Average {0[mean]} '
+                          'secs, Stdev {0[std]}. {0[mb_sec]} MB/sec.')
+
+    @classmethod
+    def setUpClass(cls):
+        cls.producer = yield pulsar.spawn(concurrency=cls.concurrency)
+        cls.consumer = yield pulsar.spawn(concurrency=cls.concurrency)
+        cls.elapsed = 0
+
+    @classmethod
+    def tearDownClass(cls):
+        actors = (cls.producer, cls.consumer)
+        return multi_async((send(a, 'stop') for a in actors))
+
+    def getSummary(self, info, number, total_time, total_time2):
+        info['mb_sec'] = int(number*self.num_payloads/self.elapsed)
+        return info
+
+    def send(self):
+        return send(self.producer, 'run', send_mailbox, self.consumer.aid,
+                    self.num_payloads)
+
+    def test_bulk(self):
+        elapsed = yield self.send()
+        self.__class__.elapsed += elapsed
+
+
+class TestChannelBulk(TestMailboxBulk):
+    '''Megabytes per second of 1MB payloads sent via a
+:class:`pulsar.Channel` by an actor to another.'''
+    def send(self):
+        return send(self.producer, 'run', send_channel, self.consumer.aid,
+                    self.num_payloads)
@@ -0,0 +1,69 @@
+'''Messages per second encoded and decoded by the mailbox codecs.'''
+from pulsar.async.codecs import get_codec, decode
+from pulsar.utils.pep import pickle, range
+from pulsar.apps.test import unittest
+
+
+def run(actor):
+    pass
+
+
+MESSAGES = (
+    {'command': 'notify', 'sender': 'a1b2c3d4', 'target': 'arbiter',
+     'args': ({'actor': {'name': 'worker', 'actor_id': 'a1b2c3d4',
+                         'pid': 2345, 'age': 12.5, 'is_process': True,
+                         'thread_id': 140200345, 'process_id': 2345},
+               'events': {'callbacks': 1000, 'io_loops': 300}},),
+     'kwargs': {}},
+    {'command': 'ping', 'sender': 'a1b2c3d4', 'target': 'e5f6a7b8',
+     'args': (), 'kwargs': {}, 'ack': '01234567'},
+    {'command': 'callback', 'result': 'pong', 'ack': '01234567'},
+    {'command': 'pubsub_broadcast', 'sender': 'a1b2c3d4',
+     'target': 'arbiter', 'args': ('channel', 'Hello world!'),
+     'kwargs': {}},
+    {'command': 'get_task', 'sender': 'a1b2c3d4', 'target': 'e5f6a7b8',
+     'args': ('4fe8a1c0b4f14bf0b6f49a25a8f0d3f2',), 'kwargs': {},
+     'ack': '89abcdef'},
+    # A message with a function, always pickled
+    {'command': 'run', 'sender': 'a1b2c3d4', 'target': 'e5f6a7b8',
+     'args': (run,), 'kwargs': {}, 'ack': '89abcdef'})
+
+
+class TestPickleProtocol2(unittest.TestCase):
+    '''Number of messages per second encoded and decoded with pickle
+protocol 2, the encoding used before the introduction of codecs.'''
+    __benchmark__ = True
+    __number__ = 10
+    num_messages = 1000
+    benchmark_template = ('\nRepeated {0[number]} times. Average {0[mean]} '
+                          'secs, Stdev {0[std]}. {0[messages_sec]} '
+                          'messages/sec.')
+
+    def getSummary(self, info, number, total_time, total_time2):
+        messages = len(MESSAGES)*self.num_messages
+        info['messages_sec'] = int(number*messages/total_time)
+        return info
+
+    def test_messages(self):
+        dumps, loads = pickle.dumps, pickle.loads
+        for i in range(self.num_messages):
+            for message in MESSAGES:
+                loads(dumps(message, protocol=2))
+
+
+class TestPickleCodec(TestPickleProtocol2):
+    '''Number of messages per second encoded and decoded by the pickle
+codec.'''
+    codec = 'pickle'
+
+    def test_messages(self):
+        encode = get_codec(self.codec).encode
+        for i in range(self.num_messages):
+            for message in MESSAGES:
+                decode(encode(message))
+
+
+class TestFastCodec(TestPickleCodec):
+    '''Number of messages per second encoded and decoded by the fast
+codec.'''
+    codec = 'fast'
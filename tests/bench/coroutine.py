@@ -1,5 +1,5 @@
-from pulsar import Deferred
-from pulsar.utils.pep import new_event_loop
+from pulsar import Deferred, Task, coroutine_return
+from pulsar.utils.pep import new_event_loop, range
 from pulsar.apps.test import unittest
 
 
@@ -12,25 +12,73 @@ def sub_sub(loop, num):
     a = yield async_func(loop, num)
     b = yield async_func(loop, num)
     yield a+b
- 
+
 def sub(loop, num):
     a = yield async_func(loop, num)
     b = yield async_func(loop, num)
     c = yield sub_sub(loop, num)
     yield a+b+c
- 
+
 def main(d, loop, num):
     a = yield async_func(loop, num)
     b = yield sub(loop, num)
     c = yield sub(loop, num)
     d.callback(a+b+c)
-    
-    
+
+
+def steps(loop, num):
+    '''A coroutine which yields ``num`` deferred called back in the
+event loop thread.'''
+    for i in range(num):
+        d = Deferred()
+        loop.call_soon(d.callback, i)
+        yield d
+    coroutine_return(num)
+
+
+class ThreadSafeTask(Task):
+    '''A :class:`Task` which always resumes the coroutine via
+:meth:`EventLoop.call_soon_threadsafe`, the behaviour before the same-thread
+fast path was introduced.'''
+    def _restart(self, result):
+        self._waiting = None
+        self._event_loop.call_soon_threadsafe(self._consume, result)
+        return result
+
+
 class TestCoroutine(unittest.TestCase):
-    
+
     def test_coroutine(self):
         loop = new_event_loop(iothreadloop=False)
         d= Deferred()
         loop.call_soon(main, d, loop, 1)
         loop.run_until_complete(d)
-        self.assertEqual(d.result, 9)
\ No newline at end of file
+        self.assertEqual(d.result, 9)
+
+
+class TestCoroutineSteps(unittest.TestCase):
+    '''Number of coroutine steps per second when the coroutine is resumed
+from the event loop thread.'''
+    __benchmark__ = True
+    __number__ = 10
+    num_steps = 10000
+    task_factory = Task
+    benchmark_template = ('\nRepeated {0[number]} times. Average {0[mean]} '
+                          'secs, Stdev {0[std]}. {0[steps_sec]} steps/sec.')
+
+    def getSummary(self, info, number, total_time, total_time2):
+        info['steps_sec'] = int(number*self.num_steps/total_time)
+        return info
+
+    def test_steps(self):
+        loop = new_event_loop(iothreadloop=False)
+        loop.task_factory = self.task_factory
+        d = loop.async(steps(loop, self.num_steps))
+        loop.run_until_complete(d)
+        self.assertEqual(d.result, self.num_steps)
+
+
+class TestCoroutineStepsThreadSafe(TestCoroutineSteps):
+    '''Same as :class:`TestCoroutineSteps` but always resuming the
+coroutine via the thread-safe path.'''
+    task_factory = ThreadSafeTask
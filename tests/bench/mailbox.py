@@ -0,0 +1,85 @@
+'''Messages per second exchanged between actors.'''
+import pulsar
+from pulsar import send, multi_async, async_while
+from pulsar.utils.pep import range, default_timer
+from pulsar.apps.test import unittest
+
+
+def connect(actor, targets):
+    '''Ping all ``targets`` and wait for the direct connections, if
+    available.'''
+    for aid in targets:
+        yield actor.send(aid, 'ping')
+    if actor.peers is not None:
+        yield async_while(5, lambda: (actor.peers.info()['connections'] <
+                                      len(targets)))
+
+
+def send_messages(actor, targets, num):
+    '''Send ``num`` ping messages to each actor in ``targets`` and return
+    the time taken.'''
+    start = default_timer()
+    yield multi_async((actor.send(aid, 'ping') for aid in targets
+                       for i in range(num)))
+    yield default_timer() - start
+
+
+class TestRoutedMessages(unittest.TestCase):
+    '''Number of messages per second exchanged by 8 actors, each actor
+sends messages to all the others. Messages are routed by the arbiter.
+
+The time is measured by the actors, the slowest one sets the pace.'''
+    __benchmark__ = True
+    __number__ = 5
+    concurrency = 'process'
+    peer_mailbox = False
+    num_actors = 8
+    num_messages = 100
+    benchmark_template = ('\nRepeated {0[number]} times. Average {0[mean]} '
+                          'secs, Stdev {0[std]}. {0[messages_sec]} '
+                          'messages/sec.')
+
+    @classmethod
+    def setUpClass(cls):
+        cls.actors = []
+        for i in range(cls.num_actors):
+            proxy = yield pulsar.spawn(concurrency=cls.concurrency,
+                                       peer_mailbox=cls.peer_mailbox)
+            cls.actors.append(proxy)
+        yield cls.run_on_actors(connect)
+        cls.elapsed = 0
+
+    @classmethod
+    def tearDownClass(cls):
+        return multi_async((send(a, 'stop') for a in cls.actors))
+
+    @classmethod
+    def run_on_actors(cls, callable, *args):
+        aids = [a.aid for a in cls.actors]
+        return multi_async((send(aid, 'run', callable,
+                                 [t for t in aids if t != aid], *args)
+                            for aid in aids))
+
+    def getSummary(self, info, number, total_time, total_time2):
+        n = self.num_actors
+        messages = n*(n-1)*self.num_messages
+        info['messages_sec'] = int(number*messages/self.elapsed)
+        return info
+
+    def test_messages(self):
+        elapsed = yield self.run_on_actors(send_messages, self.num_messages)
+        self.__class__.elapsed += max(elapsed)
+
+
+class TestDirectMessages(TestRoutedMessages):
+    '''Number of messages per second exchanged by 8 actors, each actor
+sends messages to all the others. Messages go through direct connections.'''
+    peer_mailbox = True
+
+
+class TestThreadMessages(TestRoutedMessages):
+    '''Number of messages per second exchanged by 8 thread actors, each
+actor sends messages to all the others. Messages are routed by the arbiter
+via in-process mailboxes, or via TCP with the ``--tcp-thread-mailbox``
+option.'''
+    concurrency = 'thread'
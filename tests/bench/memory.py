@@ -0,0 +1,93 @@
+'''Memory footprint of idle keep-alive connections.'''
+import gc
+import sys
+import socket
+import types
+
+from pulsar import Deferred, TcpServer
+from pulsar.utils.pep import new_event_loop, range
+from pulsar.apps.test import unittest
+
+from examples.echo.manage import EchoServerProtocol
+
+SHARED_TYPES = (type, types.ModuleType, types.FunctionType,
+                types.BuiltinFunctionType, types.CodeType)
+if hasattr(types, 'ClassType'):
+    SHARED_TYPES += (types.ClassType,)
+
+
+def footprint(roots, exclude):
+    '''Number of bytes of all objects reachable from ``roots``.
+
+    Objects in ``exclude``, and objects reachable only through them, are
+    not counted. Neither are classes, modules and functions.'''
+    seen = set((id(o) for o in exclude))
+    size = 0
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return size
+
+
+def run_until(loop, condition, timeout=10):
+    d = Deferred()
+
+    def check():
+        if condition():
+            d.callback(True)
+        else:
+            loop.call_later(0.01, check)
+    loop.call_soon(check)
+    loop.run_until_complete(d, timeout=timeout)
+
+
+class TestIdleConnectionMemory(unittest.TestCase):
+    '''Bytes per idle keep-alive connection on the server side of a
+:class:`TcpServer`. Each client sends one echo message and keeps the
+connection open.'''
+    __benchmark__ = True
+    __number__ = 1
+    num_connections = 500
+    benchmark_template = ('\n{0[connections]} idle connections. '
+                          '{0[bytes_per_connection]} bytes per connection.')
+
+    def getSummary(self, info, number, total_time, total_time2):
+        info.update(self.memory)
+        return info
+
+    def test_idle_connections(self):
+        loop = new_event_loop(iothreadloop=False)
+        server = TcpServer(loop, '127.0.0.1', 0, EchoServerProtocol,
+                           timeout=60)
+        loop.run_until_complete(
+            server.start_serving(backlog=self.num_connections), timeout=5)
+        address = server.address
+        clients = []
+        try:
+            for i in range(self.num_connections):
+                client = socket.create_connection(address)
+                client.sendall(b'ping\r\n\r\n')
+                clients.append(client)
+            connections = server._concurrent_connections
+            run_until(loop, lambda: (
+                len(connections) == self.num_connections and
+                all((c.processed and not c.current_consumer
+                     for c in connections))))
+            roots = []
+            for c in connections:
+                roots.append(c)
+                roots.append(loop.io.handlers(c.transport.fileno()))
+            gc.collect()
+            size = footprint(roots, (loop, server, loop.logger))
+            n = len(connections)
+            self.memory = {'connections': n,
+                           'bytes_per_connection': size // n}
+        finally:
+            for client in clients:
+                client.close()
+            server.close()
@@ -0,0 +1,50 @@
+from pulsar import Deferred, multi_async
+from pulsar.utils.pep import new_event_loop, range
+from pulsar.apps.test import unittest
+
+
+def fan_out(loop, num):
+    '''A list of ``num`` items, half of them :class:`Deferred` called back
+in the event loop thread.'''
+    items = []
+    for i in range(num):
+        if i % 2:
+            d = Deferred()
+            loop.call_soon(d.callback, i)
+            items.append(d)
+        else:
+            items.append(i)
+    return items
+
+
+class TestMultiAsync(unittest.TestCase):
+    '''Number of items per second collected by :func:`multi_async`.'''
+    __benchmark__ = True
+    __number__ = 10
+    num_items = 10000
+    benchmark_template = ('\nRepeated {0[number]} times. Average {0[mean]} '
+                          'secs, Stdev {0[std]}. {0[items_sec]} items/sec.')
+
+    def getSummary(self, info, number, total_time, total_time2):
+        info['items_sec'] = int(number*self.num_items/total_time)
+        return info
+
+    def test_multi_async(self):
+        loop = new_event_loop(iothreadloop=False)
+        d = multi_async(fan_out(loop, self.num_items))
+        result = loop.run_until_complete(d)
+        self.assertEqual(result, list(range(self.num_items)))
+
+
+class TestDeferredChain(TestMultiAsync):
+    '''Number of deferreds per second in a chain where each deferred waits
+for the next one.'''
+
+    def test_multi_async(self):
+        chain = [Deferred() for i in range(self.num_items)]
+        for d, next in zip(chain, chain[1:]):
+            d.add_callback(lambda r, next=next: next)
+        for d in chain[:-1]:
+            d.callback(None)
+        chain[-1].callback(self.num_items)
+        self.assertEqual(chain[0].result, self.num_items)
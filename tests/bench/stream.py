@@ -0,0 +1,62 @@
+'''Throughput of a TCP stream between two transports on the same loop.'''
+from pulsar import Protocol, SocketStreamTransport
+from pulsar.async.pollers import POLLERS
+from pulsar.utils.pep import new_event_loop
+from pulsar.apps.test import unittest, tcp_socketpair, CountingProtocol
+
+
+@unittest.skipUnless('epoll' in POLLERS, 'Requires epoll')
+class TestStreamThroughput(unittest.TestCase):
+    '''Megabytes per second sent through a stream transport with the
+level-triggered epoll poller.'''
+    __benchmark__ = True
+    __number__ = 10
+    poller = 'epoll'
+    size = 16*1024*1024
+    benchmark_template = ('\nRepeated {0[number]} times. Average {0[mean]} '
+                          'secs, Stdev {0[std]}. {0[mb_sec]} MB/sec.')
+
+    def getSummary(self, info, number, total_time, total_time2):
+        info['mb_sec'] = round(number*self.size/total_time/1048576, 1)
+        return info
+
+    def test_throughput(self):
+        loop = new_event_loop(io=POLLERS[self.poller](), iothreadloop=False)
+        r, w = tcp_socketpair()
+        sink = CountingProtocol(self.size)
+        reader = SocketStreamTransport(loop, r, sink)
+        writer = SocketStreamTransport(loop, w, Protocol())
+        writer.write(self.size*b'x')
+        loop.run_until_complete(sink.done, timeout=30)
+        self.assertEqual(sink.received, self.size)
+        reader.close()
+        writer.close()
+
+
+@unittest.skipUnless('epoll-et' in POLLERS, 'Requires epoll')
+class TestStreamThroughputEdgeTriggered(TestStreamThroughput):
+    '''Same as :class:`TestStreamThroughput` with the edge-triggered epoll
+poller.'''
+    poller = 'epoll-et'
+
+
+@unittest.skipUnless('epoll' in POLLERS, 'Requires epoll')
+class TestLargeResponseThroughput(TestStreamThroughput):
+    '''Megabytes per second for a 1 GB response written as a list of
+1 MB chunks, the way a streamed HTTP response reaches the transport.'''
+    __number__ = 1
+    size = 1024*1024*1024
+    chunk_size = 1024*1024
+
+    def test_throughput(self):
+        loop = new_event_loop(io=POLLERS[self.poller](), iothreadloop=False)
+        r, w = tcp_socketpair()
+        sink = CountingProtocol(self.size)
+        reader = SocketStreamTransport(loop, r, sink)
+        writer = SocketStreamTransport(loop, w, Protocol())
+        chunk = self.chunk_size*b'x'
+        writer.writelines([chunk]*(self.size//self.chunk_size))
+        loop.run_until_complete(sink.done, timeout=300)
+        self.assertEqual(sink.received, self.size)
+        reader.close()
+        writer.close()
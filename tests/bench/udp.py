@@ -0,0 +1,67 @@
+'''Datagrams per second between two datagram transports over loopback.'''
+from pulsar import Deferred, DatagramProtocol
+from pulsar.utils.pep import new_event_loop, range
+from pulsar.apps.test import unittest
+
+
+class Counter(DatagramProtocol):
+
+    def __init__(self, num):
+        self.num = num
+        self.received = 0
+        self.done = Deferred()
+
+    def datagrams_received(self, datagrams):
+        self.received += len(datagrams)
+        if self.received >= self.num and not self.done.done():
+            self.done.callback(self.received)
+
+
+class Sender(DatagramProtocol):
+    '''Send ``num`` datagrams, ``batch`` at a time, the next batch
+being sent at the next loop iteration so that the receiver socket
+buffer does not overflow.'''
+    def __init__(self, num, batch, data):
+        self.num = num
+        self.batch = [data]*batch
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.send()
+
+    def send(self):
+        if self.num > 0 and not self.transport.closing:
+            self.num -= len(self.batch)
+            self.transport.sendmany(self.batch)
+            self.transport.event_loop.call_soon(self.send)
+
+
+class TestDatagramThroughput(unittest.TestCase):
+    '''Datagrams of 64 bytes per second received by a
+:class:`DatagramProtocol` over loopback.'''
+    __benchmark__ = True
+    __number__ = 10
+    num = 102400
+    batch = 64
+    size = 64
+    benchmark_template = ('\nRepeated {0[number]} times. Average {0[mean]} '
+                          'secs, Stdev {0[std]}. {0[packets_sec]} '
+                          'packets/sec.')
+
+    def getSummary(self, info, number, total_time, total_time2):
+        info['packets_sec'] = int(number*self.num/total_time)
+        return info
+
+    def test_throughput(self):
+        loop = new_event_loop(iothreadloop=False)
+        counter = Counter(self.num)
+        server, _ = loop.run_until_complete(loop.create_datagram_endpoint(
+            lambda: counter, local_addr=('127.0.0.1', 0)), 5)
+        address = server.address
+        sender = Sender(self.num, self.batch, self.size*b'x')
+        client, _ = loop.run_until_complete(loop.create_datagram_endpoint(
+            lambda: sender, remote_addr=address), 5)
+        loop.run_until_complete(counter.done, 30)
+        self.assertEqual(counter.received, self.num)
+        client.close()
+        server.close()
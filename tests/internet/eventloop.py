@@ -1,11 +1,19 @@
 '''Test Internet connections and wrapped socket methods in event loop.'''
+import os
+import ctypes
 import socket
+import tempfile
 
-from pulsar import Connection, Protocol, TcpServer, async_while
+from pulsar import (Connection, Protocol, BufferedProtocol, TcpServer,
+                    async_while, Deferred, SocketStreamTransport)
 from pulsar.utils.pep import get_event_loop, new_event_loop, ispy3k
-from pulsar.utils.internet import is_socket_closed, format_address
-from pulsar.apps.test import unittest, run_test_server
-from pulsar.async.pollers import READ
+from pulsar.utils.internet import (is_socket_closed, format_address,
+                                   BUFFER_MAX_SIZE)
+from pulsar.apps.test import (unittest, run_test_server, tcp_socketpair,
+                              CountingProtocol)
+from pulsar.async.pollers import READ, POLLERS
+from pulsar.async.consts import DRAIN_BUDGET, MIN_READ_CHUNK_SIZE
+from pulsar.async.stream import _has_reader
 
 from examples.echo.manage import Echo, EchoServerProtocol
 
@@ -19,6 +27,62 @@ class SimpleProtocol(Protocol):
         self.transport = transport
 
 
+class CollectingProtocol(CountingProtocol):
+
+    def __init__(self, size):
+        super(CollectingProtocol, self).__init__(size)
+        self.data = []
+
+    def data_received(self, data):
+        self.data.append(data)
+        super(CollectingProtocol, self).data_received(data)
+
+
+class BufferProtocol(BufferedProtocol):
+
+    def __init__(self, size):
+        self.buffer = bytearray(size)
+        self.received = 0
+        self.done = Deferred()
+
+    def get_buffer(self, sizehint):
+        return memoryview(self.buffer)[self.received:]
+
+    def buffer_updated(self, nbytes):
+        self.received += nbytes
+        if self.received == len(self.buffer):
+            self.done.callback(self.received)
+
+
+class FlowProtocol(SimpleProtocol):
+
+    def __init__(self):
+        self.events = []
+
+    def pause_writing(self):
+        self.events.append('pause')
+
+    def resume_writing(self):
+        self.events.append('resume')
+
+
+class PausingProtocol(CollectingProtocol):
+    '''Pause reading after the first chunk of data.'''
+    transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        super(PausingProtocol, self).data_received(data)
+        if self.events == 1:
+            self.transport.pause_reading()
+
+
+class CopyTransport(SocketStreamTransport):
+    _zero_copy = False
+
+
 class TestEventLoop(unittest.TestCase):
 
     def test_create_connection_error(self):
@@ -105,6 +169,332 @@ class TestEventLoop(unittest.TestCase):
         yield async_while(3, lambda: not is_socket_closed(sock))
         self.assertTrue(is_socket_closed(sock))
 
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Requires unix sockets')
+    def test_unix_echo_serve(self):
+        loop = get_event_loop()
+        path = os.path.join(tempfile.mkdtemp(), 'echo.sock')
+        server = TcpServer(loop, path=path,
+                           consumer_factory=EchoServerProtocol)
+        yield server.start_serving()
+        self.assertEqual(server.address, path)
+        self.assertEqual(server.sock.family, socket.AF_UNIX)
+        client = Echo()
+        result = yield client.request(path, b'Hello!')
+        self.assertEqual(result, b'Hello!')
+        self.assertEqual(server.concurrent_connections, 1)
+        server.stop_serving()
+        self.assertFalse(os.path.exists(path))
+
+    def test_max_concurrent_connections(self):
+        loop = get_event_loop()
+        server = TcpServer(loop, '127.0.0.1', 0,
+                           consumer_factory=EchoServerProtocol,
+                           max_concurrent_connections=2)
+        yield server.start_serving()
+        self.assertTrue(server.accepting)
+        clients = [socket.create_connection(server.address)
+                   for i in range(3)]
+        yield async_while(2, lambda: server.received < 2)
+        self.assertEqual(server.received, 2)
+        self.assertFalse(server.accepting)
+        self.assertEqual(server.accept_pauses, 1)
+        self.assertFalse(_has_reader(loop, server.sock.fileno()))
+        # the third client is accepted once a connection is lost
+        clients[0].close()
+        yield async_while(2, lambda: server.received < 3)
+        self.assertEqual(server.received, 3)
+        self.assertFalse(server.accepting)
+        self.assertEqual(server.accept_pauses, 2)
+        for client in clients[1:]:
+            client.close()
+        yield async_while(2, lambda: not server.accepting)
+        self.assertTrue(server.accepting)
+        self.assertTrue(_has_reader(loop, server.sock.fileno()))
+        server.close()
+
+    def test_unix_path_error(self):
+        loop = get_event_loop()
+        exc = None
+        try:
+            yield loop.start_serving(Protocol, '127.0.0.1', 0, path='bla.sock')
+        except ValueError as e:
+            exc = e
+        assert exc
+        exc = None
+        try:
+            yield loop.create_connection(Protocol, '127.0.0.1', 0,
+                                         path='bla.sock')
+        except ValueError as e:
+            exc = e
+        assert exc
+
+    def test_getaddrinfo_numeric(self):
+        loop = get_event_loop()
+        misses = loop.resolver.misses
+        d = loop.getaddrinfo('127.0.0.1', 80, type=socket.SOCK_STREAM)
+        self.assertTrue(d.done())
+        infos = d.result
+        self.assertTrue(infos)
+        self.assertEqual(infos[0][4], ('127.0.0.1', 80))
+        self.assertEqual(loop.resolver.misses, misses)
+
+    def test_getaddrinfo_cache(self):
+        loop = new_event_loop(iothreadloop=False)
+        resolver = loop.resolver
+        d1 = loop.getaddrinfo('localhost', 80, type=socket.SOCK_STREAM)
+        d2 = loop.getaddrinfo('localhost', 80, type=socket.SOCK_STREAM)
+        self.assertEqual(resolver.misses, 1)
+        self.assertEqual(resolver.coalesced, 1)
+        loop.run_until_complete(d2, timeout=5)
+        self.assertTrue(d1.done())
+        self.assertEqual(d1.result, d2.result)
+        d3 = loop.getaddrinfo('localhost', 80, type=socket.SOCK_STREAM)
+        self.assertTrue(d3.done())
+        self.assertEqual(d3.result, d1.result)
+        info = resolver.info()
+        self.assertEqual(info['hits'], 1)
+        self.assertEqual(info['misses'], 1)
+        self.assertEqual(info['cache_size'], 1)
+        self.assertEqual(info['pending'], 0)
+
+    def test_getaddrinfo_negative_cache(self):
+        loop = new_event_loop(iothreadloop=False)
+        resolver = loop.resolver
+        d = loop.getaddrinfo('unknown.host.invalid', 80)
+        try:
+            loop.run_until_complete(d, timeout=5)
+        except socket.error:
+            pass
+        else:
+            assert False, 'socket.error not raised'
+        self.assertEqual(resolver.misses, 1)
+        d = loop.getaddrinfo('unknown.host.invalid', 80)
+        self.assertTrue(d.done())
+        self.assertRaises(socket.error, d.result.throw)
+        self.assertEqual(resolver.hits, 1)
+
+    @unittest.skipUnless('epoll-et' in POLLERS, 'Requires epoll')
+    def test_edge_triggered_transport(self):
+        loop = new_event_loop(io=POLLERS['epoll-et'](), iothreadloop=False)
+        size = 3*DRAIN_BUDGET
+        r, w = tcp_socketpair()
+        protocol = CountingProtocol(size)
+        reader = SocketStreamTransport(loop, r, protocol)
+        writer = SocketStreamTransport(loop, w, SimpleProtocol())
+        self.assertEqual(reader._drain_budget, DRAIN_BUDGET)
+        writer.write(size*b'x')
+        loop.run_until_complete(protocol.done, timeout=10)
+        self.assertEqual(protocol.received, size)
+        self.assertFalse(writer._write_buffer)
+        reader.close()
+        writer.close()
+
+    @unittest.skipUnless('epoll-et' in POLLERS, 'Requires epoll')
+    def test_edge_triggered_pause_reading(self):
+        loop = new_event_loop(io=POLLERS['epoll-et'](), iothreadloop=False)
+        size = 3*DRAIN_BUDGET
+        r, w = tcp_socketpair()
+        protocol = PausingProtocol(size)
+        reader = SocketStreamTransport(loop, r, protocol)
+        protocol.transport = reader
+        writer = SocketStreamTransport(loop, w, SimpleProtocol())
+        writer.write(size*b'x')
+        loop.call_later(0.2, loop.stop)
+        loop.run()
+        self.assertTrue(reader._paused_reading)
+        self.assertFalse(reader._sock_fd in loop.io._edge_fds)
+        reader.resume_reading()
+        # resumed edge-triggered
+        self.assertTrue(reader._sock_fd in loop.io._edge_fds)
+        loop.run_until_complete(protocol.done, timeout=10)
+        self.assertEqual(len(b''.join(protocol.data)), size)
+        reader.close()
+        writer.close()
+
+    def test_write_buffers(self):
+        loop = new_event_loop(iothreadloop=False)
+        size = 2*1024*1024
+        chunks = [size*b'a', bytearray(size*b'b'), memoryview(size*b'c')]
+        r, w = tcp_socketpair()
+        protocol = CollectingProtocol(6*size)
+        reader = SocketStreamTransport(loop, r, protocol)
+        writer = SocketStreamTransport(loop, w, SimpleProtocol())
+        self.assertRaises(TypeError, writer.write, 3)
+        writer.writelines(chunks)
+        for chunk in chunks:
+            writer.write(chunk)
+        self.assertTrue(writer._write_buffer)
+        # mutable buffers which could not be sent are copied
+        chunks[1][:] = size*b'd'
+        loop.run_until_complete(protocol.done, timeout=10)
+        self.assertEqual(b''.join(protocol.data),
+                         2*(size*b'a' + size*b'b' + size*b'c'))
+        self.assertFalse(writer._write_buffer)
+        reader.close()
+        writer.close()
+
+    def test_get_extra_info(self):
+        loop = new_event_loop(iothreadloop=False)
+        r, w = tcp_socketpair()
+        transport = SocketStreamTransport(loop, r, SimpleProtocol())
+        self.assertEqual(transport.get_extra_info('socket'), r)
+        self.assertEqual(transport.get_extra_info('sock_fd'), r.fileno())
+        self.assertEqual(transport.get_extra_info('drain_budget'), 0)
+        # private methods are not extra info
+        self.assertEqual(transport.get_extra_info('shutdown'), None)
+        self.assertEqual(transport.get_extra_info('ready_write', 1), 1)
+        self.assertEqual(transport.get_extra_info('foo', 1), 1)
+        transport.close()
+        w.close()
+
+    def test_write_wide_items(self):
+        # a view of 4 bytes items is buffered and sent by bytes
+        loop = new_event_loop(iothreadloop=False)
+        size = 1024*1024
+        data = os.urandom(4*size)
+        items = (ctypes.c_uint32*size).from_buffer_copy(data)
+        r, w = tcp_socketpair()
+        protocol = CollectingProtocol(4*size)
+        reader = SocketStreamTransport(loop, r, protocol)
+        writer = SocketStreamTransport(loop, w, SimpleProtocol())
+        writer.write(memoryview(items))
+        self.assertTrue(writer._write_buffer)
+        loop.run_until_complete(protocol.done, timeout=10)
+        self.assertEqual(b''.join(protocol.data), data)
+        self.assertFalse(writer._write_buffer)
+        reader.close()
+        writer.close()
+
+    def test_buffered_protocol(self):
+        loop = new_event_loop(iothreadloop=False)
+        size = 1024*1024
+        r, w = tcp_socketpair()
+        protocol = BufferProtocol(size)
+        reader = SocketStreamTransport(loop, r, protocol)
+        writer = SocketStreamTransport(loop, w, SimpleProtocol())
+        writer.write(size*b'x')
+        loop.run_until_complete(protocol.done, timeout=10)
+        self.assertEqual(protocol.buffer, bytearray(size*b'x'))
+        reader.close()
+        writer.close()
+
+    def test_adaptive_read_size(self):
+        loop = new_event_loop(iothreadloop=False)
+        r, w = tcp_socketpair()
+        protocol = CountingProtocol(4*BUFFER_MAX_SIZE)
+        reader = SocketStreamTransport(loop, r, protocol)
+        writer = SocketStreamTransport(loop, w, SimpleProtocol())
+        self.assertEqual(reader._read_size, MIN_READ_CHUNK_SIZE)
+        writer.write(4*BUFFER_MAX_SIZE*b'x')
+        loop.run_until_complete(protocol.done, timeout=10)
+        self.assertTrue(reader._read_size > MIN_READ_CHUNK_SIZE)
+        reader._adapt_read_size(reader._read_size, 10)
+        self.assertTrue(reader._read_size < BUFFER_MAX_SIZE)
+        reader._read_size = MIN_READ_CHUNK_SIZE
+        reader._adapt_read_size(MIN_READ_CHUNK_SIZE, 10)
+        self.assertEqual(reader._read_size, MIN_READ_CHUNK_SIZE)
+        reader.close()
+        writer.close()
+
+    def test_write_flow_control(self):
+        loop = new_event_loop(iothreadloop=False)
+        size = 8*1024*1024
+        r, w = tcp_socketpair()
+        protocol = CountingProtocol(size)
+        flow = FlowProtocol()
+        reader = SocketStreamTransport(loop, r, protocol)
+        writer = SocketStreamTransport(loop, w, flow)
+        self.assertRaises(ValueError, writer.set_write_buffer_limits, 10, 20)
+        writer.set_write_buffer_limits(1024*1024)
+        self.assertEqual(writer._low_water, 256*1024)
+        writer.write(size*b'x')
+        self.assertTrue(writer.get_write_buffer_size() > 1024*1024)
+        self.assertEqual(flow.events, ['pause'])
+        loop.run_until_complete(protocol.done, timeout=10)
+        self.assertEqual(flow.events, ['pause', 'resume'])
+        self.assertEqual(writer.get_write_buffer_size(), 0)
+        reader.close()
+        writer.close()
+
+    def test_connection_drain(self):
+        loop = new_event_loop(iothreadloop=False)
+        size = 8*1024*1024
+        r, w = tcp_socketpair()
+        protocol = CountingProtocol(size)
+        connection = Connection(1, None, None)
+        reader = SocketStreamTransport(loop, r, protocol)
+        writer = SocketStreamTransport(loop, w, connection)
+        self.assertEqual(connection.drain(), None)
+        writer.write(size*b'x')
+        d = connection.drain()
+        self.assertTrue(isinstance(d, Deferred))
+        self.assertEqual(connection.drain(), d)
+        loop.run_until_complete(d, timeout=10)
+        self.assertEqual(connection.drain(), None)
+        writer.write(size*b'x')
+        d = connection.drain()
+        writer.abort()
+        self.assertRaises(IOError, loop.run_until_complete, d, 5)
+        reader.close()
+
+    def test_pause_reading(self):
+        loop = new_event_loop(iothreadloop=False)
+        size = 1024*1024
+        r, w = tcp_socketpair()
+        protocol = PausingProtocol(size + 3)
+        reader = SocketStreamTransport(loop, r, protocol)
+        protocol.transport = reader
+        writer = SocketStreamTransport(loop, w, SimpleProtocol())
+        self.assertRaises(RuntimeError, reader.resume_reading)
+        writer.write(size*b'x')
+        loop.call_later(0.2, loop.stop)
+        loop.run()
+        self.assertEqual(protocol.events, 1)
+        self.assertTrue(reader._paused_reading)
+        self.assertRaises(RuntimeError, reader.pause_reading)
+        # data read while paused is delivered first
+        reader._read_buffer = [b'abc']
+        reader.resume_reading()
+        loop.run_until_complete(protocol.done, timeout=10)
+        data = b''.join(protocol.data)
+        self.assertEqual(len(data), size + 3)
+        self.assertEqual(data[len(protocol.data[0]):][:3], b'abc')
+        self.assertEqual(reader._read_buffer, None)
+        reader.close()
+        writer.close()
+
+    def _sendfile(self, transport_class):
+        loop = new_event_loop(iothreadloop=False)
+        size = 3*1024*1024
+        body = b''.join((bytes(bytearray((i % 256,)))*1024
+                         for i in range(size//1024)))
+        fd = tempfile.TemporaryFile()
+        fd.write(body)
+        fd.flush()
+        r, w = tcp_socketpair()
+        protocol = CollectingProtocol(size + 6)
+        reader = SocketStreamTransport(loop, r, protocol)
+        writer = transport_class(loop, w, SimpleProtocol())
+        writer.write(b'head')
+        d = writer.sendfile(fd, 1024)
+        writer.sendfile(fd, 0, 1024)
+        writer.write(b'\r\n')
+        self.assertEqual(loop.run_until_complete(d, timeout=10), size - 1024)
+        loop.run_until_complete(protocol.done, timeout=10)
+        self.assertEqual(b''.join(protocol.data),
+                         b'head' + body[1024:] + body[:1024] + b'\r\n')
+        self.assertFalse(writer._write_buffer)
+        self.assertEqual(writer.sendfile(fd, size).result, 0)
+        reader.close()
+        writer.close()
+        fd.close()
+
+    def test_sendfile(self):
+        self._sendfile(SocketStreamTransport)
+
+    def test_sendfile_copy(self):
+        self._sendfile(CopyTransport)
+
     def __test_create_connection_local_addr(self):
         # TODO, fix this test for all python versions
         from test.support import find_unused_port
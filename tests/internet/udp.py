@@ -0,0 +1,57 @@
+'''Tests the datagram transport.'''
+from pulsar import Deferred, DatagramProtocol
+from pulsar.utils.pep import new_event_loop
+from pulsar.apps.test import unittest
+
+
+class Receiver(DatagramProtocol):
+
+    def __init__(self, num):
+        self.num = num
+        self.received = []
+        self.batches = []
+        self.done = Deferred()
+
+    def datagrams_received(self, datagrams):
+        self.batches.append(len(datagrams))
+        super(Receiver, self).datagrams_received(datagrams)
+
+    def datagram_received(self, data, addr):
+        self.received.append(data)
+        if len(self.received) == self.num:
+            self.done.callback(self.received)
+
+
+class TestDatagramTransport(unittest.TestCase):
+
+    def endpoints(self, num, **kw):
+        loop = new_event_loop(iothreadloop=False)
+        receiver = Receiver(num)
+        server, _ = loop.run_until_complete(loop.create_datagram_endpoint(
+            lambda: receiver, local_addr=('127.0.0.1', 0), **kw), 5)
+        address = server.address
+        client, _ = loop.run_until_complete(loop.create_datagram_endpoint(
+            DatagramProtocol, remote_addr=address), 5)
+        return loop, server, client, receiver
+
+    def test_batched_read(self):
+        loop, server, client, receiver = self.endpoints(100)
+        self.assertEqual(server.max_datagrams, 256)
+        data = [('%s' % i).encode('ascii') for i in range(100)]
+        client.sendmany(data)
+        self.assertFalse(client.writing)
+        result = loop.run_until_complete(receiver.done, 5)
+        self.assertEqual(result, data)
+        self.assertEqual(receiver.batches, [100])
+        client.close()
+        server.close()
+
+    def test_max_datagrams(self):
+        loop, server, client, receiver = self.endpoints(10, max_datagrams=3)
+        self.assertEqual(server.max_datagrams, 3)
+        for i in range(10):
+            client.sendto(b'x')
+        loop.run_until_complete(receiver.done, 5)
+        self.assertEqual(receiver.batches, [3, 3, 3, 1])
+        client.close()
+        server.close()
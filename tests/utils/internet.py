@@ -8,7 +8,7 @@ import pulsar
 from pulsar import platform
 from pulsar.utils.internet import (parse_address, parse_connection_string,
                                    socketpair, close_socket, is_socket_closed,
-                                   format_address)
+                                   format_address, get_connection_string)
 from pulsar.utils.pep import pickle
 from pulsar.apps.test import unittest, mock
 
@@ -61,6 +61,15 @@ class TestParseConnectionString(unittest.TestCase):
         self.assertEqual(address, 'bla.foo')
         self.assertEqual(params, {})
 
+    def test_parse_unix_path_with_scheme_and_params(self):
+        scheme, address, params = parse_connection_string(
+            'redis://unix:/tmp/redis.sock?db=3')
+        self.assertEqual(scheme, 'redis')
+        self.assertEqual(address, '/tmp/redis.sock')
+        self.assertEqual(params, {'db': '3'})
+        self.assertEqual(get_connection_string(scheme, address, params),
+                         'redis://unix:/tmp/redis.sock?db=3')
+
     def test_parse_tcp_with_scheme_and_params(self):
         scheme, address, params = parse_connection_string('redis://:6439?db=3')
         self.assertEqual(scheme, 'redis')
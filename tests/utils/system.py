@@ -1,4 +1,8 @@
 '''Tests the tools and utilities in pulsar.utils.'''
+import os
+import select
+import threading
+
 from pulsar import system, platform
 from pulsar.apps.test import unittest
 
@@ -13,4 +17,69 @@ class TestSystem(unittest.TestCase):
         
     def test_maxfd(self):
         m = system.get_maxfd()
-        self.assertTrue(m)
\ No newline at end of file
+        self.assertTrue(m)
+
+
+class WakeDuringRead(object):
+    '''Replace the ``os`` module of the waker implementation, a wake-up
+    from another thread happens just before reading the waker.'''
+    def __init__(self, waker):
+        self.waker = waker
+
+    def __getattr__(self, name):
+        return getattr(os, name)
+
+    def read(self, fd, size):
+        thread = threading.Thread(target=self.waker.wake)
+        thread.start()
+        # the thread waits for consume to finish
+        thread.join(0.2)
+        self.thread = thread
+        return os.read(fd, size)
+
+
+class TestWaker(unittest.TestCase):
+
+    def readable(self, waker):
+        return bool(select.select([waker], [], [], 0)[0])
+
+    def test_coalesce(self):
+        waker = system.Waker()
+        try:
+            self.assertTrue(str(waker))
+            self.assertFalse(self.readable(waker))
+            waker.wake()
+            waker.wake()
+            self.assertTrue(self.readable(waker))
+            waker.consume()
+            self.assertFalse(self.readable(waker))
+            # consuming without pending wake-ups does not block
+            waker.consume()
+            waker.wake()
+            self.assertTrue(self.readable(waker))
+            waker.consume()
+            self.assertFalse(self.readable(waker))
+        finally:
+            waker.close()
+
+    @unittest.skipUnless(platform.is_posix, 'Posix platform required')
+    def test_wake_during_consume(self):
+        from pulsar.utils.system import posixsystem
+        waker = system.Waker()
+        proxy = WakeDuringRead(waker)
+        try:
+            waker.wake()
+            posixsystem.os = proxy
+            try:
+                waker.consume()
+            finally:
+                posixsystem.os = os
+            proxy.thread.join()
+            # the wake-up from the other thread is not lost
+            self.assertTrue(self.readable(waker))
+            waker.consume()
+            self.assertFalse(self.readable(waker))
+            waker.wake()
+            self.assertTrue(self.readable(waker))
+        finally:
+            waker.close()